@@ -0,0 +1,501 @@
+import math
+from time import perf_counter
+from array import array
+from collections.abc import Mapping
+from motor_utils import get_motor_specs
+from instrumentation import instruments
+
+# Global constants (same values as the GUI)
+G = 9.80665  # Gravitational acceleration
+PI = math.pi
+
+# Input parameter names, in the order the GUI binds them
+PARAMETER_NAMES = (
+    'payload_mass', 'link_density',
+    'L6', 'L5', 'L4', 'L3', 'L2', 'L1',
+    'r6', 'r5', 'r4', 'r3', 'r2', 'r1',
+    'M6', 'M5', 'M4', 'M3', 'M2', 'M1',
+    'a6', 'a5', 'a4', 'a3', 'a2', 'a1',
+    'rpm6', 'rpm5', 'rpm4', 'rpm3', 'rpm2', 'rpm1',
+    'R6', 'R5', 'R4', 'R3', 'R2', 'R1',
+    'SF6', 'SF5', 'SF4', 'SF3', 'SF2', 'SF1'
+)
+
+# RPM and reduction ratios are read as integers by the GUI
+INTEGER_PARAMETERS = frozenset(
+    [f"rpm{i}" for i in range(1, 7)] + [f"R{i}" for i in range(1, 7)]
+)
+
+DEFAULT_PARAMETERS = {
+    'payload_mass': "5.0",
+    'link_density': "7850.0",  # Steel density kg/m³
+    'L6': "0.2", 'L5': "0.3", 'L4': "0.25", 'L3': "0.25", 'L2': "0.3", 'L1': "0.0",
+    'r6': "0.02", 'r5': "0.025", 'r4': "0.025", 'r3': "0.03", 'r2': "0.035", 'r1': "0.04",
+    'M6': "1.25", 'M5': "1.0", 'M4': "0.75", 'M3': "0.5", 'M2': "0.25", 'M1': "0.0",
+    'a6': "0.1", 'a5': "0.12", 'a4': "0.12", 'a3': "0.15", 'a2': "0.18", 'a1': "0.2",
+    'rpm6': "3000", 'rpm5': "3000", 'rpm4': "3000", 'rpm3': "3000", 'rpm2': "3000", 'rpm1': "3000",
+    'R6': "50", 'R5': "50", 'R4': "50", 'R3': "50", 'R2': "50", 'R1': "50",
+    'SF6': "1.5", 'SF5': "1.5", 'SF4': "1.5", 'SF3': "1.5", 'SF2': "1.5", 'SF1': "1.5"
+}
+
+# Motor weights assumed before a motor has been selected from the catalog
+DEFAULT_MOTOR_WEIGHTS = {1: 2.5, 2: 2.0, 3: 1.5, 4: 1.2, 5: 1.2, 6: 1.0}
+
+class Dual:
+    """A value carrying exact partial derivatives with respect to named inputs
+
+    The torque model only uses +, -, *, / and powers, so evaluating it on
+    Dual inputs yields every joint torque together with its gradient in a
+    single pass.
+    """
+    __slots__ = ('value', 'grad')
+
+    def __init__(self, value, grad=None):
+        self.value = value
+        self.grad = grad if grad is not None else {}
+
+    @staticmethod
+    def _combine(a, ca, b, cb):
+        """Return ca * grad(a) + cb * grad(b) as a new dict"""
+        grad = {k: ca * v for k, v in a.items()} if ca != 0 else {}
+        if cb != 0:
+            for k, v in b.items():
+                grad[k] = grad.get(k, 0.0) + cb * v
+        return grad
+
+    def __add__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value + other.value, self._combine(self.grad, 1.0, other.grad, 1.0))
+        return Dual(self.value + other, dict(self.grad))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value - other.value, self._combine(self.grad, 1.0, other.grad, -1.0))
+        return Dual(self.value - other, dict(self.grad))
+
+    def __rsub__(self, other):
+        return Dual(other - self.value, {k: -v for k, v in self.grad.items()})
+
+    def __neg__(self):
+        return Dual(-self.value, {k: -v for k, v in self.grad.items()})
+
+    def __mul__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value * other.value,
+                        self._combine(self.grad, other.value, other.grad, self.value))
+        return Dual(self.value * other, {k: other * v for k, v in self.grad.items()})
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Dual):
+            inv = 1.0 / other.value
+            return Dual(self.value * inv,
+                        self._combine(self.grad, inv, other.grad, -self.value * inv * inv))
+        return Dual(self.value / other, {k: v / other for k, v in self.grad.items()})
+
+    def __rtruediv__(self, other):
+        inv = 1.0 / self.value
+        return Dual(other * inv, {k: -other * inv * inv * v for k, v in self.grad.items()})
+
+    def __pow__(self, exponent):
+        scale = exponent * self.value ** (exponent - 1)
+        return Dual(self.value ** exponent, {k: scale * v for k, v in self.grad.items()})
+
+    def __float__(self):
+        return float(self.value)
+
+    def __repr__(self):
+        return f"Dual({self.value!r}, {self.grad!r})"
+
+def value_of(x):
+    """Plain float value of a float or Dual"""
+    return x.value if isinstance(x, Dual) else x
+
+def gradient_of(x):
+    """Gradient dict of a float (empty) or Dual"""
+    return x.grad if isinstance(x, Dual) else {}
+
+def parse_parameter(name, text, default=0.0):
+    """Parse one input the way the GUI does: bad or negative values fall back to default"""
+    try:
+        value = int(text) if name in INTEGER_PARAMETERS else float(text)
+        return value if value >= 0 else default
+    except (ValueError, TypeError):
+        return default
+
+def parse_parameters(raw):
+    """Parse a mapping of parameter name -> text, filling gaps from DEFAULT_PARAMETERS"""
+    params = {}
+    for name in PARAMETER_NAMES:
+        text = raw.get(name, DEFAULT_PARAMETERS[name])
+        params[name] = parse_parameter(name, text)
+    return params
+
+# Storage layout of a ParameterSnapshot: float inputs, then integer inputs, each per-joint group in joint order 1..6
+SNAPSHOT_FLOAT_NAMES = ('payload_mass', 'link_density') + tuple(
+    f"{prefix}{i}" for prefix in ('L', 'r', 'M', 'a', 'SF') for i in range(1, 7)
+)
+SNAPSHOT_INT_NAMES = tuple(f"{prefix}{i}" for prefix in ('rpm', 'R') for i in range(1, 7))
+
+# Parameter name -> (integer?, position in its array)
+SNAPSHOT_SLOTS = {name: (False, i) for i, name in enumerate(SNAPSHOT_FLOAT_NAMES)}
+SNAPSHOT_SLOTS.update({name: (True, i) for i, name in enumerate(SNAPSHOT_INT_NAMES)})
+
+class ParameterSnapshot(Mapping):
+    """Immutable, validated set of all input parameters, read once per recalculation
+
+    Values live in two typed arrays (floats and integers) with each
+    per-joint group stored contiguously, so joint(prefix) is a slice.
+    The snapshot is a read-only mapping of parameter name -> number, so
+    the engine indexes it like a dict, and it is hashable, so it serves
+    directly as a memoization and result cache key.
+    """
+    __slots__ = ('floats', 'ints', 'hash')
+
+    def __init__(self, values):
+        """Build from a mapping holding a number for every parameter; raises ValueError otherwise"""
+        missing = [name for name in PARAMETER_NAMES if name not in values]
+        if missing:
+            raise ValueError(f"Missing parameters: {', '.join(missing)}")
+        for name in PARAMETER_NAMES:
+            value = values[name]
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"{name} must be a number, got {value!r}")
+            if name in INTEGER_PARAMETERS and value != int(value):
+                raise ValueError(f"{name} must be a whole number, got {value!r}")
+            if not value >= 0:
+                raise ValueError(f"{name} must not be negative, got {value!r}")
+        # + 0.0 turns -0.0 into 0.0, so equal snapshots also have equal bytes and hashes
+        floats = array('d', [values[name] + 0.0 for name in SNAPSHOT_FLOAT_NAMES])
+        ints = array('q', [int(values[name]) for name in SNAPSHOT_INT_NAMES])
+        object.__setattr__(self, 'floats', floats)
+        object.__setattr__(self, 'ints', ints)
+        object.__setattr__(self, 'hash', hash((floats.tobytes(), ints.tobytes())))
+
+    @classmethod
+    def parse(cls, raw):
+        """Snapshot of a mapping of name -> text, parsed like the GUI (see parse_parameters)"""
+        return cls(parse_parameters(raw))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ParameterSnapshot is immutable")
+
+    __delattr__ = __setattr__
+
+    def __getitem__(self, name):
+        is_int, i = SNAPSHOT_SLOTS[name]
+        return self.ints[i] if is_int else self.floats[i]
+
+    def __iter__(self):
+        return iter(PARAMETER_NAMES)
+
+    def __len__(self):
+        return len(PARAMETER_NAMES)
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        if isinstance(other, ParameterSnapshot):
+            return self.hash == other.hash and self.floats == other.floats and self.ints == other.ints
+        return Mapping.__eq__(self, other)
+
+    def __reduce__(self):
+        return (ParameterSnapshot, (dict(self),))
+
+    def __repr__(self):
+        return f"ParameterSnapshot({dict(self)!r})"
+
+    def joint(self, prefix):
+        """Values of a per-joint parameter group (e.g. 'L', 'rpm') for joints 1..6"""
+        is_int, i = SNAPSHOT_SLOTS[f"{prefix}1"]
+        return tuple((self.ints if is_int else self.floats)[i:i + 6])
+
+    def as_dict(self):
+        """A plain dict of the values, for code that indexes parameters many times"""
+        values = dict(zip(SNAPSHOT_FLOAT_NAMES, self.floats))
+        values.update(zip(SNAPSHOT_INT_NAMES, self.ints))
+        return values
+
+    def key(self):
+        """The values in PARAMETER_NAMES order, for hashing into persistent keys"""
+        return tuple(self[name] for name in PARAMETER_NAMES)
+
+    def changed_from(self, other):
+        """Names of the parameters that differ from other (a snapshot, mapping or None)"""
+        if isinstance(other, ParameterSnapshot):
+            if self == other:
+                return []
+            changed = [name for name, a, b in zip(SNAPSHOT_FLOAT_NAMES, self.floats, other.floats) if a != b]
+            changed += [name for name, a, b in zip(SNAPSHOT_INT_NAMES, self.ints, other.ints) if a != b]
+            return changed
+        other = other or {}
+        return [name for name in PARAMETER_NAMES if self[name] != other.get(name)]
+
+def seed_gradients(params, names=PARAMETER_NAMES):
+    """Wrap the named parameters as Dual inputs with unit derivatives"""
+    seeded = dict(params)
+    for name in names:
+        seeded[name] = Dual(params[name], {name: 1.0})
+    return seeded
+
+def joint_geometry(p, motor_num):
+    """The parts of joint motor_num's static torque that do not depend on the selected motors
+
+    Returns (payload and link torque in N⋅m, {k: moment arm of motor k})
+    for the motors k mounted further out. Every scenario of a design shares
+    these terms; only the motor weights applied to the arms differ.
+    """
+    L = {i: p[f"L{i}"] for i in range(1, 7)}
+    r = {i: p[f"r{i}"] for i in range(1, 7)}
+    density = p['link_density']
+
+    # Joint positions from base
+    S = {}
+    total = 0.0
+    for i in range(1, 7):
+        total = total + L[i]
+        S[i] = total
+
+    M_pos = p[f"M{motor_num}"]
+    W_P = G * p['payload_mass']
+    T_total = W_P * (S[6] - M_pos)
+
+    # Links from this joint outwards (base link only counts when it exists)
+    for k in range(motor_num, 7):
+        if k == 1 and not value_of(L[1]) > 0:
+            continue
+        W_L = G * density * PI * r[k] ** 2 * L[k]
+        T_total = T_total + W_L * (S[k] - M_pos - L[k] / 2)
+
+    # Motors mounted further out along the arm
+    arms = {k: (p[f"M{k}"] + p[f"a{k}"] / 2) - M_pos for k in range(motor_num + 1, 7)}
+    return T_total, arms
+
+def geometry_torque(geometry, motor_weights):
+    """Static holding torque (N⋅m) from joint_geometry() terms and the motor weights carried"""
+    T_total, arms = geometry
+    for k, arm in arms.items():
+        W_M = G * motor_weights.get(k, DEFAULT_MOTOR_WEIGHTS[k])
+        T_total = T_total + W_M * arm
+    return T_total
+
+def joint_total_torque(p, motor_num, motor_weights):
+    """Static holding torque about joint motor_num (N⋅m)
+
+    p maps parameter names to floats or Duals; motor_weights maps motor
+    number to the mass (kg) of the motors carried by the arm.
+    """
+    return geometry_torque(joint_geometry(p, motor_num), motor_weights)
+
+def torque_outputs(p, motor_num, T_total, with_sf=False, safety_factor=None):
+    """Torque and power outputs of a joint from its total torque; safety_factor overrides SF<n>"""
+    rpm = p[f"rpm{motor_num}"]
+    R = p[f"R{motor_num}"]
+    SF = p[f"SF{motor_num}"] if safety_factor is None else safety_factor
+
+    if with_sf:
+        return {
+            'total_torque_sf': SF * T_total,
+            'torque_before_reduction_sf': (T_total / R * SF) if value_of(R) != 0 else 0.0,
+            'power_sf': (T_total / R * rpm * 1000 / 9550 * SF)
+                        if (value_of(rpm) != 0 and value_of(R) != 0) else 0.0
+        }
+    T_before = T_total / R if value_of(R) != 0 else 0.0
+    return {
+        'total_torque': T_total,
+        'torque_before_reduction': T_before,
+        'power': (T_before * rpm * 1000 / 9550) if value_of(rpm) != 0 else 0.0
+    }
+
+def joint_outputs(p, motor_num, motor_weights, with_sf=False):
+    """Torque and power outputs for one joint as floats or Duals, following p"""
+    return torque_outputs(p, motor_num, joint_total_torque(p, motor_num, motor_weights), with_sf)
+
+def joint_result(p, motor_num, T_total, with_sf=False, safety_factor=None, gradients=False):
+    """One joint's results in the GUI's format, from p already seeded for the wanted gradients"""
+    outputs = torque_outputs(p, motor_num, T_total, with_sf, safety_factor)
+
+    # Without gradients p holds plain numbers, so the outputs already are the values
+    results = {key: value_of(value) for key, value in outputs.items()} if gradients else outputs
+    if not with_sf:
+        results['safety_factor'] = value_of(p[f"SF{motor_num}"])
+    elif safety_factor is not None:
+        results['safety_factor'] = safety_factor
+    if gradients:
+        results['gradients'] = {key: dict(gradient_of(value)) for key, value in outputs.items()}
+    return results
+
+def seeded_parameters(params, gradients):
+    """params as Duals for the requested gradients (True for all inputs, or a collection of names)"""
+    if isinstance(params, ParameterSnapshot):
+        params = params.as_dict()
+    if not gradients:
+        return params
+    return seed_gradients(params, PARAMETER_NAMES if gradients is True else gradients)
+
+def calculate_joint(params, motor_num, motor_weights, with_sf=False, gradients=False):
+    """Torque and power for one joint, in the result format used by the GUI
+
+    With gradients=True (or a collection of parameter names) the result also
+    has a 'gradients' entry mapping each output key to {parameter name:
+    exact partial derivative}.
+    """
+    p = seeded_parameters(params, gradients)
+    return joint_result(p, motor_num, joint_total_torque(p, motor_num, motor_weights), with_sf,
+                        gradients=gradients)
+
+def parameter_joints(name):
+    """Joints whose static torque or power depends directly on a parameter"""
+    prefix = name.rstrip("0123456789")
+    if prefix in ('payload_mass', 'link_density', 'L'):
+        # Every joint carries the payload, and every link length moves the joint positions
+        return frozenset(range(1, 7))
+    k = int(name[len(prefix):])
+    if prefix in ('r', 'M'):
+        # Link k weight and motor k position act on joint k and the joints inboard of it
+        return frozenset(range(1, k + 1))
+    if prefix == 'a':
+        # Motor k body length only shifts the motor weight seen by inboard joints
+        return frozenset(range(1, k))
+    # rpm, R and SF only enter joint k's own power and torque before reduction
+    return frozenset([k])
+
+# Dependency graph from each input to the joints it affects
+PARAMETER_JOINTS = {name: parameter_joints(name) for name in PARAMETER_NAMES}
+
+# Safety factors only change the SF results (normal results just echo them)
+SF_PARAMETERS = frozenset(f"SF{i}" for i in range(1, 7))
+
+# Inputs drawn in the arm diagram; all of them move the arm, but each axis limit follows only its own links
+DIAGRAM_PARAMETERS = frozenset(f"L{i}" for i in range(1, 7))
+
+def dirty_joints(changed):
+    """Return (normal joints, SF joints) that must be recomputed after changed inputs"""
+    dirty_normal = set()
+    dirty_sf = set()
+    for name in changed:
+        joints = PARAMETER_JOINTS[name]
+        if name not in SF_PARAMETERS:
+            dirty_normal |= joints
+        dirty_sf |= joints
+    return dirty_normal, dirty_sf
+
+def evaluate_design(params, select_motor=None, previous=None, changed=None, gradients=False, safety_factors=()):
+    """Run the full calculation for a design, as calculate_all does in the GUI
+
+    Motors are sized from 6 down to 1 because each joint carries the motors
+    selected further out. select_motor(motor_num, torque, power) returns the
+    specs dict for a joint and defaults to get_motor_specs.
+
+    The scenarios form an axis evaluated together per joint: the normal
+    pass, the SF pass, and one extra pass per value in safety_factors that
+    applies that safety factor to every joint. Each joint's weight
+    independent terms (joint_geometry) are computed once and shared by all
+    scenarios, so extra scenarios cost little more than a motor selection.
+    They are returned as design['scenarios'][sf] = {'results': ...,
+    'specs': ...}.
+
+    Given the previous result and the names of the changed inputs, only the
+    joints that depend on them are recomputed; a joint is reselected only if
+    its torque or power moved, and inboard joints are recomputed only if a
+    selected motor weight changed. The result's 'changed' entry lists the
+    joints whose results or specs differ from previous, per scenario.
+    """
+    if select_motor is None:
+        select_motor = get_motor_specs
+    if previous is None or changed is None:
+        previous = {'normal': {}, 'sf': {}, 'specs_normal': {}, 'specs_sf': {}}
+        dirty_normal = dirty_sf = set(range(1, 7))
+    else:
+        dirty_normal, dirty_sf = dirty_joints(changed)
+
+    design = {
+        'normal': dict(previous['normal']),
+        'sf': dict(previous['sf']),
+        'specs_normal': dict(previous['specs_normal']),
+        'specs_sf': dict(previous['specs_sf']),
+        'changed': {'normal': set(), 'sf': set()}
+    }
+
+    # The scenario axis: (name, results, specs, with SF?, safety factor override, joints to recompute)
+    scenarios = [
+        ('normal', design['normal'], design['specs_normal'], False, None, dirty_normal),
+        ('sf', design['sf'], design['specs_sf'], True, None, dirty_sf)
+    ]
+    if safety_factors:
+        design['scenarios'] = {}
+        for sf in safety_factors:
+            old = previous.get('scenarios', {}).get(sf)
+            extra = {'results': dict(old['results']) if old else {}, 'specs': dict(old['specs']) if old else {}}
+            design['scenarios'][sf] = extra
+            design['changed'][sf] = set()
+            # A fixed safety factor makes the scenario independent of the SF inputs
+            dirty = dirty_normal if old else set(range(1, 7))
+            scenarios.append((sf, extra['results'], extra['specs'], True, sf, dirty))
+
+    p = seeded_parameters(params, gradients)
+    # Motor weights carried in each scenario, updated as joints are selected
+    weights = [{num: s['motor_weight'] for num, s in scenario[2].items()} for scenario in scenarios]
+    weight_changed = [False] * len(scenarios)
+    hits = misses = 0
+    # Torque time is summed here and recorded once, which keeps the timer off the per-joint path
+    torque_seconds = 0.0
+    loop_start = perf_counter()
+    for motor_num in range(6, 0, -1):
+        active = [i for i, scenario in enumerate(scenarios) if motor_num in scenario[5] or weight_changed[i]]
+        if not active:
+            continue
+
+        # This joint's torque and power in every active scenario, from one set of shared terms
+        start = perf_counter()
+        geometry = joint_geometry(p, motor_num)
+        computed = [
+            joint_result(p, motor_num, geometry_torque(geometry, weights[i]), scenarios[i][3], scenarios[i][4],
+                         gradients)
+            for i in active
+        ]
+        torque_seconds += perf_counter() - start
+
+        for i, result in zip(active, computed):
+            name, results, specs, with_sf = scenarios[i][:4]
+            key_torque = 'total_torque_sf' if with_sf else 'total_torque'
+            key_power = 'power_sf' if with_sf else 'power'
+            old_result = results.get(motor_num)
+            old_specs = specs.get(motor_num)
+
+            if (old_specs is not None and old_result is not None
+                    and old_result[key_torque] == result[key_torque]
+                    and old_result[key_power] == result[key_power]):
+                hits += 1
+                new_specs = old_specs
+            else:
+                misses += 1
+                new_specs = select_motor(motor_num, result[key_torque], result[key_power])
+
+            if old_specs is None or new_specs['motor_weight'] != old_specs['motor_weight']:
+                weight_changed[i] = True
+            if result != old_result or new_specs != old_specs:
+                design['changed'][name].add(motor_num)
+            results[motor_num] = result
+            specs[motor_num] = new_specs
+            weights[i][motor_num] = new_specs['motor_weight']
+
+    if torque_seconds and instruments.enabled:
+        instruments.record('engine.torque', loop_start, loop_start + torque_seconds)
+    if hits:
+        instruments.count('engine.selection.hits', hits)
+    if misses:
+        instruments.count('engine.selection.misses', misses)
+
+    # Normal results carry the safety factor along without depending on it
+    for name in changed or ():
+        if name in SF_PARAMETERS:
+            motor_num = int(name[2:])
+            if motor_num in design['normal']:
+                design['normal'][motor_num] = dict(design['normal'][motor_num], safety_factor=params[name])
+
+    return design
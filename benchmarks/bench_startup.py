@@ -0,0 +1,79 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Startup budgets; the script exits with status 1 if either is missed
+IMPORT_TARGET_S = 0.5
+WINDOW_TARGET_S = 1.0
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each probe runs in a fresh interpreter so nothing is already imported
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import main3
+print(time.perf_counter() - start, 'matplotlib' in sys.modules)
+"""
+
+WINDOW_PROBE = """
+import time
+start = time.perf_counter()
+import tkinter as tk
+import main3
+root = tk.Tk()
+app = main3.RobotArmCalculator(root)
+def idle():
+    print(time.perf_counter() - start)
+    root.destroy()
+root.after_idle(idle)
+root.mainloop()
+"""
+
+def run_probe(code):
+    """Run a probe in a new interpreter from the repo directory and return its output"""
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "probe failed")
+    return result.stdout.strip().splitlines()[-1].split()
+
+def has_display():
+    try:
+        import tkinter as tk
+        tk.Tk().destroy()
+        return True
+    except Exception:
+        return False
+
+def main():
+    """Measure cold import time of main3 and time to the first idle window"""
+    parser = argparse.ArgumentParser(description="Startup benchmark for the calculator GUI")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    args = parser.parse_args()
+
+    ok = True
+    import_times = []
+    for _ in range(args.runs):
+        elapsed, matplotlib_loaded = run_probe(IMPORT_PROBE)
+        import_times.append(float(elapsed))
+        if matplotlib_loaded == "True":
+            print("main3 imported matplotlib at startup")
+            ok = False
+    best = min(import_times)
+    print(f"import main3: best {best * 1000:.1f} ms of {args.runs} (target {IMPORT_TARGET_S * 1000:.0f} ms)")
+    ok = ok and best <= IMPORT_TARGET_S
+
+    if has_display():
+        window_times = [float(run_probe(WINDOW_PROBE)[0]) for _ in range(args.runs)]
+        best = min(window_times)
+        print(f"first idle window: best {best * 1000:.1f} ms of {args.runs} (target {WINDOW_TARGET_S * 1000:.0f} ms)")
+        ok = ok and best <= WINDOW_TARGET_S
+    else:
+        print("No display available; skipping the window measurement")
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
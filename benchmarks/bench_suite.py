@@ -0,0 +1,285 @@
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from arm_model import PARAMETER_NAMES, ParameterSnapshot, parse_parameters, evaluate_design  # noqa: E402
+import motor_utils  # noqa: E402
+from report import write_export_csv  # noqa: E402
+from result_export import design_record, export_records  # noqa: E402
+from catalog_generator import write_catalog  # noqa: E402
+
+BASELINE_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Every case runs REPEATS times, each in a fresh interpreter, and reports its median run, so
+# one slow run cannot fail the gate. The median still follows the load on the whole machine:
+# with no code change, medians measured minutes apart differed by up to 1.7x. A case therefore
+# regresses only when its median throughput falls to half of the baseline's median or below.
+REPEATS = 5
+REGRESSION_THRESHOLD = 0.5
+
+CATALOG_SIZES = (100, 10000, 1000000)
+
+SEED = 1234
+
+def random_designs(count, seed=SEED):
+    """Parsed designs scattered around the GUI defaults"""
+    rng = random.Random(seed)
+    defaults = parse_parameters({})
+    designs = []
+    for _ in range(count):
+        params = dict(defaults)
+        for name in PARAMETER_NAMES:
+            if isinstance(params[name], float) and params[name] > 0:
+                params[name] *= rng.uniform(0.5, 1.5)
+        designs.append(params)
+    return designs
+
+def measure(operation, inputs):
+    """Time operation(x) for every x; returns ops/sec and latency percentiles in microseconds"""
+    latencies = []
+    start = time.perf_counter()
+    for x in inputs:
+        t0 = time.perf_counter_ns()
+        operation(x)
+        latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] / 1000
+
+    return {
+        'ops': len(latencies),
+        'ops_per_sec': len(latencies) / elapsed,
+        'p50_us': percentile(0.50),
+        'p95_us': percentile(0.95),
+        'p99_us': percentile(0.99)
+    }
+
+def case_get_motor_specs(rows):
+    """get_motor_specs on a generated catalog of the given size, plus the cold catalog load"""
+    rng = random.Random(SEED)
+    # Requirements within the catalog's power range; the torque fallback beyond it scans every row
+    requirements = [(rng.randint(1, 6), rng.uniform(0, 50), rng.uniform(0, 10000)) for _ in range(20000)]
+
+    with tempfile.TemporaryDirectory(prefix="bench-catalog-") as workdir:
+        write_catalog(os.path.join(workdir, motor_utils.MOTOR_CATALOG_CSV), rows, seed=SEED,
+                      duplicate_rate=0.05, power_jitter=0.3)
+        os.chdir(workdir)
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            motor_utils.get_motor_specs(1, 1.0, 100.0)
+            load_seconds = time.perf_counter() - start
+            result = measure(lambda r: motor_utils.get_motor_specs(*r), requirements)
+        os.chdir(REPO_DIR)
+    result['cold_load_s'] = load_seconds
+    return result
+
+def case_recompute_headless():
+    """Full calculate_all-equivalent recompute without the GUI"""
+    motor_utils.get_motor_catalog()
+    with redirect_stdout(io.StringIO()):
+        return measure(evaluate_design, random_designs(2000))
+
+def case_recompute_gui():
+    """Full recompute through the GUI, including the display update; needs a display"""
+    import tkinter as tk
+    import main3
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+    with redirect_stdout(io.StringIO()):
+        app = main3.RobotArmCalculator(root)
+        designs = random_designs(300)
+
+        def recompute(params):
+            app.engine_design = None
+            app.engine_parameters = {}
+            app.design = None
+            app.apply_design(app.compute_design(ParameterSnapshot(params)))
+            root.update_idletasks()
+
+        result = measure(recompute, designs)
+    root.destroy()
+    return result
+
+def case_batch_sweep():
+    """Sizing a sweep of designs in batches against the shared indexed catalog"""
+    motor_catalog = motor_utils.get_motor_catalog()
+    designs = random_designs(5000)
+    batch = 500
+
+    def size_batch(start):
+        for params in designs[start:start + batch]:
+            evaluate_design(params, motor_catalog.select)
+
+    with redirect_stdout(io.StringIO()):
+        result = measure(size_batch, range(0, len(designs), batch))
+    result['designs_per_sec'] = result['ops_per_sec'] * batch
+    return result
+
+def case_select_batch():
+    """Coalesced batch selection of 512 requirements at a time"""
+    motor_catalog = motor_utils.get_motor_catalog()
+    rng = random.Random(SEED)
+    batches = [[(rng.randint(1, 6), rng.uniform(0, 50), rng.uniform(0, 4000)) for _ in range(512)]
+               for _ in range(200)]
+    with redirect_stdout(io.StringIO()):
+        result = measure(motor_catalog.select_batch, batches)
+    result['selections_per_sec'] = result['ops_per_sec'] * 512
+    return result
+
+def case_top_k_candidates():
+    """Top 10 candidate motors under every ranking on a generated 10^4 row catalog"""
+    rng = random.Random(SEED)
+    requirements = [(ranking, rng.uniform(0, 50), rng.uniform(0, 10000))
+                    for _ in range(500) for ranking in motor_utils.CANDIDATE_RANKINGS]
+
+    with tempfile.TemporaryDirectory(prefix="bench-catalog-") as workdir:
+        path = os.path.join(workdir, motor_utils.MOTOR_CATALOG_CSV)
+        write_catalog(path, 10000, seed=SEED, duplicate_rate=0.05, power_jitter=0.3)
+        motor_catalog = motor_utils.get_motor_catalog(path)
+        with redirect_stdout(io.StringIO()):
+            return measure(lambda r: motor_catalog.top_k(r[1], r[2], 10, r[0]), requirements)
+
+def case_csv_export():
+    """Streaming CSV export of sized designs, and the GUI's table export"""
+    with redirect_stdout(io.StringIO()):
+        designs = [(params, evaluate_design(params)) for params in random_designs(2000)]
+    records = [design_record(params, design) for params, design in designs]
+
+    with tempfile.TemporaryDirectory(prefix="bench-export-") as workdir:
+        start = time.perf_counter()
+        export_records(records, os.path.join(workdir, "results.csv"))
+        elapsed = time.perf_counter() - start
+    result = measure(lambda d: write_export_csv(d[1], io.StringIO()), designs)
+    result['stream_rows_per_sec'] = len(records) / elapsed
+    return result
+
+CASES = {
+    'recompute_headless': case_recompute_headless,
+    'recompute_gui': case_recompute_gui,
+    'batch_sweep': case_batch_sweep,
+    'select_batch': case_select_batch,
+    'top_k_candidates': case_top_k_candidates,
+    'csv_export': case_csv_export
+}
+for size in CATALOG_SIZES:
+    CASES[f"get_motor_specs_{size}"] = (lambda size: lambda: case_get_motor_specs(size))(size)
+
+def run_case(name):
+    """Run one case in this process and print its result as JSON"""
+    os.chdir(REPO_DIR)
+    result = CASES[name]()
+    if result is not None:
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result['peak_rss_mb'] = rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    print(json.dumps(result))
+
+def run_isolated(name):
+    """Run a case in a fresh interpreter so its peak memory and warm-up are its own"""
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--case", name],
+                          capture_output=True, text=True, cwd=REPO_DIR)
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def run_repeated(name, repeats=REPEATS):
+    """The median run by throughput of repeats isolated runs, with the range of throughputs seen"""
+    runs = [run_isolated(name) for _ in range(repeats)]
+    # Skipped cases print null and failed ones carry an error instead of a throughput
+    unmeasured = [run for run in runs if not run or 'ops_per_sec' not in run]
+    if unmeasured:
+        return unmeasured[0]
+    runs.sort(key=lambda run: run['ops_per_sec'])
+    result = dict(runs[len(runs) // 2])
+    result['repeats'] = repeats
+    result['ops_per_sec_range'] = [runs[0]['ops_per_sec'], runs[-1]['ops_per_sec']]
+    return result
+
+def compare(results, baseline, threshold):
+    """List cases whose throughput fell more than threshold below the baseline"""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get('results', {}).get(name)
+        if not result or not expected or 'ops_per_sec' not in result or 'ops_per_sec' not in expected:
+            continue
+        ratio = result['ops_per_sec'] / expected['ops_per_sec']
+        if ratio < 1 - threshold:
+            regressions.append(f"{name}: {result['ops_per_sec']:.1f} ops/s is {(1 - ratio) * 100:.0f}% "
+                               f"below the baseline {expected['ops_per_sec']:.1f} ops/s")
+    return regressions
+
+def main():
+    """Run the benchmark suite, print JSON and compare against the stored baseline"""
+    parser = argparse.ArgumentParser(description="Benchmarks for catalog loading, selection, the engine and export")
+    parser.add_argument("--case", choices=sorted(CASES), help=argparse.SUPPRESS)
+    parser.add_argument("--only", action="append", choices=sorted(CASES), help="run only these cases")
+    parser.add_argument("--skip-large", action="store_true", help="skip the 10^6 row catalog")
+    parser.add_argument("--baseline", default=BASELINE_JSON)
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--repeats", type=int, default=REPEATS, help=f"isolated runs per case (default {REPEATS})")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("-o", "--output", help="also write the results JSON to this file")
+    args = parser.parse_args()
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+
+    if args.case:
+        run_case(args.case)
+        return
+
+    names = args.only or list(CASES)
+    if args.skip_large:
+        names = [name for name in names if name != f"get_motor_specs_{CATALOG_SIZES[-1]}"]
+
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'repeats': args.repeats,
+        'results': {}
+    }
+    for name in names:
+        print(f"Running {name}...", file=sys.stderr)
+        report['results'][name] = run_repeated(name, args.repeats)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one", file=sys.stderr)
+        return
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(report['results'], baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import ast
+import operator
+import threading
+from collections import OrderedDict
+from itertools import repeat
+
+# Catalog columns usable in filter expressions, by kind (see read_motor_catalog)
+NUMERIC_COLUMNS = ('power_rating', 'motor_weight', 'rated_rpm', 'rated_torque', 'input_voltage',
+                   'flange_size', 'price')
+TEXT_COLUMNS = ('voltage_type', 'model_name', 'company_name', 'link')
+
+# Compiled expressions kept by text
+FILTER_CACHE_SIZE = 256
+
+# A comparison of column against value maps value's method over the column; keyed by the column's side
+COMPARISONS = {
+    ast.Eq: '__eq__',
+    ast.NotEq: '__ne__',
+    ast.Lt: '__gt__',
+    ast.LtE: '__ge__',
+    ast.Gt: '__lt__',
+    ast.GtE: '__le__'
+}
+
+# The same comparison with the operands swapped
+SWAPPED = {ast.Eq: ast.Eq, ast.NotEq: ast.NotEq, ast.Lt: ast.Gt, ast.LtE: ast.GtE, ast.Gt: ast.Lt, ast.GtE: ast.LtE}
+
+class CatalogFilter:
+    """A filter expression parsed once into a predicate tree
+
+    The tree is made of ('and', [nodes]), ('or', [nodes]), ('not', node) and
+    ('compare', column, method, value) leaves. mask() evaluates it over a
+    catalog's columns: each leaf becomes an int with one byte per motor,
+    computed in C by translating a dictionary encoded column or by mapping
+    a bound comparison over the column, so 'and', 'or' and 'not' are
+    single big-integer operations.
+    """
+
+    def __init__(self, expression, tree):
+        self.expression = expression
+        self.tree = tree
+
+    def mask(self, motor_catalog):
+        """Int with byte i set to 1 when motor i of the catalog passes"""
+        return evaluate_mask(self.tree, motor_catalog)
+
+    def __repr__(self):
+        return f"CatalogFilter({self.expression!r})"
+
+def evaluate_mask(node, motor_catalog):
+    kind = node[0]
+    if kind == 'compare':
+        _, column, method, value = node
+        return motor_catalog.column_mask(column, method, value)
+    if kind == 'not':
+        return motor_catalog.all_rows_mask() ^ evaluate_mask(node[1], motor_catalog)
+    masks = [evaluate_mask(child, motor_catalog) for child in node[1]]
+    combined = masks[0]
+    for mask in masks[1:]:
+        combined = combined & mask if kind == 'and' else combined | mask
+    return combined
+
+def encode_column(values):
+    """Dictionary encoding of a column as (distinct values, bytes of one code per value), or None
+
+    Columns with more than 256 distinct values cannot be coded in a byte.
+    """
+    codes = {}
+    for value in values:
+        if value not in codes:
+            if len(codes) == 256:
+                return None
+            codes[value] = len(codes)
+    return list(codes), bytes(map(codes.__getitem__, values))
+
+def leaf_matches(column, encoded, method, value):
+    """Bytes of 1 and 0, one per motor, for a leaf of the predicate tree
+
+    A dictionary encoded column compares only its distinct values and then
+    translates the code bytes through the result, all in C.
+    """
+    if encoded is None:
+        return column_matches(column, method, value)
+    distinct, codes = encoded
+    matches = column_matches(distinct, method, value)
+    return codes.translate(matches + bytes(256 - len(matches)))
+
+def column_matches(values, method, value):
+    """Bytes of 1 and 0, one per value, from one comparison mapped over values"""
+    if method == 'contains':
+        return bytes(map(operator.contains, values, repeat(value)))
+    if method == 'in':
+        return bytes(map(value.__contains__, values))
+    return bytes(map(getattr(value, method), values))
+
+def constant(node, column):
+    """The literal compared with column, converted to the column's type"""
+    negative = False
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        negative = isinstance(node.op, ast.USub)
+        node = node.operand
+        if not (isinstance(node, ast.Constant) and type(node.value) in (int, float)):
+            raise ValueError("Only numbers can be negated")
+    if not isinstance(node, ast.Constant) or type(node.value) not in (int, float, str):
+        raise ValueError(f"{column} can only be compared with a number or a quoted string")
+    value = node.value
+    if column in NUMERIC_COLUMNS:
+        if isinstance(value, str):
+            raise ValueError(f"{column} is a number; compare it without quotes")
+        return -float(value) if negative else float(value)
+    if not isinstance(value, str):
+        raise ValueError(f"{column} is text; compare it with a quoted string")
+    return value
+
+def column_name(node):
+    if not isinstance(node, ast.Name):
+        return None
+    if node.id not in NUMERIC_COLUMNS and node.id not in TEXT_COLUMNS:
+        raise ValueError(f"Unknown column {node.id}; use one of {', '.join(NUMERIC_COLUMNS + TEXT_COLUMNS)}")
+    return node.id
+
+def comparison(left, op, right):
+    """Predicate tree leaf of one comparison between a column and a literal"""
+    column = column_name(left)
+    if isinstance(op, (ast.In, ast.NotIn)):
+        if column is not None:
+            if not isinstance(right, (ast.Tuple, ast.List, ast.Set)):
+                raise ValueError(f"'{column} in' needs a list of values, e.g. {column} in (1, 2)")
+            leaf = ('compare', column, 'in', frozenset(constant(element, column) for element in right.elts))
+        else:
+            column = column_name(right)
+            if column not in TEXT_COLUMNS:
+                raise ValueError("'in' needs a column and a list, or a quoted string and a text column")
+            leaf = ('compare', column, 'contains', constant(left, column))
+        return ('not', leaf) if isinstance(op, ast.NotIn) else leaf
+
+    if type(op) not in COMPARISONS:
+        raise ValueError(f"Unsupported comparison {type(op).__name__}")
+    if column is None:
+        # Literal on the left: compare the other way round
+        column = column_name(right)
+        if column is None:
+            raise ValueError("Every comparison needs a column on one side")
+        left, op, right = right, SWAPPED[type(op)](), left
+    if column_name(right) is not None:
+        raise ValueError("Columns can only be compared with literals")
+    return ('compare', column, COMPARISONS[type(op)], constant(right, column))
+
+def build_tree(node):
+    if isinstance(node, ast.BoolOp):
+        return ('and' if isinstance(node.op, ast.And) else 'or', [build_tree(value) for value in node.values])
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return ('not', build_tree(node.operand))
+    if isinstance(node, ast.Compare):
+        # Chained comparisons such as 100 <= power_rating <= 400 are joined with and
+        operands = [node.left] + node.comparators
+        leaves = [comparison(operands[i], op, operands[i + 1]) for i, op in enumerate(node.ops)]
+        return leaves[0] if len(leaves) == 1 else ('and', leaves)
+    raise ValueError(f"Unsupported expression: {ast.unparse(node)}")
+
+# Compiled filters by expression text, most recently used last
+compiled_filters = OrderedDict()
+compiled_lock = threading.Lock()
+
+def compile_filter(expression):
+    """Parse a filter expression such as 'voltage_type == "DC" and flange_size <= 80'
+
+    Supports comparisons (chained too) of catalog columns with numbers or
+    quoted strings, 'in' against a list of values, '"text" in column' for
+    substrings of text columns, and 'and', 'or', 'not' and parentheses.
+    Raises ValueError for anything else. Filters are cached by text.
+    """
+    expression = expression.strip()
+    with compiled_lock:
+        compiled = compiled_filters.get(expression)
+        if compiled is not None:
+            compiled_filters.move_to_end(expression)
+            return compiled
+    try:
+        parsed = ast.parse(expression, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid filter expression: {e.msg}")
+    compiled = CatalogFilter(expression, build_tree(parsed.body))
+    with compiled_lock:
+        compiled_filters[expression] = compiled
+        if len(compiled_filters) > FILTER_CACHE_SIZE:
+            compiled_filters.popitem(last=False)
+    return compiled
@@ -0,0 +1,146 @@
+import argparse
+import csv
+import random
+import sys
+
+# Column layout of the vendor catalog, including its trailing spaces
+CATALOG_COLUMNS = ['', 'Power Rating (Watts)', 'Weight (kg)', 'Rated RPM ', 'Rated Torque', 'Input voltage',
+                   'Voltage Type', 'Model ', 'Flange Size', 'Company Name', 'Link', 'Prices']
+
+# Standard servo power steps (W) and the flange size (mm) usually paired with them
+POWER_STEPS = (
+    (50, 40), (100, 40), (200, 60), (400, 60), (600, 60), (750, 80), (1000, 80), (1050, 110),
+    (1250, 110), (1500, 110), (1550, 130), (1800, 130), (2000, 130), (2350, 130), (3000, 130),
+    (3800, 130), (5000, 180), (7500, 180), (11000, 180), (15000, 220)
+)
+
+RATED_RPMS = (3000, 3000, 3000, 2000, 1500)
+
+# name: (link, voltage type, input voltages, model prefix)
+VENDOR_PROFILES = {
+    'Lunyee Industries': ("https://www.lunyee.com/static/pdf/Servo-Motor-Catalog.pdf", 'AC', (220,), "DNMA"),
+    'WWW.ZLINGKJ.COM': ("https://www.zlingkj.com/", 'DC', (24, 36, 48), "ZLAC"),
+    'DMKE - cn-bldc.com': ("https://www.cn-bldc.com/list-47-1.html", 'DC', (24, 48, 72), "D"),
+}
+
+# Vendor mix of the shipped catalog
+DEFAULT_VENDOR_MIX = {'Lunyee Industries': 12, 'WWW.ZLINGKJ.COM': 12, 'DMKE - cn-bldc.com': 29}
+
+# Earlier rows kept around to be repeated as duplicates
+DUPLICATE_POOL = 1000
+
+def vendor_profile(name):
+    """Profile of a known vendor, or a generic one for any other name"""
+    if name in VENDOR_PROFILES:
+        return VENDOR_PROFILES[name]
+    prefix = ''.join(c for c in name.upper() if c.isalnum())[:4] or "GEN"
+    return ("", 'AC', (220, 380), prefix)
+
+def motor_row(rng, index, vendor, power_jitter=0.0, missing_price_rate=0.0, missing_weight_rate=0.0):
+    """One catalog row with the unit suffixes and formatting of the vendor CSV"""
+    link, voltage_type, voltages, prefix = vendor_profile(vendor)
+    power, flange = rng.choice(POWER_STEPS)
+    if power_jitter:
+        power = max(1.0, power * (1 + rng.uniform(-power_jitter, power_jitter)))
+    rpm = rng.choice(RATED_RPMS)
+    torque = power * 9.55 / rpm
+    weight = (0.25 + power / 400) * rng.uniform(0.75, 1.3)
+    price = (60 + power * 0.35) * rng.uniform(0.7, 1.5)
+
+    if rng.random() < missing_weight_rate:
+        weight_text = "N/A"
+    elif rng.random() < 0.05:
+        weight_text = f"{weight:.2f}"  # Some vendors leave out the unit
+    else:
+        weight_text = f"{weight:.2f} Kg"
+
+    return [
+        '',
+        f"{power:.2f} W",
+        weight_text,
+        rpm,
+        f"{torque:.2f} Nm",
+        rng.choice(voltages),
+        voltage_type,
+        f"{prefix}{flange}-{int(power):05d}-{index:07d}",
+        f"{flange:.2f} mm",
+        vendor,
+        link,
+        "" if rng.random() < missing_price_rate else f"{price:.2f}"
+    ]
+
+def generate_rows(rows, seed=0, vendor_mix=None, duplicate_rate=0.0, power_jitter=0.0,
+                  missing_price_rate=0.5, missing_weight_rate=0.05):
+    """Yield catalog rows one at a time; the same arguments always give the same rows
+
+    duplicate_rate is the fraction of rows that repeat an earlier row
+    exactly. power_jitter spreads ratings around the standard steps (0 keeps
+    the many equal ratings of real catalogs, which exercises the heaviest-motor
+    tie break).
+    """
+    rng = random.Random(seed)
+    vendor_mix = vendor_mix or DEFAULT_VENDOR_MIX
+    vendors = list(vendor_mix)
+    weights = [vendor_mix[name] for name in vendors]
+    pool = []
+    for index in range(rows):
+        if pool and rng.random() < duplicate_rate:
+            row = rng.choice(pool)
+        else:
+            vendor = rng.choices(vendors, weights)[0]
+            row = motor_row(rng, index, vendor, power_jitter, missing_price_rate, missing_weight_rate)
+            if len(pool) < DUPLICATE_POOL:
+                pool.append(row)
+            else:
+                pool[rng.randrange(DUPLICATE_POOL)] = row
+        yield row
+
+def write_catalog(path, rows, **options):
+    """Write a generated catalog CSV to path ('-' for stdout); options as for generate_rows"""
+    f = sys.stdout if path == "-" else open(path, 'w', newline='', encoding='utf-8')
+    try:
+        writer = csv.writer(f)
+        writer.writerow(CATALOG_COLUMNS)
+        writer.writerows(generate_rows(rows, **options))
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+def parse_vendor_mix(specs):
+    """Parse 'name=weight' arguments into a vendor mix"""
+    mix = {}
+    for spec in specs:
+        name, _, weight = spec.rpartition('=')
+        if not name:
+            name, weight = spec, "1"
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Bad vendor weight in {spec!r}")
+    return mix
+
+def main():
+    """Write a synthetic motor catalog in the layout of the vendor CSV"""
+    parser = argparse.ArgumentParser(description="Generate a realistic synthetic motor catalog CSV")
+    parser.add_argument("rows", type=int, help="number of motors")
+    parser.add_argument("-o", "--output", default="-", help="output CSV (stdout by default)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--vendor", action="append", default=[], metavar="NAME=WEIGHT",
+                        help="vendor and its share of rows; repeat for a mix (defaults to the shipped mix)")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="fraction of rows repeating an earlier row")
+    parser.add_argument("--power-jitter", type=float, default=0.0,
+                        help="relative spread of power ratings around the standard steps")
+    parser.add_argument("--missing-price-rate", type=float, default=0.5, help="fraction of rows without a price")
+    parser.add_argument("--missing-weight-rate", type=float, default=0.05, help="fraction of rows with weight N/A")
+    args = parser.parse_args()
+
+    try:
+        vendor_mix = parse_vendor_mix(args.vendor)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    write_catalog(args.output, args.rows, seed=args.seed, vendor_mix=vendor_mix or None,
+                  duplicate_rate=args.duplicate_rate, power_jitter=args.power_jitter,
+                  missing_price_rate=args.missing_price_rate, missing_weight_rate=args.missing_weight_rate)
+
+if __name__ == "__main__":
+    main()
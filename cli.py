@@ -0,0 +1,101 @@
+import argparse
+import json
+import sys
+from contextlib import redirect_stdout
+from arm_model import PARAMETER_NAMES, evaluate_design
+from motor_utils import MOTOR_CATALOG_CSV, get_motor_catalog, empty_motor_specs
+from catalog_filter import compile_filter
+from design_import import parse_design_row
+from report import write_export_csv, design_summary
+from result_cache import ResultCache
+
+def read_design(path):
+    """Read a JSON design mapping parameter names to values; '-' reads stdin, None gives the defaults
+
+    Values come back as text for parse_design_row(); null values take the
+    defaults. Raises ValueError when the file is not a JSON object.
+    """
+    if path is None:
+        return {}
+    if path == "-":
+        raw = json.load(sys.stdin)
+    else:
+        with open(path, encoding='utf-8') as f:
+            raw = json.load(f)
+    if not isinstance(raw, dict):
+        raise ValueError("A design must be a JSON object mapping parameter names to values")
+    unknown = sorted(set(raw) - set(PARAMETER_NAMES))
+    if unknown:
+        print(f"Ignoring unknown parameters: {', '.join(unknown)}", file=sys.stderr)
+    return {name: "" if value is None else str(value) for name, value in raw.items() if name in PARAMETER_NAMES}
+
+def size_design(raw, catalog=MOTOR_CATALOG_CSV, cache=None, safety_factors=(), motor_filter=None):
+    """Parse a raw design and size it against a catalog; returns (params, design)
+
+    With a ResultCache the design is looked up before it is calculated.
+    safety_factors adds uniform safety factor scenarios, and motor_filter
+    restricts selection to the motors passing a filter expression (neither
+    is cached). Raises ValueError for a value that is not a valid number,
+    as parse_design_row() does.
+    """
+    params = parse_design_row(raw)
+    if cache is not None and not safety_factors and not motor_filter:
+        return params, cache.evaluate(params, catalog)
+    motor_catalog = get_motor_catalog(catalog)
+    if motor_catalog and motor_filter:
+        motor_catalog = motor_catalog.filtered(motor_filter)
+
+    def select(motor_num, torque, power):
+        if not motor_catalog:
+            return empty_motor_specs(motor_num)
+        return motor_catalog.select(motor_num, torque, power)
+
+    return params, evaluate_design(params, select, safety_factors=safety_factors)
+
+def main():
+    """Size a design without the GUI and print the results as JSON or CSV"""
+    parser = argparse.ArgumentParser(description="Headless torque, power and motor sizing")
+    parser.add_argument("design", nargs="?",
+                        help="JSON file mapping parameter names to values, '-' for stdin (defaults otherwise)")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("-o", "--output", help="write to this file instead of stdout")
+    parser.add_argument("--catalog", default=MOTOR_CATALOG_CSV, help="motor catalog CSV")
+    parser.add_argument("--cache", metavar="DB", help="reuse results from this SQLite result cache")
+    parser.add_argument("--safety-factor", type=float, action="append", default=[], metavar="SF",
+                        help="also size every motor with this safety factor (JSON output); repeatable")
+    parser.add_argument("--filter", metavar="EXPR",
+                        help="select only motors passing this expression, e.g. 'voltage_type == \"DC\" and flange_size <= 80'")
+    args = parser.parse_args()
+    if any(not sf >= 0 for sf in args.safety_factor):
+        parser.error("--safety-factor must not be negative")
+    if args.filter:
+        try:
+            compile_filter(args.filter)
+        except ValueError as e:
+            parser.error(str(e))
+
+    # Catalog and selection diagnostics go to stderr so stdout stays machine-readable
+    with redirect_stdout(sys.stderr):
+        cache = ResultCache(args.cache) if args.cache else None
+        try:
+            params, design = size_design(read_design(args.design), args.catalog, cache, args.safety_factor,
+                                         args.filter)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        finally:
+            if cache is not None:
+                cache.close()
+
+    out = open(args.output, "w", newline="", encoding='utf-8') if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            write_export_csv(design, out)
+        else:
+            json.dump(design_summary(params, design), out, indent=2, ensure_ascii=False)
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
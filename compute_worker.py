@@ -0,0 +1,77 @@
+import queue
+import threading
+import traceback
+
+class ComputeWorker:
+    """Run recalculations on a background thread and hand back only the newest result
+
+    submit() takes an immutable snapshot of the inputs and tags it with a
+    generation number. The worker always picks up the newest snapshot, so
+    snapshots superseded while it was busy are never computed, and results
+    of stale generations are discarded. Results are delivered on the Tk
+    thread by polling with root.after while work is outstanding.
+    """
+
+    def __init__(self, root, compute, on_result, poll_ms=10):
+        self.root = root
+        self.compute = compute
+        self.on_result = on_result
+        self.poll_ms = poll_ms
+        self.generation = 0
+        self.delivered = 0
+        self.job = None
+        self.condition = threading.Condition()
+        self.results = queue.Queue()
+        self.polling = False
+        self.thread = threading.Thread(target=self.work, name="compute-worker", daemon=True)
+        self.thread.start()
+
+    def submit(self, snapshot):
+        """Queue a snapshot for computation, replacing any snapshot not yet started"""
+        with self.condition:
+            self.generation += 1
+            self.job = (self.generation, snapshot)
+            self.condition.notify()
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_ms, self.poll)
+        return self.generation
+
+    def is_stale(self, generation):
+        return generation != self.generation
+
+    def work(self):
+        """Worker thread loop; never touches Tk"""
+        while True:
+            with self.condition:
+                while self.job is None:
+                    self.condition.wait()
+                generation, snapshot = self.job
+                self.job = None
+            try:
+                result = self.compute(snapshot)
+            except Exception as e:
+                print(f"Error in background calculation: {e}")
+                traceback.print_exc()
+                result = None
+            self.results.put((generation, result))
+
+    def poll(self):
+        """Deliver the latest finished result on the Tk thread"""
+        latest = None
+        while True:
+            try:
+                generation, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.delivered = max(self.delivered, generation)
+            if not self.is_stale(generation) and result is not None:
+                latest = result
+
+        if latest is not None:
+            self.on_result(latest)
+
+        if self.delivered < self.generation:
+            self.root.after(self.poll_ms, self.poll)
+        else:
+            self.polling = False
@@ -0,0 +1,265 @@
+import argparse
+import csv
+import math
+import sys
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import redirect_stdout
+from arm_model import PARAMETER_NAMES, INTEGER_PARAMETERS, DEFAULT_PARAMETERS, ParameterSnapshot, evaluate_design
+from motor_utils import MOTOR_CATALOG_CSV, get_motor_catalog, empty_motor_specs
+from result_export import EXPORT_FORMATS, record_columns, design_record, open_result_writer
+from result_cache import ResultCache
+
+# Designs handed to a worker process at a time
+CHUNK_ROWS = 512
+
+# Recent designs each sizer remembers, so repeated rows skip the engine
+SIZER_MEMO_SIZE = 1024
+
+# Invalid rows listed on stderr before the rest are only counted
+REPORTED_ERRORS = 20
+
+class DesignSizer:
+    """Sizes one design after another against a warm catalog
+
+    Rows of a design table or a sweep usually differ in a few inputs, so
+    each design is evaluated incrementally from the previous one, and
+    exact repeats come from a small memo. With a ResultCache, designs are
+    looked up there instead.
+    """
+
+    def __init__(self, catalog_csv=MOTOR_CATALOG_CSV, cache=None):
+        self.catalog_csv = catalog_csv
+        self.cache = cache
+        self.motor_catalog = get_motor_catalog(catalog_csv)
+        self.params = None
+        self.design = None
+        self.memo = OrderedDict()
+
+    def select(self, motor_num, torque, power):
+        if not self.motor_catalog:
+            return empty_motor_specs(motor_num)
+        return self.motor_catalog.select(motor_num, torque, power)
+
+    def size(self, params):
+        """evaluate_design() of a ParameterSnapshot"""
+        if self.cache is not None:
+            return self.cache.evaluate(params, self.catalog_csv)
+        design = self.memo.get(params)
+        if design is not None:
+            self.memo.move_to_end(params)
+            return design
+        if self.design is None:
+            design = evaluate_design(params, self.select)
+        else:
+            design = evaluate_design(params, self.select, previous=self.design,
+                                     changed=params.changed_from(self.params))
+        self.params = params
+        self.design = design
+        self.memo[params] = design
+        if len(self.memo) > SIZER_MEMO_SIZE:
+            self.memo.popitem(last=False)
+        return design
+
+def parse_design_row(row):
+    """ParameterSnapshot of a table row of name -> text; empty or missing cells take the defaults
+
+    Unlike the GUI, which quietly falls back to defaults, a cell that is not
+    a finite, non-negative number raises ValueError. Whole numbers written as
+    floats (e.g. "3000.0" from a spreadsheet) are accepted for RPM and
+    reduction ratios.
+    """
+    values = {}
+    for name in PARAMETER_NAMES:
+        text = row.get(name)
+        text = text.strip() if text else ""
+        if not text:
+            text = DEFAULT_PARAMETERS[name]
+        try:
+            value = float(text)
+        except ValueError:
+            raise ValueError(f"{name} is not a number: {text!r}")
+        if not math.isfinite(value):
+            raise ValueError(f"{name} is not a finite number: {text!r}")
+        if name in INTEGER_PARAMETERS:
+            if not value.is_integer():
+                raise ValueError(f"{name} must be a whole number: {text!r}")
+            value = int(value)
+        values[name] = value
+    return ParameterSnapshot(values)
+
+def parse_design_object(raw):
+    """ParameterSnapshot of a JSON design object; missing or null values take the defaults
+
+    Raises ValueError for anything parse_design_row() rejects, and for
+    names that are not parameters, so a misspelled "l3" is not quietly
+    sized with the default L3.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("expected a JSON object mapping parameter names to values")
+    unknown = sorted(set(raw) - set(PARAMETER_NAMES))
+    if unknown:
+        raise ValueError(f"unknown parameters: {', '.join(unknown)}")
+    return parse_design_row({name: "" if value is None else str(value) for name, value in raw.items()})
+
+# Per-process sizer of the worker pool, set up by init_worker
+worker_sizer = None
+
+def init_worker(catalog_csv, cache_path):
+    global worker_sizer
+    cache = ResultCache(cache_path) if cache_path else None
+    with redirect_stdout(sys.stderr):
+        worker_sizer = DesignSizer(catalog_csv, cache)
+
+def size_chunk(chunk, output, sizer=None, parse=parse_design_row):
+    """Size a chunk of (row number, row) pairs; returns (row number, output or None, error or None) triples
+
+    parse(row) returns the row's ParameterSnapshot or raises ValueError, and
+    output(params, design, row) turns a sized design into what the caller
+    writes. Both must be module level functions or picklable objects when
+    workers are used.
+    """
+    sizer = sizer or worker_sizer
+    sized = []
+    with redirect_stdout(sys.stderr):
+        for number, row in chunk:
+            try:
+                params = parse(row)
+            except ValueError as e:
+                sized.append((number, None, str(e)))
+                continue
+            sized.append((number, output(params, sizer.size(params), row), None))
+    if sizer.cache is not None:
+        sizer.cache.flush()
+    return sized
+
+def chunked(rows, size=CHUNK_ROWS):
+    """Group an iterable of rows into numbered chunks, 1-based"""
+    chunk = []
+    for number, row in enumerate(rows, 1):
+        chunk.append((number, row))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def size_rows(rows, output, catalog_csv=MOTOR_CATALOG_CSV, cache_path=None, workers=1, ordered=True,
+              chunk_rows=CHUNK_ROWS, parse=parse_design_row):
+    """Size a stream of rows, yielding size_chunk() triples as they finish
+
+    With workers > 1 chunks are sized in that many processes, each with its
+    own warm catalog. At most two chunks per worker are in flight, so memory
+    stays bounded however long the input is, and finished chunks are yielded
+    as soon as they are next in line. ordered=False yields chunks as they
+    complete instead of in input order.
+    """
+    if workers <= 1:
+        cache = ResultCache(cache_path) if cache_path else None
+        try:
+            with redirect_stdout(sys.stderr):
+                sizer = DesignSizer(catalog_csv, cache)
+            for chunk in chunked(rows, chunk_rows):
+                yield from size_chunk(chunk, output, sizer, parse)
+        finally:
+            if cache is not None:
+                cache.close()
+        return
+
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(catalog_csv, cache_path)) as pool:
+        pending = deque()
+        for chunk in chunked(rows, chunk_rows):
+            pending.append(pool.submit(size_chunk, chunk, output, None, parse))
+            while len(pending) >= 2 * workers:
+                yield from next_finished(pending, ordered)
+            for sized in drain_finished(pending, ordered):
+                yield from sized
+        while pending:
+            yield from next_finished(pending, ordered)
+
+def next_finished(pending, ordered):
+    """Remove and return the results of the oldest chunk, or of any finished one when not ordered"""
+    if ordered:
+        return pending.popleft().result()
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    future = next(iter(done))
+    pending.remove(future)
+    return future.result()
+
+def drain_finished(pending, ordered):
+    """Remove and yield the results of the chunks that are already done and, when ordered, next in line"""
+    if ordered:
+        while pending and pending[0].done():
+            yield pending.popleft().result()
+        return
+    for future in [future for future in pending if future.done()]:
+        pending.remove(future)
+        yield future.result()
+
+def read_design_table(f):
+    """DictReader over a CSV design table, plus its columns that are not parameters"""
+    reader = csv.DictReader(f)
+    fields = reader.fieldnames or []
+    if not any(name in PARAMETER_NAMES for name in fields):
+        raise ValueError(f"No parameter columns found; expected some of {', '.join(PARAMETER_NAMES)}")
+    missing = [name for name in PARAMETER_NAMES if name not in fields]
+    if missing:
+        print(f"Columns not in the table take their defaults: {', '.join(missing)}", file=sys.stderr)
+    return reader, [name for name in fields if name and name not in PARAMETER_NAMES]
+
+class RecordOutput:
+    """Picklable output function: the table row number, its extra columns, then design_record()"""
+
+    def __init__(self, extra_columns):
+        self.extra_columns = extra_columns
+
+    def __call__(self, params, design, row):
+        record = {name: row.get(name) or "" for name in self.extra_columns}
+        record.update(design_record(params, design))
+        return record
+
+def import_designs(f, path, fmt=None, catalog_csv=MOTOR_CATALOG_CSV, cache_path=None, workers=1):
+    """Size every row of an open CSV design table and stream one result row per design to path
+
+    Returns (rows written, [(row number, error)] of the rows that could not be read).
+    """
+    reader, extra_columns = read_design_table(f)
+    columns = [('row', 'int')] + [(name, 'str') for name in extra_columns] + record_columns()
+    errors = []
+    with open_result_writer(path, columns, fmt) as writer:
+        for number, record, error in size_rows(reader, RecordOutput(extra_columns), catalog_csv, cache_path, workers):
+            if error is not None:
+                errors.append((number, error))
+                continue
+            record['row'] = number
+            writer.write(record)
+    return writer.rows, errors
+
+def main():
+    """Size a CSV table of designs (one per row) and write one result row per design"""
+    parser = argparse.ArgumentParser(description="Bulk import of design tables into the headless engine")
+    parser.add_argument("designs", help="CSV with one design per row and parameter names as headers, '-' for stdin")
+    parser.add_argument("output", help="output path (.csv, .csv.gz, .jsonl, .parquet, or a directory for .npy columns)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="override the format implied by the output path")
+    parser.add_argument("--catalog", default=MOTOR_CATALOG_CSV, help="motor catalog CSV")
+    parser.add_argument("--cache", metavar="DB", help="reuse results from this SQLite result cache")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="worker processes (default 1)")
+    args = parser.parse_args()
+
+    f = sys.stdin if args.designs == "-" else open(args.designs, newline='', encoding='utf-8-sig')
+    try:
+        rows, errors = import_designs(f, args.output, args.format, args.catalog, args.cache, args.workers)
+    except (RuntimeError, ValueError) as e:
+        parser.error(str(e))
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+    for number, error in errors[:REPORTED_ERRORS]:
+        print(f"Row {number} skipped: {error}", file=sys.stderr)
+    if len(errors) > REPORTED_ERRORS:
+        print(f"... and {len(errors) - REPORTED_ERRORS} more invalid rows", file=sys.stderr)
+    print(f"Sized {rows} designs into {args.output}" + (f"; {len(errors)} rows skipped" if errors else ""))
+
+if __name__ == "__main__":
+    main()
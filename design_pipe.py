@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+from design_import import parse_design_object, size_rows
+from motor_utils import MOTOR_CATALOG_CSV
+from report import design_summary
+
+# Lines handed to a worker process at a time; without workers every line is sized as soon as it is read
+PIPE_CHUNK_ROWS = 16
+
+def parse_design_line(line):
+    """ParameterSnapshot of one JSON Lines design; missing or null values take the defaults
+
+    Raises ValueError for a line that is not a JSON object, names an unknown
+    parameter or holds an invalid value (see parse_design_object()).
+    """
+    line = line.strip()
+    if not line:
+        raise ValueError("empty line")
+    try:
+        raw = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"not valid JSON: {e}")
+    return parse_design_object(raw)
+
+def summary_json(params, design, line):
+    """Compact JSON text of design_summary(); made in the worker so the writer only joins lines"""
+    return json.dumps(design_summary(params, design), separators=(',', ':'), ensure_ascii=False)
+
+def pipe_designs(lines, out, catalog_csv=MOTOR_CATALOG_CSV, cache_path=None, workers=1, ordered=True,
+                 chunk_rows=None):
+    """Size JSON Lines designs from lines and write one JSON result line per input line to out
+
+    Each output line is {"line": n, "result": design_summary()} or, for a
+    line that could not be read, {"line": n, "error": message}, where n is
+    the 1-based input line number. Lines are written and flushed as they
+    are sized, so the pipe runs in constant memory. Returns (designs sized,
+    lines rejected).
+    """
+    if chunk_rows is None:
+        chunk_rows = 1 if workers <= 1 else PIPE_CHUNK_ROWS
+    sized = rejected = 0
+    for number, text, error in size_rows(lines, summary_json, catalog_csv, cache_path, workers, ordered,
+                                         chunk_rows, parse_design_line):
+        if error is None:
+            out.write(f'{{"line":{number},"result":{text}}}\n')
+            sized += 1
+        else:
+            out.write(json.dumps({'line': number, 'error': error}, separators=(',', ':'), ensure_ascii=False) + "\n")
+            rejected += 1
+        out.flush()
+    return sized, rejected
+
+def main():
+    """Read one JSON design per line on stdin and write one JSON result per line to stdout"""
+    parser = argparse.ArgumentParser(description="JSON Lines sizing pipe: designs on stdin, results on stdout")
+    parser.add_argument("--catalog", default=MOTOR_CATALOG_CSV, help="motor catalog CSV")
+    parser.add_argument("--cache", metavar="DB", help="reuse results from this SQLite result cache")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="worker processes (default 1)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="with workers, write results as they finish instead of in input order")
+    parser.add_argument("--chunk-rows", type=int, metavar="N",
+                        help=f"lines per worker task (default 1 without workers, {PIPE_CHUNK_ROWS} with)")
+    args = parser.parse_args()
+    if args.chunk_rows is not None and args.chunk_rows < 1:
+        parser.error("--chunk-rows must be at least 1")
+
+    # Anything printed while sizing goes to stderr; stdout carries only result lines
+    out = sys.stdout
+    try:
+        with redirect_stdout(sys.stderr):
+            sized, rejected = pipe_designs(sys.stdin, out, args.catalog, args.cache, args.workers,
+                                           not args.unordered, args.chunk_rows)
+    except BrokenPipeError:
+        # The reader went away (e.g. head); stop quietly without a traceback on interpreter exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except (RuntimeError, ValueError) as e:
+        parser.error(str(e))
+    print(f"Sized {sized} designs" + (f"; {rejected} lines rejected" if rejected else ""), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
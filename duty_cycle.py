@@ -0,0 +1,187 @@
+import argparse
+import csv
+import json
+import math
+from motor_utils import load_motor_catalog, empty_motor_specs, motor_specs_from_row
+
+# Servo motors can usually deliver about three times their rated torque
+# for short periods; used when the catalog has no peak torque column.
+PEAK_TORQUE_RATIO = 3.0
+
+class JointDutyAccumulator:
+    """Running RMS/peak/mean statistics for one joint, in constant memory"""
+
+    def __init__(self, motor_num, reduction_ratio=1.0):
+        self.motor_num = motor_num
+        self.reduction_ratio = reduction_ratio if reduction_ratio > 0 else 1.0
+        self.samples = 0
+        self.duration = 0.0
+        self.sum_torque_sq = 0.0
+        self.sum_abs_power = 0.0
+        self.peak_torque = 0.0
+        self.peak_power = 0.0
+        self.peak_rpm = 0.0
+
+    def add(self, torque, rpm, dt=1.0):
+        """Add one sample of joint torque (N⋅m) and motor speed (RPM) lasting dt
+
+        Raises ValueError for a torque or speed that is not finite, or a dt
+        that is not a positive finite duration, which would otherwise
+        corrupt the RMS and mean.
+        """
+        if not math.isfinite(torque):
+            raise ValueError(f"torque must be a finite number, got {torque!r}")
+        if not math.isfinite(rpm):
+            raise ValueError(f"rpm must be a finite number, got {rpm!r}")
+        if not (math.isfinite(dt) and dt > 0):
+            raise ValueError(f"dt must be a positive finite duration, got {dt!r}")
+        # Work on the motor side of the gearbox, like 'Torque Before Reduction'
+        motor_torque = abs(torque) / self.reduction_ratio
+        power = motor_torque * abs(rpm) * 1000 / 9550
+
+        self.samples += 1
+        self.duration += dt
+        self.sum_torque_sq += motor_torque * motor_torque * dt
+        self.sum_abs_power += power * dt
+        if motor_torque > self.peak_torque:
+            self.peak_torque = motor_torque
+        if power > self.peak_power:
+            self.peak_power = power
+        if abs(rpm) > self.peak_rpm:
+            self.peak_rpm = abs(rpm)
+
+    @property
+    def rms_torque(self):
+        return math.sqrt(self.sum_torque_sq / self.duration) if self.duration > 0 else 0.0
+
+    @property
+    def mean_power(self):
+        return self.sum_abs_power / self.duration if self.duration > 0 else 0.0
+
+    def summary(self):
+        """Return the duty cycle figures used for motor sizing"""
+        return {
+            'motor': f"Motor {self.motor_num}",
+            'samples': self.samples,
+            'duration': self.duration,
+            'rms_torque': self.rms_torque,
+            'peak_torque': self.peak_torque,
+            'mean_power': self.mean_power,
+            'peak_power': self.peak_power,
+            'peak_rpm': self.peak_rpm
+        }
+
+def accumulate_duty_cycle(samples, reduction_ratios=None):
+    """Consume (motor_num, torque, rpm[, dt]) samples and return per-joint accumulators
+
+    samples may be any iterable, including a generator reading a file, and is
+    consumed exactly once; only one accumulator per joint is kept in memory.
+    Raises ValueError naming the first sample with an invalid torque, rpm or dt.
+    """
+    reduction_ratios = reduction_ratios or {}
+    accumulators = {}
+    for number, sample in enumerate(samples, 1):
+        motor_num = int(sample[0])
+        acc = accumulators.get(motor_num)
+        if acc is None:
+            acc = JointDutyAccumulator(motor_num, reduction_ratios.get(motor_num, 1.0))
+            accumulators[motor_num] = acc
+        try:
+            if len(sample) > 3:
+                acc.add(sample[1], sample[2], sample[3])
+            else:
+                acc.add(sample[1], sample[2])
+        except ValueError as e:
+            raise ValueError(f"Sample {number}: {e}")
+    return accumulators
+
+def iter_duty_cycle_csv(csv_file):
+    """Yield samples from a CSV with 'motor', 'torque', 'rpm' and optional 'dt' columns
+
+    Raises ValueError naming the line of the first value that is not a
+    number, rather than dropping the row and undersizing the motor.
+    """
+    with open(csv_file, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        missing = [column for column in ('motor', 'torque', 'rpm') if column not in fieldnames]
+        if missing:
+            raise ValueError(f"{csv_file} has no {', '.join(missing)} column")
+        columns = ('motor', 'torque', 'rpm') + (('dt',) if 'dt' in fieldnames else ())
+        for row in reader:
+            sample = ()
+            for column in columns:
+                text = row[column]
+                if text is None:
+                    raise ValueError(f"Line {reader.line_num}: no {column} value")
+                try:
+                    sample += (int(text) if column == 'motor' else float(text),)
+                except ValueError:
+                    raise ValueError(f"Line {reader.line_num}: {column} is not a number: {text!r}")
+            yield sample
+
+def select_motor_for_duty_cycle(summary, motor_num, motor_database=None, peak_ratio=PEAK_TORQUE_RATIO):
+    """Select the smallest motor whose continuous and peak ratings cover the duty cycle
+
+    Continuous ratings (rated torque and power) must cover the RMS torque and
+    mean power; peak ratings (rated values times peak_ratio) must cover the
+    peak torque and peak power.
+    """
+    try:
+        if motor_database is None:
+            motor_database = load_motor_catalog()
+        if not motor_database:
+            return empty_motor_specs(motor_num)
+
+        suitable_motors = [
+            motor for motor in motor_database
+            if motor['rated_torque'] >= summary['rms_torque']
+            and motor['rated_torque'] * peak_ratio >= summary['peak_torque']
+            and motor['power_rating'] >= summary['mean_power']
+            and motor['power_rating'] * peak_ratio >= summary['peak_power']
+        ]
+        if not suitable_motors:
+            print(f"No motor found for Motor {motor_num} with RMS torque {summary['rms_torque']:.3f} N⋅m "
+                  f"and peak torque {summary['peak_torque']:.3f} N⋅m")
+            return empty_motor_specs(motor_num)
+
+        # Smallest sufficient power rating, lighter motor on ties
+        selected_motor = min(suitable_motors, key=lambda x: (x['power_rating'], x['motor_weight']))
+        specs = motor_specs_from_row(motor_num, selected_motor)
+        specs['rated_torque'] = selected_motor['rated_torque']
+        return specs
+
+    except Exception as e:
+        print(f"Error in select_motor_for_duty_cycle for Motor {motor_num}: {e}")
+        return empty_motor_specs(motor_num)
+
+def size_duty_cycle(samples, reduction_ratios=None, peak_ratio=PEAK_TORQUE_RATIO):
+    """Accumulate a duty cycle and select a motor for every joint seen in it"""
+    accumulators = accumulate_duty_cycle(samples, reduction_ratios)
+    motor_database = load_motor_catalog()
+    results = {}
+    for motor_num in sorted(accumulators):
+        summary = accumulators[motor_num].summary()
+        summary['selection'] = select_motor_for_duty_cycle(summary, motor_num, motor_database, peak_ratio)
+        results[motor_num] = summary
+    return results
+
+def main():
+    """Size motors from a duty cycle CSV file"""
+    parser = argparse.ArgumentParser(description="RMS/peak duty cycle motor sizing")
+    parser.add_argument("samples", help="CSV file with motor, torque, rpm and optional dt columns")
+    parser.add_argument("--ratio", type=float, action="append", default=[],
+                        help="gear reduction ratio per joint, given in motor order 1..6")
+    parser.add_argument("--peak-ratio", type=float, default=PEAK_TORQUE_RATIO,
+                        help="peak to rated torque ratio of the motors")
+    args = parser.parse_args()
+
+    reduction_ratios = {i + 1: ratio for i, ratio in enumerate(args.ratio)}
+    try:
+        results = size_duty_cycle(iter_duty_cycle_csv(args.samples), reduction_ratios, args.peak_ratio)
+    except ValueError as e:
+        parser.error(str(e))
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
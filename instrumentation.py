@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+# Most recent timed spans kept for the JSON trace
+TRACE_EVENTS = 100000
+
+class Instrumentation:
+    """Stage timers and counters shared by the engine, the catalog and the GUI
+
+    timer(name) measures a block, count(name) adds to a counter. Counters
+    named '<stage>.hits' and '<stage>.misses' are reported together as a hit
+    rate. With tracing on, every timed span is also kept (up to
+    TRACE_EVENTS) and can be written as a Chrome trace JSON file.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.enabled = True
+        self.tracing = False
+        self.origin = time.perf_counter()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.timers = {}
+            self.counters = {}
+            self.events = deque(maxlen=TRACE_EVENTS)
+
+    def timer(self, name):
+        """Context manager timing a block under name"""
+        return StageTimer(self, name)
+
+    def timed(self, name, function):
+        """Wrap function so every call is timed under name"""
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with self.timer(name):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def record(self, name, start, end):
+        elapsed = end - start
+        with self.lock:
+            stats = self.timers.get(name)
+            if stats is None:
+                self.timers[name] = [1, elapsed, elapsed]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+                if elapsed > stats[2]:
+                    stats[2] = elapsed
+            if self.tracing:
+                self.events.append((name, start, elapsed, threading.get_ident()))
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        """Current timers (ms), counters and hit rates as plain dicts"""
+        with self.lock:
+            timers = {name: list(stats) for name, stats in self.timers.items()}
+            counters = dict(self.counters)
+        rates = {}
+        for name in counters:
+            stage, _, kind = name.rpartition('.')
+            if kind in ('hits', 'misses') and stage not in rates:
+                hits = counters.get(f"{stage}.hits", 0)
+                total = hits + counters.get(f"{stage}.misses", 0)
+                rates[stage] = hits / total if total else 0.0
+        return {
+            'timers': {
+                name: {
+                    'calls': calls,
+                    'total_ms': total * 1000,
+                    'mean_ms': total * 1000 / calls,
+                    'max_ms': longest * 1000
+                }
+                for name, (calls, total, longest) in sorted(timers.items())
+            },
+            'counters': dict(sorted(counters.items())),
+            'hit_rates': rates
+        }
+
+    def dump_trace(self, path):
+        """Write the traced spans as Chrome trace events (chrome://tracing, Perfetto)"""
+        with self.lock:
+            events = list(self.events)
+        trace = {
+            'traceEvents': [
+                {'name': name, 'ph': 'X', 'pid': 1, 'tid': tid,
+                 'ts': (start - self.origin) * 1e6, 'dur': elapsed * 1e6}
+                for name, start, elapsed, tid in events
+            ],
+            'otherData': self.snapshot()
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        return len(events)
+
+class StageTimer:
+    """A timed block; a plain class because it is cheaper than a generator context manager"""
+
+    __slots__ = ('instrumentation', 'name', 'start')
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.instrumentation.enabled:
+            self.instrumentation.record(self.name, self.start, time.perf_counter())
+
+# The process-wide instance used by all modules
+instruments = Instrumentation()
@@ -0,0 +1,302 @@
+import bisect
+import json
+import time
+import tkinter as tk
+from collections import deque
+from tkinter import ttk, messagebox, filedialog
+from recalc_scheduler import FRAME_MS
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open ended
+HISTOGRAM_BOUNDS_MS = (1, 2, 4, 8, 16, 33, 50, 100, 200, 500, 1000)
+
+# Slowest callbacks and latency samples kept for display and export
+SLOW_CALLBACKS = 200
+LATENCY_SAMPLES = 10000
+
+# after callbacks that redraw a matplotlib canvas
+REDRAW_CALLBACKS = {'FigureCanvasTk.draw_idle.<locals>.idle_draw'}
+
+TRACE_MODES = ('write', 'read', 'unset', 'array')
+
+class LatencyHistogram:
+    """Latency samples in ms, bucketed by HISTOGRAM_BOUNDS_MS, with the recent samples kept for percentiles"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.buckets[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, ms)] += 1
+        self.samples.append(ms)
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def bucket_labels(self):
+        labels = [f"<= {bound} ms" for bound in HISTOGRAM_BOUNDS_MS]
+        return labels + [f"> {HISTOGRAM_BOUNDS_MS[-1]} ms"]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': self.max_ms,
+            'histogram': dict(zip(self.bucket_labels(), self.buckets))
+        }
+
+class LatencyProfiler:
+    """Wall time of every Tk callback, and keystroke-to-updated-results latency
+
+    install() replaces tkinter's CallWrapper, through which Tk invokes
+    every Python callback: variable traces, after/after_idle callbacks
+    (including matplotlib's idle redraws), event bindings and widget
+    commands. Callbacks are grouped by category and name; any callback
+    longer than budget_ms is flagged as slow.
+
+    A trace callback starts an interaction unless one is already open. The
+    front end calls results_updated() once it has shown new results; the
+    interaction closes when Tk next goes idle, so pending redraws count, and
+    its latency goes into the keystroke histogram. input_ignored() drops an
+    interaction that did not lead to new results.
+    """
+
+    def __init__(self, budget_ms=FRAME_MS):
+        self.budget_ms = budget_ms
+        self.enabled = True
+        self.root = None
+        self.original_call_wrapper = None
+        self.reset()
+
+    def reset(self):
+        self.callbacks = {}
+        self.categories = {}
+        self.slow = deque(maxlen=SLOW_CALLBACKS)
+        self.keystroke = LatencyHistogram()
+        self.input_start = None
+        self.closing = False
+
+    def install(self, root):
+        """Start profiling; call before the widgets register their callbacks"""
+        self.root = root
+        if self.original_call_wrapper is None:
+            self.original_call_wrapper = tk.CallWrapper
+            tk.CallWrapper = make_profiled_call_wrapper(self, self.original_call_wrapper)
+
+    def uninstall(self):
+        if self.original_call_wrapper is not None:
+            tk.CallWrapper = self.original_call_wrapper
+            self.original_call_wrapper = None
+
+    def record(self, category, name, start, end):
+        ms = (end - start) * 1000
+        key = (category, name)
+        stats = self.callbacks.get(key)
+        if stats is None:
+            stats = self.callbacks[key] = [0, 0.0, 0.0, 0]
+        stats[0] += 1
+        stats[1] += ms
+        if ms > stats[2]:
+            stats[2] = ms
+        if ms > self.budget_ms:
+            stats[3] += 1
+            self.slow.append((time.time(), category, name, ms))
+        histogram = self.categories.get(category)
+        if histogram is None:
+            histogram = self.categories[category] = LatencyHistogram()
+        histogram.add(ms)
+
+    def input_started(self, start):
+        if self.enabled and self.input_start is None:
+            self.input_start = start
+
+    def input_ignored(self):
+        """The pending input produced no new results; forget it"""
+        if not self.closing:
+            self.input_start = None
+
+    def results_updated(self):
+        """New results are on screen; close the interaction once Tk has redrawn"""
+        if self.input_start is None or self.closing or self.root is None:
+            return
+        self.closing = True
+        self.root.after_idle(self.close_interaction)
+
+    def close_interaction(self):
+        self.closing = False
+        if self.input_start is not None:
+            self.keystroke.add((time.perf_counter() - self.input_start) * 1000)
+            self.input_start = None
+
+    def snapshot(self):
+        """Callback timings, per-category histograms, keystroke latency and slow callbacks"""
+        return {
+            'budget_ms': self.budget_ms,
+            'keystroke_to_results': self.keystroke.summary(),
+            'categories': {category: histogram.summary() for category, histogram in sorted(self.categories.items())},
+            'callbacks': [
+                {'category': category, 'name': name, 'calls': calls, 'total_ms': total,
+                 'mean_ms': total / calls, 'max_ms': longest, 'over_budget': over}
+                for (category, name), (calls, total, longest, over)
+                in sorted(self.callbacks.items(), key=lambda item: -item[1][1])
+            ],
+            'slow_callbacks': [
+                {'time': stamp, 'category': category, 'name': name, 'ms': ms}
+                for stamp, category, name, ms in self.slow
+            ],
+            'keystroke_samples_ms': list(self.keystroke.samples)
+        }
+
+    def export(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+def callback_name(func):
+    func = getattr(func, '__func__', func)
+    name = getattr(func, '__qualname__', None) or type(func).__name__
+    if name.endswith('after.<locals>.callit'):
+        # Misc.after() wraps the real callback in a closure; name the callback itself
+        code = func.__code__
+        if 'func' in code.co_freevars:
+            return 'after', callback_name(func.__closure__[code.co_freevars.index('func')].cell_contents)[1]
+        return 'after', func.__name__
+    return None, name
+
+def make_profiled_call_wrapper(profiler, base):
+    """A CallWrapper subclass timing every call for profiler"""
+
+    class ProfiledCallWrapper(base):
+        def __init__(self, func, subst, widget):
+            super().__init__(func, subst, widget)
+            self.category, self.name = callback_name(func)
+            if self.category == 'after' and self.name in REDRAW_CALLBACKS:
+                self.category = 'redraw'
+            elif self.category is None and subst is not None:
+                self.category = 'event'
+
+        def __call__(self, *args):
+            if not profiler.enabled:
+                return super().__call__(*args)
+            category = self.category
+            if category is None:
+                # Variable traces are called with (name, index, mode); widget commands are not
+                category = 'trace' if len(args) == 3 and args[2] in TRACE_MODES else 'command'
+            start = time.perf_counter()
+            if category == 'trace':
+                profiler.input_started(start)
+            try:
+                return super().__call__(*args)
+            finally:
+                profiler.record(category, self.name, start, time.perf_counter())
+
+    return ProfiledCallWrapper
+
+# The process-wide profiler used by the Tk front ends
+profiler = LatencyProfiler()
+
+def show_profiler_window(root, latency_profiler=profiler):
+    """Open a window showing the profiler's histograms, callback timings and slow callbacks"""
+    window = tk.Toplevel(root)
+    window.title("Latency Profiler")
+    window.geometry("900x700")
+
+    controls = ttk.Frame(window, padding=10)
+    controls.pack(fill="x")
+    summary = ttk.Label(controls, text="")
+    summary.pack(side="left", padx=5)
+
+    notebook = ttk.Notebook(window)
+    notebook.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    def make_tree(title, columns, widths):
+        frame = ttk.Frame(notebook)
+        notebook.add(frame, text=title)
+        tree = ttk.Treeview(frame, columns=columns, show="headings")
+        for col, width in zip(columns, widths):
+            tree.heading(col, text=col)
+            tree.column(col, width=width, anchor="w" if width > 150 else "e")
+        scroll = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scroll.set)
+        tree.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+        return tree
+
+    histogram_tree = make_tree("Histograms", ("Latency", "Bucket", "Count", "Share"), (200, 120, 80, 400))
+    callback_tree = make_tree("Callbacks", ("Category", "Callback", "Calls", "Total (ms)", "Mean (ms)",
+                                            "Max (ms)", "Over budget"), (90, 330, 70, 90, 80, 80, 90))
+    slow_tree = make_tree("Slow callbacks", ("Time", "Category", "Callback", "ms"), (100, 90, 450, 90))
+    slow_tree.tag_configure("slow", foreground="red")
+
+    def refresh():
+        snapshot = latency_profiler.snapshot()
+        keystroke = snapshot['keystroke_to_results']
+        summary.config(text=(
+            f"Keystroke to results: {keystroke['count']} samples, p50 {keystroke['p50_ms']:.1f} ms, "
+            f"p95 {keystroke['p95_ms']:.1f} ms, p99 {keystroke['p99_ms']:.1f} ms, max {keystroke['max_ms']:.1f} ms"
+            f"  |  frame budget {snapshot['budget_ms']} ms"
+        ))
+
+        histogram_tree.delete(*histogram_tree.get_children())
+        histograms = [("keystroke to results", keystroke)] + list(snapshot['categories'].items())
+        for title, histogram in histograms:
+            total = histogram['count'] or 1
+            for bucket, count in histogram['histogram'].items():
+                if count:
+                    share = count / total
+                    histogram_tree.insert("", "end", values=(title, bucket, count,
+                                                             f"{share * 100:5.1f}% " + "#" * round(share * 40)))
+
+        callback_tree.delete(*callback_tree.get_children())
+        for entry in snapshot['callbacks']:
+            callback_tree.insert("", "end", values=(
+                entry['category'], entry['name'], entry['calls'], f"{entry['total_ms']:.1f}",
+                f"{entry['mean_ms']:.2f}", f"{entry['max_ms']:.2f}", entry['over_budget']
+            ))
+
+        slow_tree.delete(*slow_tree.get_children())
+        for entry in reversed(snapshot['slow_callbacks']):
+            slow_tree.insert("", "end", tags=("slow",), values=(
+                time.strftime("%H:%M:%S", time.localtime(entry['time'])), entry['category'], entry['name'],
+                f"{entry['ms']:.1f}"
+            ))
+
+    def reset():
+        latency_profiler.reset()
+        refresh()
+
+    def export():
+        path = filedialog.asksaveasfilename(
+            parent=window,
+            title="Export Latency Profile",
+            initialfile="robot_arm_latency.json",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")]
+        )
+        if not path:
+            return
+        try:
+            latency_profiler.export(path)
+            messagebox.showinfo("Success", f"Latency profile exported to {path}", parent=window)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export latency profile: {str(e)}", parent=window)
+
+    ttk.Button(controls, text="Export...", command=export).pack(side="right", padx=5)
+    ttk.Button(controls, text="Reset", command=reset).pack(side="right", padx=5)
+    ttk.Button(controls, text="Refresh", command=refresh).pack(side="right", padx=5)
+    if latency_profiler.original_call_wrapper is None:
+        summary.config(text="The profiler was not installed when this window's application started")
+    else:
+        refresh()
+    return window
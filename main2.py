@@ -4,9 +4,9 @@ import math
 import traceback
 import csv
 import os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from motor_utils import get_motor_specs  # Import the function
+from recalc_scheduler import RecalculationScheduler
+from latency_profiler import profiler, show_profiler_window
 
 class RobotArmCalculator:
     def __init__(self, root):
@@ -31,6 +31,9 @@ class RobotArmCalculator:
         # Create GUI
         self.create_gui()
         
+        # Coalesce rapid input changes into one recalculation per frame
+        self.scheduler = RecalculationScheduler(self.root, self.calculate_all)
+        
         # Bind events for real-time calculation
         self.bind_events()
         
@@ -118,7 +121,12 @@ class RobotArmCalculator:
         self.create_input_tab(input_frame)
         self.create_results_tab(results_frame)
         self.create_table_tab(table_frame)
-        self.create_diagram_tab(diagram_frame)
+        
+        # The diagram (and matplotlib) is only built once its tab is first shown
+        self.canvas = None
+        notebook.bind("<<NotebookTabChanged>>",
+                      lambda e: self.create_diagram_tab(diagram_frame)
+                      if self.canvas is None and notebook.select() == str(diagram_frame) else None)
     
     def create_input_tab(self, parent):
         """Create input fields tab"""
@@ -316,10 +324,14 @@ class RobotArmCalculator:
     
     def create_diagram_tab(self, parent):
         """Create diagram tab with arm plot"""
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
         frame = ttk.Frame(parent, padding=10)
         frame.pack(fill="both", expand=True)
         
-        self.fig, self.ax = plt.subplots(figsize=(5, 5))
+        self.fig = Figure(figsize=(5, 5))
+        self.ax = self.fig.add_subplot()
         self.canvas = FigureCanvasTkAgg(self.fig, master=frame)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
         
@@ -371,7 +383,7 @@ class RobotArmCalculator:
     
     def on_value_change(self, *args):
         """Handle value change event"""
-        self.calculate_all()
+        self.scheduler.request()
     
     def get_float_value(self, var, default=0.0):
         """Safely get float value from StringVar"""
@@ -391,6 +403,8 @@ class RobotArmCalculator:
     
     def update_diagram(self):
         """Update the arm diagram"""
+        if self.canvas is None:
+            return
         try:
             self.ax.clear()
             x = [0.0]
@@ -1371,6 +1385,7 @@ class RobotArmCalculator:
             
             self.update_table_display()
             self.update_diagram()
+            profiler.results_updated()
                 
         except Exception as e:
             print(f"Error in calculate_all: {e}")
@@ -1380,6 +1395,8 @@ def main():
     """Main function to run the application"""
     try:
         root = tk.Tk()
+        # Time every Tk callback from the start, so the app's traces and after callbacks are covered
+        profiler.install(root)
         app = RobotArmCalculator(root)
         
         root.minsize(1000, 700)
@@ -1399,6 +1416,10 @@ def main():
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=root.quit)
         
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Latency Profiler...", command=lambda: show_profiler_window(root))
+        
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
         help_menu.add_command(label="About", command=lambda: show_about_dialog(root))
@@ -1412,41 +1433,43 @@ def main():
 def reset_to_defaults(app):
     """Reset all values to defaults"""
     try:
-        app.payload_mass.set("5.0")
-        app.link_density.set("7850.0")
-        app.link6_length.set("0.2")
-        app.link6_radius.set("0.02")
-        app.motor6_rpm.set("3000")
-        app.reduction_ratio_m6.set("50")
-        app.safety_factor_m6.set("1.5")
-        app.motor6_length.set("0.1")
-        app.link5_length.set("0.3")
-        app.link5_radius.set("0.025")
-        app.motor5_rpm.set("3000")
-        app.reduction_ratio_m5.set("50")
-        app.safety_factor_m5.set("1.5")
-        app.motor5_length.set("0.12")
-        app.link4_length.set("0.25")
-        app.link4_radius.set("0.025")
-        app.motor4_rpm.set("3000")
-        app.reduction_ratio_m4.set("50")
-        app.safety_factor_m4.set("1.5")
-        app.motor4_length.set("0.12")
-        app.link3_length.set("0.25")
-        app.link3_radius.set("0.03")
-        app.motor3_rpm.set("3000")
-        app.reduction_ratio_m3.set("50")
-        app.safety_factor_m3.set("1.5")
-        app.motor3_length.set("0.15")
-        app.link2_length.set("0.3")
-        app.link2_radius.set("0.035")
-        app.motor2_rpm.set("3000")
-        app.reduction_ratio_m2.set("50")
-        app.safety_factor_m2.set("1.5")
-        app.motor1_rpm.set("3000")
-        app.reduction_ratio_m1.set("50")
-        app.safety_factor_m1.set("1.5")
-        app.calculate_all()
+        # Set everything first, then recalculate once
+        with app.scheduler.batch():
+            app.payload_mass.set("5.0")
+            app.link_density.set("7850.0")
+            app.link6_length.set("0.2")
+            app.link6_radius.set("0.02")
+            app.motor6_rpm.set("3000")
+            app.reduction_ratio_m6.set("50")
+            app.safety_factor_m6.set("1.5")
+            app.motor6_length.set("0.1")
+            app.link5_length.set("0.3")
+            app.link5_radius.set("0.025")
+            app.motor5_rpm.set("3000")
+            app.reduction_ratio_m5.set("50")
+            app.safety_factor_m5.set("1.5")
+            app.motor5_length.set("0.12")
+            app.link4_length.set("0.25")
+            app.link4_radius.set("0.025")
+            app.motor4_rpm.set("3000")
+            app.reduction_ratio_m4.set("50")
+            app.safety_factor_m4.set("1.5")
+            app.motor4_length.set("0.12")
+            app.link3_length.set("0.25")
+            app.link3_radius.set("0.03")
+            app.motor3_rpm.set("3000")
+            app.reduction_ratio_m3.set("50")
+            app.safety_factor_m3.set("1.5")
+            app.motor3_length.set("0.15")
+            app.link2_length.set("0.3")
+            app.link2_radius.set("0.035")
+            app.motor2_rpm.set("3000")
+            app.reduction_ratio_m2.set("50")
+            app.safety_factor_m2.set("1.5")
+            app.motor1_rpm.set("3000")
+            app.reduction_ratio_m1.set("50")
+            app.safety_factor_m1.set("1.5")
+        
     except Exception as e:
         messagebox.showerror("Error", f"Failed to reset to defaults: {str(e)}")
 
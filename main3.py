@@ -1,15 +1,44 @@
+import argparse
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import math
 import traceback
-import csv
 import os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from motor_utils import get_motor_specs  # Import the function
+from collections import OrderedDict
+from functools import partial
+from motor_utils import (get_motor_specs, get_motor_catalog, preload_motor_catalog, CANDIDATE_RANKINGS,
+                         DEFAULT_CANDIDATES)
+from arm_model import PARAMETER_NAMES, INTEGER_PARAMETERS, DIAGRAM_PARAMETERS, ParameterSnapshot, evaluate_design
+from recalc_scheduler import RecalculationScheduler
+from latency_profiler import profiler, show_profiler_window
+from compute_worker import ComputeWorker
+from report import write_export_csv
+from result_export import design_record, export_records, export_format
+from instrumentation import instruments
+from catalog_filter import compile_filter
+from result_cache import ResultCache, catalog_fingerprint, design_key
+
+# Outputs offered in the sensitivity tab: (label, result key, with_sf)
+SENSITIVITY_OUTPUTS = [
+    ("Total Torque (N⋅m)", 'total_torque', False),
+    ("Total Torque with SF (N⋅m)", 'total_torque_sf', True),
+    ("Torque Before Reduction (N⋅m)", 'torque_before_reduction', False),
+    ("Torque Before Reduction with SF (N⋅m)", 'torque_before_reduction_sf', True),
+    ("Power (W)", 'power', False),
+    ("Power with SF (W)", 'power_sf', True)
+]
+
+# Requirement scenarios offered in the alternatives tab: (label, scenario, torque key, power key)
+ALTERNATIVE_SCENARIOS = [
+    ("Normal", 'normal', 'total_torque', 'power'),
+    ("With Safety Factor", 'sf', 'total_torque_sf', 'power_sf')
+]
+
+# Designs remembered per parameter snapshot, so returning to earlier inputs skips the engine
+DESIGN_MEMO_SIZE = 64
 
 class RobotArmCalculator:
-    def __init__(self, root):
+    def __init__(self, root, result_cache=None):
         self.root = root
         self.root.title("6DOF Robotic Arm Torque and Power Calculator")
         self.root.geometry("1400x1000")
@@ -18,6 +47,9 @@ class RobotArmCalculator:
         self.g = 9.80665  # Gravitational acceleration
         self.PI = math.pi
         
+        # Start parsing the motor catalog while the window is being built
+        preload_motor_catalog()
+        
         # Initialize variables
         self.init_variables()
         
@@ -28,9 +60,36 @@ class RobotArmCalculator:
         self.motor_specs_normal = {}
         self.motor_specs_sf = {}
         
+        # Formatted rows currently shown in each results Treeview, keyed by item ID
+        self.table_rows = {}
+        
+        # Displayed design and the inputs it was computed from
+        self.design = None
+        self.last_parameters = {}
+        
+        # Worker-side state: last evaluated design, for incremental recalculation
+        self.requested_parameters = None
+        self.requested_filter = None
+        self.requested_gradients = False
+        self.shown_filter = None
+        self.filter_error = False
+        self.engine_design = None
+        self.engine_parameters = {}
+        self.design_memo = OrderedDict()
+        self.engine_catalog = None
+        self.engine_gradients = False
+        # Optional ResultCache shared with the CLI tools, for designs sized in earlier sessions
+        self.result_cache = result_cache
+        
         # Create GUI
         self.create_gui()
         
+        # Coalesce rapid input changes into one recalculation per frame
+        self.scheduler = RecalculationScheduler(self.root, self.calculate_all)
+        
+        # Catalog parsing and motor selection run off the Tk thread
+        self.worker = ComputeWorker(self.root, self.compute_request, self.apply_design)
+        
         # Bind events for real-time calculation
         self.bind_events()
         
@@ -108,6 +167,18 @@ class RobotArmCalculator:
         self.SF3 = tk.StringVar(value="1.5")
         self.SF2 = tk.StringVar(value="1.5")
         self.SF1 = tk.StringVar(value="1.5")
+        
+        # Sensitivity tab selection
+        self.sensitivity_motor = tk.StringVar(value="Motor 1")
+        self.sensitivity_output = tk.StringVar(value=SENSITIVITY_OUTPUTS[0][0])
+        
+        # Motor selection filter expression (see catalog_filter)
+        self.motor_filter = tk.StringVar(value="")
+        
+        # Alternatives tab selection
+        self.alternatives_scenario = tk.StringVar(value=ALTERNATIVE_SCENARIOS[0][0])
+        self.alternatives_ranking = tk.StringVar(value=CANDIDATE_RANKINGS['power_margin'][0])
+        self.alternatives_count = tk.StringVar(value=str(DEFAULT_CANDIDATES))
     
     def create_gui(self):
         """Create the GUI layout"""
@@ -120,16 +191,70 @@ class RobotArmCalculator:
         results_frame = ttk.Frame(notebook)
         notebook.add(results_frame, text="Results")
         
+        alternatives_frame = ttk.Frame(notebook)
+        notebook.add(alternatives_frame, text="Alternatives")
+        
         table_frame = ttk.Frame(notebook)
         notebook.add(table_frame, text="Table")
         
         diagram_frame = ttk.Frame(notebook)
         notebook.add(diagram_frame, text="Diagram")
         
+        sensitivity_frame = ttk.Frame(notebook)
+        notebook.add(sensitivity_frame, text="Sensitivity")
+        
+        performance_frame = ttk.Frame(notebook)
+        notebook.add(performance_frame, text="Performance")
+        
         self.create_input_tab(input_frame)
-        self.create_results_tab(results_frame)
-        self.create_table_tab(table_frame)
-        self.create_diagram_tab(diagram_frame)
+        
+        # Output tabs are views: built the first time they are shown, and
+        # rendered only while visible
+        self.notebook = notebook
+        self.views = {}
+        self.pending_result_joints = set()
+        self.register_view(results_frame, 'results', self.create_results_tab, self.render_results_view)
+        self.register_view(alternatives_frame, 'alternatives', self.create_alternatives_tab,
+                           self.update_alternatives_display)
+        self.register_view(table_frame, 'table', self.create_table_tab, self.update_table_display)
+        self.register_view(diagram_frame, 'diagram', self.create_diagram_tab, self.update_diagram)
+        self.register_view(sensitivity_frame, 'sensitivity', self.create_sensitivity_tab,
+                           self.update_sensitivity_display)
+        self.register_view(performance_frame, 'performance', self.create_performance_tab,
+                           self.update_performance_display)
+        notebook.bind("<<NotebookTabChanged>>", lambda e: self.render_visible_view())
+    
+    def register_view(self, frame, name, build, render):
+        """Register a notebook tab as a lazily built view with a dirty flag"""
+        self.views[name] = {'name': name, 'tab': str(frame), 'frame': frame, 'build': build, 'built': False,
+                            'render': render, 'dirty': False}
+    
+    def mark_dirty(self, *names):
+        """Flag views for re-rendering and render the visible one right away"""
+        for name in names:
+            self.views[name]['dirty'] = True
+        self.render_visible_view()
+    
+    def render_visible_view(self):
+        """Render the selected notebook tab if its view is out of date"""
+        current = self.notebook.select()
+        for view in self.views.values():
+            if view['tab'] != current:
+                continue
+            if not view['built']:
+                view['build'](view['frame'])
+                view['built'] = True
+                view['dirty'] = True
+            if view['dirty']:
+                view['dirty'] = False
+                with instruments.timer(f"gui.render.{view['name']}"):
+                    view['render']()
+    
+    def render_results_view(self):
+        """Refresh the result labels of every motor that changed while hidden"""
+        for motor_num in sorted(self.pending_result_joints):
+            self.update_results_display(motor_num)
+        self.pending_result_joints.clear()
     
     def create_input_tab(self, parent):
         """Create input fields tab"""
@@ -148,6 +273,17 @@ class RobotArmCalculator:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
+        # Motor Selection Filter
+        filter_frame = ttk.LabelFrame(scrollable_frame, text="Motor Selection Filter", padding=10)
+        filter_frame.pack(fill="x", pady=5)
+        
+        ttk.Label(filter_frame, text="Only motors where:").grid(row=0, column=0, sticky="w", padx=5)
+        ttk.Entry(filter_frame, textvariable=self.motor_filter, width=70).grid(row=0, column=1, padx=5)
+        self.filter_status = ttk.Label(filter_frame, text="All motors")
+        self.filter_status.grid(row=0, column=2, sticky="w", padx=5)
+        ttk.Label(filter_frame, text='e.g. voltage_type == "DC" and flange_size <= 80 and input_voltage <= 48',
+                  foreground="gray").grid(row=1, column=1, sticky="w", padx=5)
+        
         # Global Parameters
         global_frame = ttk.LabelFrame(scrollable_frame, text="Global Parameters", padding=10)
         global_frame.pack(fill="x", pady=5)
@@ -230,6 +366,101 @@ class RobotArmCalculator:
             frame.pack(fill="x", pady=5)
             self.results_frames[motor_num] = frame
             self.create_result_labels(frame, motor_num)
+        
+        # Fill in every motor calculated before the tab was first shown
+        self.pending_result_joints |= set(self.all_results)
+    
+    def create_alternatives_tab(self, parent):
+        """Create the tab listing the top-ranked candidate motors for every joint"""
+        controls = ttk.Frame(parent, padding=10)
+        controls.pack(fill="x")
+        
+        ttk.Label(controls, text="Requirement:").pack(side="left", padx=5)
+        scenario_box = ttk.Combobox(controls, textvariable=self.alternatives_scenario, state="readonly", width=20,
+                                    values=[label for label, _, _, _ in ALTERNATIVE_SCENARIOS])
+        scenario_box.pack(side="left", padx=5)
+        
+        ttk.Label(controls, text="Rank by:").pack(side="left", padx=5)
+        ranking_box = ttk.Combobox(controls, textvariable=self.alternatives_ranking, state="readonly", width=15,
+                                   values=[label for label, _ in CANDIDATE_RANKINGS.values()])
+        ranking_box.pack(side="left", padx=5)
+        
+        ttk.Label(controls, text="Candidates:").pack(side="left", padx=5)
+        count_box = ttk.Spinbox(controls, from_=1, to=50, textvariable=self.alternatives_count, width=5,
+                                command=self.update_alternatives_display)
+        count_box.pack(side="left", padx=5)
+        
+        ttk.Label(controls, text="Requirements assume the selected motors on the joints further out").pack(
+            side="left", padx=15)
+        
+        scenario_box.bind("<<ComboboxSelected>>", lambda e: self.update_alternatives_display())
+        ranking_box.bind("<<ComboboxSelected>>", lambda e: self.update_alternatives_display())
+        count_box.bind("<Return>", lambda e: self.update_alternatives_display())
+        
+        frame = ttk.Frame(parent, padding=10)
+        frame.pack(fill="both", expand=True)
+        
+        columns = ("Model Name", "Company Name", "Voltage Type", "Input Voltage (V)", "Power Rating (W)",
+                   "Power Margin (W)", "Rated Torque (N⋅m)", "Torque Margin (N⋅m)", "Motor Weight (kg)",
+                   "Price ($)", "Flange Size (mm)")
+        self.alternatives_tree = ttk.Treeview(frame, columns=columns, show="tree headings", height=30)
+        self.alternatives_tree.heading("#0", text="Motor / Rank")
+        self.alternatives_tree.column("#0", width=330, anchor="w")
+        for col in columns:
+            self.alternatives_tree.heading(col, text=col)
+            self.alternatives_tree.column(col, width=110, anchor="w" if col in columns[:3] else "e")
+        scroll_y = ttk.Scrollbar(frame, orient="vertical", command=self.alternatives_tree.yview)
+        scroll_x = ttk.Scrollbar(frame, orient="horizontal", command=self.alternatives_tree.xview)
+        self.alternatives_tree.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
+        self.alternatives_tree.grid(row=0, column=0, sticky="nsew")
+        scroll_y.grid(row=0, column=1, sticky="ns")
+        scroll_x.grid(row=1, column=0, sticky="ew")
+        frame.grid_rowconfigure(0, weight=1)
+        frame.grid_columnconfigure(0, weight=1)
+        
+        # Candidates shown per joint, keyed by what they were ranked for
+        self.alternatives_shown = {}
+        for motor_num in range(1, 7):
+            self.alternatives_tree.insert("", "end", iid=f"motor{motor_num}", text=f"Motor {motor_num}", open=True)
+    
+    def update_alternatives_display(self):
+        """Rank candidate motors for every joint whose requirement, ranking or count changed"""
+        try:
+            if self.design is None:
+                return
+            _, scenario, key_torque, key_power = next(
+                entry for entry in ALTERNATIVE_SCENARIOS if entry[0] == self.alternatives_scenario.get()
+            )
+            ranking = next(name for name, (label, _) in CANDIDATE_RANKINGS.items()
+                           if label == self.alternatives_ranking.get())
+            k = max(1, self.get_int_value(self.alternatives_count, DEFAULT_CANDIDATES))
+            motor_catalog = get_motor_catalog()
+            if motor_catalog and self.shown_filter:
+                motor_catalog = motor_catalog.filtered(self.shown_filter)
+            
+            for motor_num in range(1, 7):
+                torque = self.design[scenario][motor_num][key_torque]
+                power = self.design[scenario][motor_num][key_power]
+                key = (motor_catalog, torque, power, ranking, k)
+                if self.alternatives_shown.get(motor_num) == key:
+                    continue
+                self.alternatives_shown[motor_num] = key
+                
+                parent = f"motor{motor_num}"
+                self.alternatives_tree.item(parent, text=f"Motor {motor_num}: {torque:.3f} N⋅m, {power:.3f} W")
+                self.alternatives_tree.delete(*self.alternatives_tree.get_children(parent))
+                candidates = motor_catalog.candidates(motor_num, torque, power, k, ranking) if motor_catalog else []
+                for specs in candidates:
+                    self.alternatives_tree.insert(parent, "end", text=f"#{specs['rank']}", values=(
+                        specs['model_name'], specs['company_name'], specs['voltage_type'],
+                        f"{specs['input_voltage']:g}", f"{specs['power_rating']:.3f}",
+                        f"{specs['power_margin']:.3f}", f"{specs['rated_torque']:.3f}",
+                        f"{specs['torque_margin']:.3f}", f"{specs['motor_weight']:.3f}",
+                        f"{specs['price']:.2f}", f"{specs['flange_size']:.1f}"
+                    ))
+                
+        except Exception as e:
+            print(f"Error updating alternatives display: {e}")
     
     def create_table_tab(self, parent):
         """Create table tab with scrollable tables"""
@@ -350,14 +581,195 @@ class RobotArmCalculator:
     
     def create_diagram_tab(self, parent):
         """Create diagram tab with arm plot"""
+        # matplotlib is only imported once a plot tab is first shown
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
         frame = ttk.Frame(parent, padding=10)
         frame.pack(fill="both", expand=True)
         
-        self.fig, self.ax = plt.subplots(figsize=(6, 6))
+        self.fig = Figure(figsize=(6, 6))
+        self.ax = self.fig.add_subplot()
         self.canvas = FigureCanvasTkAgg(self.fig, master=frame)
+        # draw_idle() ends in draw(), so this times the actual matplotlib rendering
+        self.canvas.draw = instruments.timed('gui.matplotlib_draw.diagram', self.canvas.draw)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
         
-        self.update_diagram()
+        # Static decorations are drawn once; updates only move the artists below
+        self.ax.set_title("6DOF Robotic Arm Configuration", fontsize=12, weight="bold")
+        self.ax.grid(True, linestyle="--", alpha=0.7)
+        self.ax.set_xlabel("X (m)")
+        self.ax.set_ylabel("Y (m)")
+        
+        self.arm_line, = self.ax.plot([], [], marker="o", linestyle="-", color="blue", linewidth=3, markersize=8)
+        self.payload_marker, = self.ax.plot([], [], marker="s", linestyle="none", color="red",
+                                            markersize=12, label="Payload")
+        self.joint_labels = []
+        # Equal scales by resizing the plot box, so each axis keeps exactly the limits set on it
+        self.ax.set_aspect("equal", adjustable="box")
+        self.diagram_reach = self.diagram_height = None
+        self.ax.legend()
+    
+    def create_sensitivity_tab(self, parent):
+        """Create sensitivity tab with a tornado chart of parameter effects"""
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
+        controls = ttk.Frame(parent, padding=10)
+        controls.pack(fill="x")
+        
+        ttk.Label(controls, text="Motor:").pack(side="left", padx=5)
+        motor_box = ttk.Combobox(controls, textvariable=self.sensitivity_motor, state="readonly", width=10,
+                                 values=[f"Motor {motor_num}" for motor_num in range(1, 7)])
+        motor_box.pack(side="left", padx=5)
+        
+        ttk.Label(controls, text="Output:").pack(side="left", padx=5)
+        output_box = ttk.Combobox(controls, textvariable=self.sensitivity_output, state="readonly", width=35,
+                                  values=[label for label, _, _ in SENSITIVITY_OUTPUTS])
+        output_box.pack(side="left", padx=5)
+        
+        ttk.Label(controls, text="Bars show the change from a ±10% change of each input").pack(side="left", padx=15)
+        
+        motor_box.bind("<<ComboboxSelected>>", lambda e: self.update_sensitivity_display())
+        output_box.bind("<<ComboboxSelected>>", lambda e: self.update_sensitivity_display())
+        
+        frame = ttk.Frame(parent, padding=10)
+        frame.pack(fill="both", expand=True)
+        
+        self.sens_fig = Figure(figsize=(6, 5))
+        self.sens_ax = self.sens_fig.add_subplot()
+        self.sens_canvas = FigureCanvasTkAgg(self.sens_fig, master=frame)
+        self.sens_canvas.draw = instruments.timed('gui.matplotlib_draw.sensitivity', self.sens_canvas.draw)
+        self.sens_canvas.get_tk_widget().pack(side="left", fill="both", expand=True)
+        
+        columns = ("Parameter", "Value", "Derivative", "Effect of +10%")
+        self.sens_tree = ttk.Treeview(frame, columns=columns, show="headings", height=20)
+        for col in columns:
+            self.sens_tree.heading(col, text=col)
+            self.sens_tree.column(col, width=110, anchor="center")
+        self.sens_tree.pack(side="right", fill="y")
+    
+    def update_sensitivity_display(self):
+        """Redraw the tornado chart and gradient table for the chosen motor and output"""
+        try:
+            motor_num = int(self.sensitivity_motor.get().split()[-1])
+            label, key, with_sf = next(
+                entry for entry in SENSITIVITY_OUTPUTS if entry[0] == self.sensitivity_output.get()
+            )
+            if self.design is None:
+                return
+            scenario = 'sf' if with_sf else 'normal'
+            if 'gradients' not in self.design[scenario][motor_num]:
+                # Shown designs carry gradients only while this tab is open; ask for them
+                # and redraw when the result arrives
+                self.calculate_all()
+                return
+            gradient = self.design[scenario][motor_num]['gradients'][key]
+            params = self.last_parameters
+            
+            # Linearized effect of a 10% change of each input
+            effects = [
+                (name, params[name], derivative, derivative * 0.1 * params[name])
+                for name, derivative in gradient.items() if derivative != 0
+            ]
+            effects.sort(key=lambda e: abs(e[3]), reverse=True)
+            
+            for item in self.sens_tree.get_children():
+                self.sens_tree.delete(item)
+            for name, value, derivative, effect in effects:
+                self.sens_tree.insert("", "end", values=(name, f"{value:g}", f"{derivative:.4g}", f"{effect:.4g}"))
+            
+            self.sens_ax.clear()
+            top = effects[:12][::-1]
+            names = [e[0] for e in top]
+            deltas = [e[3] for e in top]
+            positions = range(len(top))
+            self.sens_ax.barh(positions, deltas, color="tab:red", label="+10% input")
+            self.sens_ax.barh(positions, [-d for d in deltas], color="tab:blue", label="-10% input")
+            self.sens_ax.set_yticks(list(positions))
+            self.sens_ax.set_yticklabels(names)
+            self.sens_ax.axvline(0, color="black", linewidth=1)
+            self.sens_ax.set_title(f"Motor {motor_num}: {label}", fontsize=11, weight="bold")
+            self.sens_ax.set_xlabel("Change in output for a ±10% input change")
+            if top:
+                self.sens_ax.legend(loc="lower right")
+            self.sens_fig.tight_layout()
+            self.sens_canvas.draw_idle()
+            
+        except Exception as e:
+            print(f"Error updating sensitivity display: {e}")
+    
+    def create_performance_tab(self, parent):
+        """Create the performance tab listing stage timers, counters and hit rates"""
+        controls = ttk.Frame(parent, padding=10)
+        controls.pack(fill="x")
+        
+        ttk.Button(controls, text="Refresh", command=self.update_performance_display).pack(side="left", padx=5)
+        ttk.Button(controls, text="Reset", command=self.reset_performance).pack(side="left", padx=5)
+        self.trace_enabled = tk.BooleanVar(value=instruments.tracing)
+        ttk.Checkbutton(controls, text="Record trace", variable=self.trace_enabled,
+                        command=lambda: setattr(instruments, 'tracing', self.trace_enabled.get())).pack(side="left", padx=5)
+        ttk.Button(controls, text="Save Trace...", command=self.save_performance_trace).pack(side="left", padx=5)
+        
+        frame = ttk.Frame(parent, padding=10)
+        frame.pack(fill="both", expand=True)
+        
+        columns = ("Stage", "Calls", "Total (ms)", "Mean (ms)", "Max (ms)")
+        self.perf_tree = ttk.Treeview(frame, columns=columns, show="headings", height=20)
+        for col in columns:
+            self.perf_tree.heading(col, text=col)
+            self.perf_tree.column(col, width=260 if col == "Stage" else 120, anchor="w" if col == "Stage" else "e")
+        self.perf_tree.pack(side="top", fill="both", expand=True)
+        
+        columns = ("Counter", "Value")
+        self.counter_tree = ttk.Treeview(frame, columns=columns, show="headings", height=10)
+        for col in columns:
+            self.counter_tree.heading(col, text=col)
+            self.counter_tree.column(col, width=260 if col == "Counter" else 120, anchor="w" if col == "Counter" else "e")
+        self.counter_tree.pack(side="top", fill="x", pady=(10, 0))
+    
+    def update_performance_display(self):
+        """Show the current instrumentation snapshot"""
+        try:
+            snapshot = instruments.snapshot()
+            self.perf_tree.delete(*self.perf_tree.get_children())
+            for name, stats in snapshot['timers'].items():
+                self.perf_tree.insert("", "end", values=(
+                    name, stats['calls'], f"{stats['total_ms']:.2f}", f"{stats['mean_ms']:.3f}", f"{stats['max_ms']:.3f}"
+                ))
+            
+            self.counter_tree.delete(*self.counter_tree.get_children())
+            for name, value in snapshot['counters'].items():
+                self.counter_tree.insert("", "end", values=(name, value))
+            for stage, rate in sorted(snapshot['hit_rates'].items()):
+                self.counter_tree.insert("", "end", values=(f"{stage} hit rate", f"{rate * 100:.1f}%"))
+                
+        except Exception as e:
+            print(f"Error updating performance display: {e}")
+    
+    def reset_performance(self):
+        """Clear all timers and counters"""
+        instruments.reset()
+        self.update_performance_display()
+    
+    def save_performance_trace(self):
+        """Write the recorded spans as a Chrome trace JSON file"""
+        path = filedialog.asksaveasfilename(
+            title="Save Trace",
+            initialfile="robot_arm_trace.json",
+            defaultextension=".json",
+            filetypes=[("Chrome trace", "*.json")]
+        )
+        if not path:
+            return
+        try:
+            events = instruments.dump_trace(path)
+            if not instruments.tracing:
+                messagebox.showinfo("Trace saved", f"Saved totals to {path}; turn on Record trace to capture spans")
+            else:
+                messagebox.showinfo("Trace saved", f"Saved {events} spans to {path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save trace: {str(e)}")
     
     def create_result_labels(self, parent, motor_num):
         """Create result display labels for a motor"""
@@ -396,7 +808,8 @@ class RobotArmCalculator:
             self.a6, self.a5, self.a4, self.a3, self.a2, self.a1,
             self.rpm6, self.rpm5, self.rpm4, self.rpm3, self.rpm2, self.rpm1,
             self.R6, self.R5, self.R4, self.R3, self.R2, self.R1,
-            self.SF6, self.SF5, self.SF4, self.SF3, self.SF2, self.SF1
+            self.SF6, self.SF5, self.SF4, self.SF3, self.SF2, self.SF1,
+            self.motor_filter
         ]
         
         for var in variables:
@@ -404,7 +817,7 @@ class RobotArmCalculator:
     
     def on_value_change(self, *args):
         """Handle value change event"""
-        self.calculate_all()
+        self.scheduler.request()
     
     def get_float_value(self, var, default=0.0):
         """Safely get float value from StringVar"""
@@ -425,8 +838,6 @@ class RobotArmCalculator:
     def update_diagram(self):
         """Update the arm diagram"""
         try:
-            self.ax.clear()
-            
             # Get link lengths
             L1 = self.get_float_value(self.L1)
             L2 = self.get_float_value(self.L2, 0.1)
@@ -453,479 +864,350 @@ class RobotArmCalculator:
                 x.append(x[-1] + L)
                 y.append(y[-1])
             
-            # Plot the arm
-            self.ax.plot(x, y, marker="o", linestyle="-", color="blue", linewidth=3, markersize=8)
+            # Move the arm and payload
+            self.arm_line.set_data(x, y)
+            self.payload_marker.set_data([x[-1]], [y[-1]])
             
-            # Add joint labels
-            for i, (xi, yi) in enumerate(zip(x, y)):
-                if i < len(x) - 1:  # Don't label the end effector
-                    self.ax.text(xi, yi + 0.05, f"J{i+1}", fontsize=10, ha="center", weight="bold")
-            
-            # Add payload at end
-            self.ax.plot(x[-1], y[-1], marker="s", color="red", markersize=12, label="Payload")
+            # Joint labels (don't label the end effector); L1 adds or removes a joint
+            while len(self.joint_labels) < len(x) - 1:
+                self.joint_labels.append(self.ax.text(0, 0, f"J{len(self.joint_labels)+1}", fontsize=10,
+                                                      ha="center", weight="bold"))
+            for i, label in enumerate(self.joint_labels):
+                if i < len(x) - 1:
+                    label.set_position((x[i], y[i] + 0.05))
+                    label.set_visible(True)
+                else:
+                    label.set_visible(False)
             
-            # Set limits and labels
+            # Each axis limit follows only its own links: L3-L6 set the reach, L1 and L2 the height
+            margin = 0.2
             total_x = sum([L3, L4, L5, L6])
             total_y = L1 + L2
-            margin = 0.2
-            self.ax.set_xlim(-margin, total_x + margin)
-            self.ax.set_ylim(-margin, total_y + margin)
-            self.ax.set_title("6DOF Robotic Arm Configuration", fontsize=12, weight="bold")
-            self.ax.grid(True, linestyle="--", alpha=0.7)
-            self.ax.set_xlabel("X (m)")
-            self.ax.set_ylabel("Y (m)")
-            self.ax.legend()
-            self.ax.axis("equal")
+            if total_x != self.diagram_reach:
+                self.diagram_reach = total_x
+                self.ax.set_xlim(-margin, total_x + margin)
+            if total_y != self.diagram_height:
+                self.diagram_height = total_y
+                self.ax.set_ylim(-margin, total_y + margin)
             
-            self.canvas.draw()
+            self.canvas.draw_idle()
             
         except Exception as e:
             print(f"Error updating diagram: {e}")
     
-    def calculate_motor_torque_power(self, motor_num, with_sf=False):
-        """Calculate torque and power for a specific motor using new formulas"""
-        try:
-            # Get all parameter values
-            m_payload = self.get_float_value(self.payload_mass)
-            density = self.get_float_value(self.link_density)
-            
-            # Link dimensions
-            L1 = self.get_float_value(self.L1)
-            L2 = self.get_float_value(self.L2)
-            L3 = self.get_float_value(self.L3)
-            L4 = self.get_float_value(self.L4)
-            L5 = self.get_float_value(self.L5)
-            L6 = self.get_float_value(self.L6)
-            
-            r1 = self.get_float_value(self.r1)
-            r2 = self.get_float_value(self.r2)
-            r3 = self.get_float_value(self.r3)
-            r4 = self.get_float_value(self.r4)
-            r5 = self.get_float_value(self.r5)
-            r6 = self.get_float_value(self.r6)
-            
-            # Motor parameters
-            motors_data = {
-                1: (self.M1, self.a1, self.rpm1, self.R1, self.SF1),
-                2: (self.M2, self.a2, self.rpm2, self.R2, self.SF2),
-                3: (self.M3, self.a3, self.rpm3, self.R3, self.SF3),
-                4: (self.M4, self.a4, self.rpm4, self.R4, self.SF4),
-                5: (self.M5, self.a5, self.rpm5, self.R5, self.SF5),
-                6: (self.M6, self.a6, self.rpm6, self.R6, self.SF6)
-            }
-            
-            M_var, a_var, rpm_var, R_var, SF_var = motors_data[motor_num]
-            M = self.get_float_value(M_var)
-            a = self.get_float_value(a_var)
-            rpm = self.get_int_value(rpm_var)
-            R = self.get_int_value(R_var)
-            SF = self.get_float_value(SF_var)
-            
-            # Calculate joint positions from base
-            S1 = L1
-            S2 = L1 + L2
-            S3 = L1 + L2 + L3
-            S4 = L1 + L2 + L3 + L4
-            S5 = L1 + L2 + L3 + L4 + L5
-            S6 = L1 + L2 + L3 + L4 + L5 + L6
-            
-            # Calculate link weights
-            W_L1 = self.g * density * self.PI * r1**2 * L1 if L1 > 0 else 0
-            W_L2 = self.g * density * self.PI * r2**2 * L2
-            W_L3 = self.g * density * self.PI * r3**2 * L3
-            W_L4 = self.g * density * self.PI * r4**2 * L4
-            W_L5 = self.g * density * self.PI * r5**2 * L5
-            W_L6 = self.g * density * self.PI * r6**2 * L6
-            
-            # Get motor weights from specs (use existing if available, otherwise use defaults)
-            m_motor1 = self.motor_specs_normal.get(1, {'motor_weight': 2.5})['motor_weight'] if not with_sf else self.motor_specs_sf.get(1, {'motor_weight': 2.5})['motor_weight']
-            m_motor2 = self.motor_specs_normal.get(2, {'motor_weight': 2.0})['motor_weight'] if not with_sf else self.motor_specs_sf.get(2, {'motor_weight': 2.0})['motor_weight']
-            m_motor3 = self.motor_specs_normal.get(3, {'motor_weight': 1.5})['motor_weight'] if not with_sf else self.motor_specs_sf.get(3, {'motor_weight': 1.5})['motor_weight']
-            m_motor4 = self.motor_specs_normal.get(4, {'motor_weight': 1.2})['motor_weight'] if not with_sf else self.motor_specs_sf.get(4, {'motor_weight': 1.2})['motor_weight']
-            m_motor5 = self.motor_specs_normal.get(5, {'motor_weight': 1.2})['motor_weight'] if not with_sf else self.motor_specs_sf.get(5, {'motor_weight': 1.2})['motor_weight']
-            m_motor6 = self.motor_specs_normal.get(6, {'motor_weight': 1.0})['motor_weight'] if not with_sf else self.motor_specs_sf.get(6, {'motor_weight': 1.0})['motor_weight']
-            
-            W_M1 = self.g * m_motor1
-            W_M2 = self.g * m_motor2
-            W_M3 = self.g * m_motor3
-            W_M4 = self.g * m_motor4
-            W_M5 = self.g * m_motor5
-            W_M6 = self.g * m_motor6
-            
-            W_P = self.g * m_payload
-            
-            # Motor positions (from input parameters)
-            M1_pos = self.get_float_value(self.M1)
-            M2_pos = self.get_float_value(self.M2)
-            M3_pos = self.get_float_value(self.M3)
-            M4_pos = self.get_float_value(self.M4)
-            M5_pos = self.get_float_value(self.M5)
-            M6_pos = self.get_float_value(self.M6)
-            
-            a1_val = self.get_float_value(self.a1)
-            a2_val = self.get_float_value(self.a2)
-            a3_val = self.get_float_value(self.a3)
-            a4_val = self.get_float_value(self.a4)
-            a5_val = self.get_float_value(self.a5)
-            a6_val = self.get_float_value(self.a6)
-            
-            # Calculate torque based on motor number using new formulas
-            if motor_num == 6:
-                T_total = W_P * (S6 - M6_pos) + W_L6 * (S6 - M6_pos - L6/2)
-            elif motor_num == 5:
-                T_total = (W_P * (S6 - M5_pos) + 
-                          W_L6 * (S6 - M5_pos - L6/2) +
-                          W_M6 * ((M6_pos + a6_val/2) - M5_pos) +
-                          W_L5 * (S5 - M5_pos - L5/2))
-            elif motor_num == 4:
-                T_total = (W_P * (S6 - M4_pos) +
-                          W_L6 * (S6 - M4_pos - L6/2) +
-                          W_L5 * (S5 - M4_pos - L5/2) +
-                          W_M6 * ((M6_pos + a6_val/2) - M4_pos) +
-                          W_M5 * ((M5_pos + a5_val/2) - M4_pos) +
-                          W_L4 * (S4 - M4_pos - L4/2))
-            elif motor_num == 3:
-                T_total = (W_P * (S6 - M3_pos) +
-                          W_L6 * (S6 - M3_pos - L6/2) +
-                          W_L5 * (S5 - M3_pos - L5/2) +
-                          W_L4 * (S4 - M3_pos - L4/2) +
-                          W_M6 * ((M6_pos + a6_val/2) - M3_pos) +
-                          W_M5 * ((M5_pos + a5_val/2) - M3_pos) +
-                          W_M4 * ((M4_pos + a4_val/2) - M3_pos) +
-                          W_L3 * (S3 - M3_pos - L3/2))
-            elif motor_num == 2:
-                T_total = (W_P * (S6 - M2_pos) +
-                          W_L6 * (S6 - M2_pos - L6/2) +
-                          W_L5 * (S5 - M2_pos - L5/2) +
-                          W_L4 * (S4 - M2_pos - L4/2) +
-                          W_L3 * (S3 - M2_pos - L3/2) +
-                          W_L2 * (S2 - M2_pos - L2/2) +
-                          W_M6 * ((M6_pos + a6_val/2) - M2_pos) +
-                          W_M5 * ((M5_pos + a5_val/2) - M2_pos) +
-                          W_M4 * ((M4_pos + a4_val/2) - M2_pos) +
-                          W_M3 * ((M3_pos + a3_val/2) - M2_pos))
-            elif motor_num == 1:
-                T_total = (W_P * (S6 - M1_pos) +
-                          W_L6 * (S6 - M1_pos - L6/2) +
-                          W_L5 * (S5 - M1_pos - L5/2) +
-                          W_L4 * (S4 - M1_pos - L4/2) +
-                          W_L3 * (S3 - M1_pos - L3/2) +
-                          W_L2 * (S2 - M1_pos - L2/2) +
-                          (W_L1 * (S1 - M1_pos - L1/2) if L1 > 0 else 0) +
-                          W_M6 * ((M6_pos + a6_val/2) - M1_pos) +
-                          W_M5 * ((M5_pos + a5_val/2) - M1_pos) +
-                          W_M4 * ((M4_pos + a4_val/2) - M1_pos) +
-                          W_M3 * ((M3_pos + a3_val/2) - M1_pos) +
-                          W_M2 * ((M2_pos + a2_val/2) - M1_pos))
-            
-            # Apply safety factor if requested
-            if with_sf:
-                T_total_sf = SF * T_total
-                T_before_sf = (T_total / R * SF) if R != 0 else 0
-                P_sf = (T_total / R * rpm * 1000 / 9550 * SF) if (rpm != 0 and R != 0) else 0
-                return {
-                    'total_torque_sf': T_total_sf,
-                    'torque_before_reduction_sf': T_before_sf,
-                    'power_sf': P_sf
-                }
+    def get_parameters(self):
+        """Read all input StringVars once into an immutable ParameterSnapshot"""
+        params = {}
+        for name in PARAMETER_NAMES:
+            if name in INTEGER_PARAMETERS:
+                params[name] = self.get_int_value(getattr(self, name))
             else:
-                T_before = T_total / R if R != 0 else 0
-                P = (T_before * rpm * 1000 / 9550) if rpm != 0 else 0
-                return {
-                    'total_torque': T_total,
-                    'torque_before_reduction': T_before,
-                    'power': P,
-                    'safety_factor': SF
-                }
-                
-        except Exception as e:
-            print(f"Error calculating Motor {motor_num}: {e}")
-            return self.get_zero_results()
+                params[name] = self.get_float_value(getattr(self, name))
+        return ParameterSnapshot(params)
     
-    def get_zero_results(self):
-        """Return zero results in case of calculation error"""
-        return {
-            'total_torque': 0.0,
-            'total_torque_sf': 0.0,
-            'torque_before_reduction': 0.0,
-            'torque_before_reduction_sf': 0.0,
-            'power': 0.0,
-            'power_sf': 0.0,
-            'safety_factor': 1.0
-        }
+    def store_results(self, motor_num, results_normal, results_sf):
+        """Collect a motor's specs and results in display order for the labels, tables and export"""
+        specs = self.motor_specs_normal.get(motor_num, {
+            'motor': f"Motor {motor_num}",
+            'power_rating': 0.0,
+            'flange_size': 0.0,
+            'voltage_type': 'N/A',
+            'model_name': 'N/A',
+            'company_name': 'N/A',
+            'price': 0.0,
+            'motor_weight': 0.0
+        })
+        
+        self.all_results[motor_num] = [
+            specs['motor'],
+            specs['power_rating'],
+            specs['flange_size'],
+            specs['voltage_type'],
+            specs['model_name'],
+            specs['company_name'],
+            specs['price'],
+            specs['motor_weight'],
+            results_normal['total_torque'],
+            results_sf['total_torque_sf'],
+            results_normal['torque_before_reduction'],
+            results_sf['torque_before_reduction_sf'],
+            results_normal['power'],
+            results_sf['power_sf']
+        ]
     
-    def update_results_display(self, motor_num, results_normal, results_sf):
+    def update_results_display(self, motor_num):
         """Update the results display for a specific motor"""
         try:
-            specs = self.motor_specs_normal.get(motor_num, {
-                'motor': f"Motor {motor_num}",
-                'power_rating': 0.0,
-                'flange_size': 0.0,
-                'voltage_type': 'N/A',
-                'model_name': 'N/A',
-                'company_name': 'N/A',
-                'price': 0.0,
-                'motor_weight': 0.0
-            })
-            
-            values = [
-                specs['motor'],
-                specs['power_rating'],
-                specs['flange_size'],
-                specs['voltage_type'],
-                specs['model_name'],
-                specs['company_name'],
-                specs['price'],
-                specs['motor_weight'],
-                results_normal['total_torque'],
-                results_sf['total_torque_sf'],
-                results_normal['torque_before_reduction'],
-                results_sf['torque_before_reduction_sf'],
-                results_normal['power'],
-                results_sf['power_sf']
-            ]
-            
-            for i, value in enumerate(values):
+            for i, value in enumerate(self.all_results[motor_num]):
                 label = getattr(self, f"result_m{motor_num}_{i}")
                 if isinstance(value, float):
                     label.config(text=f"{value:.3f}")
                 else:
                     label.config(text=str(value))
                 
-            self.all_results[motor_num] = values
-                
         except Exception as e:
             print(f"Error updating display for Motor {motor_num}: {e}")
     
+    def format_specs_row(self, motor_num, specs):
+        """Format a motor specs dict as a specifications table row"""
+        if specs is None:
+            specs = {
+                'motor': f"Motor {motor_num}",
+                'power_rating': 0.0,
+                'flange_size': 0.0,
+                'voltage_type': 'N/A',
+                'model_name': 'N/A',
+                'company_name': 'N/A',
+                'price': 0.0,
+                'motor_weight': 0.0
+            }
+        return (
+            specs['motor'],
+            f"{specs['power_rating']:.3f}" if isinstance(specs['power_rating'], float) else specs['power_rating'],
+            f"{specs['flange_size']:.1f}" if isinstance(specs['flange_size'], float) else specs['flange_size'],
+            specs['voltage_type'],
+            specs['model_name'],
+            specs['company_name'],
+            f"{specs['price']:.2f}" if isinstance(specs['price'], float) else specs['price'],
+            f"{specs['motor_weight']:.3f}" if isinstance(specs['motor_weight'], float) else specs['motor_weight']
+        )
+    
+    def sync_tree_rows(self, tree, rows):
+        """Update a Treeview in place, keeping one stable item ID per motor
+        
+        Only rows whose formatted values changed are rewritten, and a table
+        whose rows are all unchanged is not touched at all.
+        """
+        shown = self.table_rows.setdefault(tree, {})
+        if shown == rows:
+            return
+        for iid, values in rows.items():
+            if iid not in shown:
+                tree.insert("", "end", iid=iid, values=values)
+            elif shown[iid] != values:
+                tree.item(iid, values=values)
+        self.table_rows[tree] = dict(rows)
+    
     def update_table_display(self):
         """Update the table displays with results"""
         try:
-            # Update Torque and Power Results Table
-            for item in self.old_tree.get_children():
-                self.old_tree.delete(item)
-            
+            # Torque and Power Results Table
+            old_rows = {}
             for motor_num in range(1, 7):
                 values = self.all_results.get(motor_num, [f"Motor {motor_num}"] + [0.0] * 13)[8:14]
-                self.old_tree.insert("", "end", values=(
-                    f"Motor {motor_num}",
-                    f"{values[0]:.3f}",
-                    f"{values[1]:.3f}",
-                    f"{values[2]:.3f}",
-                    f"{values[3]:.3f}",
-                    f"{values[4]:.3f}",
-                    f"{values[5]:.3f}"
-                ))
-            
-            # Update Motor Specifications Table (Normal)
-            for item in self.new_tree.get_children():
-                self.new_tree.delete(item)
+                old_rows[f"motor{motor_num}"] = (f"Motor {motor_num}",) + tuple(f"{v:.3f}" for v in values)
+            self.sync_tree_rows(self.old_tree, old_rows)
             
-            for motor_num in range(1, 7):
-                specs = self.motor_specs_normal.get(motor_num, {
-                    'motor': f"Motor {motor_num}",
-                    'power_rating': 0.0,
-                    'flange_size': 0.0,
-                    'voltage_type': 'N/A',
-                    'model_name': 'N/A',
-                    'company_name': 'N/A',
-                    'price': 0.0,
-                    'motor_weight': 0.0
-                })
-                values = [
-                    specs['motor'],
-                    f"{specs['power_rating']:.3f}" if isinstance(specs['power_rating'], float) else specs['power_rating'],
-                    f"{specs['flange_size']:.1f}" if isinstance(specs['flange_size'], float) else specs['flange_size'],
-                    specs['voltage_type'],
-                    specs['model_name'],
-                    specs['company_name'],
-                    f"{specs['price']:.2f}" if isinstance(specs['price'], float) else specs['price'],
-                    f"{specs['motor_weight']:.3f}" if isinstance(specs['motor_weight'], float) else specs['motor_weight']
-                ]
-                self.new_tree.insert("", "end", values=tuple(values))
-            
-            # Update Motor Specifications with Safety Factor Table
-            for item in self.sf_tree.get_children():
-                self.sf_tree.delete(item)
-            
-            for motor_num in range(1, 7):
-                specs = self.motor_specs_sf.get(motor_num, {
-                    'motor': f"Motor {motor_num}",
-                    'power_rating': 0.0,
-                    'flange_size': 0.0,
-                    'voltage_type': 'N/A',
-                    'model_name': 'N/A',
-                    'company_name': 'N/A',
-                    'price': 0.0,
-                    'motor_weight': 0.0
-                })
-                values = [
-                    specs['motor'],
-                    f"{specs['power_rating']:.3f}" if isinstance(specs['power_rating'], float) else specs['power_rating'],
-                    f"{specs['flange_size']:.1f}" if isinstance(specs['flange_size'], float) else specs['flange_size'],
-                    specs['voltage_type'],
-                    specs['model_name'],
-                    specs['company_name'],
-                    f"{specs['price']:.2f}" if isinstance(specs['price'], float) else specs['price'],
-                    f"{specs['motor_weight']:.3f}" if isinstance(specs['motor_weight'], float) else specs['motor_weight']
-                ]
-                self.sf_tree.insert("", "end", values=tuple(values))
+            # Motor Specifications Tables (Normal and with Safety Factor)
+            for tree, motor_specs in ((self.new_tree, self.motor_specs_normal), (self.sf_tree, self.motor_specs_sf)):
+                rows = {
+                    f"motor{motor_num}": self.format_specs_row(motor_num, motor_specs.get(motor_num))
+                    for motor_num in range(1, 7)
+                }
+                self.sync_tree_rows(tree, rows)
                 
         except Exception as e:
             print(f"Error updating table display: {e}")
     
     def export_to_csv(self):
-        """Export all tables' data to a single CSV file"""
-        try:
-            old_headers = [
-                "Motor",
-                "Total Torque (N⋅m)",
-                "Total Torque with SF (N⋅m)",
-                "Torque Before Reduction (N⋅m)",
-                "Torque Before Reduction with SF (N⋅m)",
-                "Power (W)",
-                "Power with SF (W)"
-            ]
-            
-            new_headers = [
-                "Motor",
-                "Power Rating (W)",
-                "Flange Size (mm)",
-                "Voltage Type",
-                "Model Name",
-                "Company Name",
-                "Price ($)",
-                "Motor Weight (kg)"
+        """Export the results to a file chosen by the user
+        
+        .csv keeps the three tables of the GUI; the other formats write one
+        flat record of inputs, results and selected motors.
+        """
+        path = filedialog.asksaveasfilename(
+            title="Export Results",
+            initialfile="robot_arm_results.csv",
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV tables", "*.csv"),
+                ("Gzip CSV record", "*.csv.gz"),
+                ("JSON Lines record", "*.jsonl"),
+                ("Parquet record", "*.parquet")
             ]
+        )
+        if not path:
+            return
+        try:
+            if export_format(path) == 'csv':
+                with open(path, "w", newline="", encoding='utf-8') as f:
+                    write_export_csv(self.design, f)
+            elif self.design is None:
+                messagebox.showerror("Error", "Nothing to export yet")
+                return
+            else:
+                export_records([design_record(self.last_parameters, self.design)], path)
             
-            data = []
-            
-            # Add Torque and Power Results Table
-            data.append(["Torque and Power Results"])
-            data.append(old_headers)
-            for motor_num in range(1, 7):
-                values = self.all_results.get(motor_num, [f"Motor {motor_num}"] + [0.0] * 13)[8:14]
-                data.append([
-                    f"Motor {motor_num}",
-                    f"{values[0]:.3f}",
-                    f"{values[1]:.3f}",
-                    f"{values[2]:.3f}",
-                    f"{values[3]:.3f}",
-                    f"{values[4]:.3f}",
-                    f"{values[5]:.3f}"
-                ])
-            
-            # Add separator
-            data.append([])
-            
-            # Add Motor Specifications Table (Normal)
-            data.append(["Motor Specifications (Normal)"])
-            data.append(new_headers)
-            for motor_num in range(1, 7):
-                specs = self.motor_specs_normal.get(motor_num, {
-                    'motor': f"Motor {motor_num}",
-                    'power_rating': 0.0,
-                    'flange_size': 0.0,
-                    'voltage_type': 'N/A',
-                    'model_name': 'N/A',
-                    'company_name': 'N/A',
-                    'price': 0.0,
-                    'motor_weight': 0.0
-                })
-                values = [
-                    specs['motor'],
-                    specs['power_rating'],
-                    specs['flange_size'],
-                    specs['voltage_type'],
-                    specs['model_name'],
-                    specs['company_name'],
-                    specs['price'],
-                    specs['motor_weight']
-                ]
-                data.append([str(v) for v in values])
-            
-            # Add separator
-            data.append([])
-            
-            # Add Motor Specifications with Safety Factor Table
-            data.append(["Motor Specifications with Safety Factor"])
-            data.append(new_headers)
-            for motor_num in range(1, 7):
-                specs = self.motor_specs_sf.get(motor_num, {
-                    'motor': f"Motor {motor_num}",
-                    'power_rating': 0.0,
-                    'flange_size': 0.0,
-                    'voltage_type': 'N/A',
-                    'model_name': 'N/A',
-                    'company_name': 'N/A',
-                    'price': 0.0,
-                    'motor_weight': 0.0
-                })
-                values = [
-                    specs['motor'],
-                    specs['power_rating'],
-                    specs['flange_size'],
-                    specs['voltage_type'],
-                    specs['model_name'],
-                    specs['company_name'],
-                    specs['price'],
-                    specs['motor_weight']
-                ]
-                data.append([f"{v:.3f}" if isinstance(v, float) else str(v) for v in values])
-            
-            with open("robot_arm_results.csv", "w", newline="", encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerows(data)
-            
-            messagebox.showinfo("Success", "Results exported to robot_arm_results.csv")
+            messagebox.showinfo("Success", f"Results exported to {path}")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export CSV: {str(e)}")
     
+    def export_to_npy(self):
+        """Export the flat record as one .npy file per column into a directory chosen by the user"""
+        if self.design is None:
+            messagebox.showerror("Error", "Nothing to export yet")
+            return
+        path = filedialog.askdirectory(title="Export NumPy Columns", mustexist=False)
+        if not path:
+            return
+        try:
+            export_records([design_record(self.last_parameters, self.design)], path, fmt='npy')
+            messagebox.showinfo("Success", f"Results exported to {path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export NumPy columns: {str(e)}")
+    
     def calculate_all(self):
-        """Calculate torque and power for all motors and update diagram"""
+        """Snapshot the inputs and hand the recalculation to the worker thread"""
+        with instruments.timer('gui.calculate_all'):
+            params = self.get_parameters()
+            motor_filter = self.read_motor_filter()
+            # Gradients cost several times the plain calculation, so only the sensitivity tab asks for them
+            gradients = self.notebook.select() == self.views['sensitivity']['tab']
+            if (params == self.requested_parameters and motor_filter == self.requested_filter
+                    and (self.requested_gradients or not gradients)):
+                profiler.input_ignored()
+                return
+            self.requested_parameters = params
+            self.requested_filter = motor_filter
+            self.requested_gradients = gradients
+            self.worker.submit((params, motor_filter, gradients))
+    
+    def read_motor_filter(self):
+        """The filter expression to select with: None for all motors, the last valid one while the entry is invalid"""
+        text = self.motor_filter.get().strip() or None
+        if text is not None:
+            try:
+                compile_filter(text)
+            except ValueError as e:
+                self.filter_error = True
+                self.filter_status.config(text=str(e), foreground="red")
+                return self.requested_filter
+        if self.filter_error:
+            self.filter_error = False
+            if text == self.shown_filter:
+                # Edited back to the filter in use, so no new results will refresh the status
+                self.update_filter_status()
+        return text
+    
+    def update_filter_status(self):
+        """Show how many catalog motors the active filter lets through"""
+        motor_catalog = get_motor_catalog()
+        if motor_catalog is None:
+            text = "No motor catalog"
+        elif self.shown_filter is None:
+            text = f"All {len(motor_catalog)} motors"
+        else:
+            text = f"{len(motor_catalog.filtered(self.shown_filter))} of {len(motor_catalog)} motors match"
+        self.filter_status.config(text=text, foreground="")
+    
+    def compute_request(self, request):
+        params, motor_filter, gradients = request
+        return self.compute_design(params, motor_filter, gradients)
+    
+    def compute_design(self, params, motor_filter=None, gradients=False):
+        """Evaluate a parameter snapshot on the worker thread (no Tk access here)"""
+        motor_catalog = get_motor_catalog()
+        if motor_catalog and motor_filter:
+            motor_catalog = motor_catalog.filtered(motor_filter)
+        # A snapshot seen before against the same loaded catalog and filter reuses its design,
+        # provided it has gradients when they are wanted
+        memo = self.design_memo.get(params)
+        if memo is not None and memo[0] is motor_catalog and (memo[1] or not gradients):
+            instruments.count('engine.memo.hits')
+            self.design_memo.move_to_end(params)
+            gradients, design = memo[1:]
+        else:
+            instruments.count('engine.memo.misses')
+            # The result cache holds plain designs sized against the whole catalog
+            key = None
+            if self.result_cache is not None and not motor_filter and not gradients:
+                key = design_key(params, catalog_fingerprint())
+            design = self.result_cache.get(key) if key is not None else None
+            if design is None:
+                # Recompute only the joints and motor selections that depend on the changed inputs;
+                # selections made from another catalog or filter, or with another gradients setting,
+                # cannot be reused
+                previous = self.engine_design
+                if motor_catalog is not self.engine_catalog or gradients != self.engine_gradients:
+                    previous = None
+                changed = params.changed_from(self.engine_parameters) if previous is not None else None
+                with instruments.timer('engine.evaluate_design'):
+                    design = evaluate_design(params, partial(get_motor_specs, motor_filter=motor_filter),
+                                             previous=previous, changed=changed, gradients=gradients)
+                if key is not None:
+                    self.result_cache.put(key, design)
+            self.design_memo[params] = (motor_catalog, gradients, design)
+            if len(self.design_memo) > DESIGN_MEMO_SIZE:
+                self.design_memo.popitem(last=False)
+        self.engine_design = design
+        self.engine_parameters = params
+        self.engine_catalog = motor_catalog
+        self.engine_gradients = gradients
+        return params, design
+    
+    def apply_design(self, result):
+        """Show the newest worker result, refreshing only what differs from the display"""
+        with instruments.timer('gui.apply_design'):
+            self.show_design(result)
+    
+    def show_design(self, result):
+        """Store a worker result and flag the views it affects"""
         try:
-            # Calculate for motors 6 to 1 (dependencies flow backwards)
-            normal_results = {}
-            sf_results = {}
+            params, design = result
+            changed = params.changed_from(self.last_parameters)
             
-            # First calculate all motors without SF to get motor weights
-            for motor_num in range(6, 0, -1):
-                # Calculate normal torque and power
-                results_normal = self.calculate_motor_torque_power(motor_num, with_sf=False)
-                normal_results[motor_num] = results_normal
-                
-                # Get motor specs based on normal calculations
-                total_torque = results_normal['total_torque']
-                power = results_normal['power']
-                self.motor_specs_normal[motor_num] = get_motor_specs(motor_num, total_torque, power)
+            # Compare against what is on screen, since stale results in between were dropped
+            changed_joints = set()
+            for motor_num in range(1, 7):
+                if self.design is None or any(
+                    design[key][motor_num] != self.design[key][motor_num]
+                    for key in ('normal', 'sf', 'specs_normal', 'specs_sf')
+                ):
+                    changed_joints.add(motor_num)
             
-            # Then calculate all motors with SF using updated motor weights
-            for motor_num in range(6, 0, -1):
-                # Calculate SF torque and power
-                results_sf = self.calculate_motor_torque_power(motor_num, with_sf=True)
-                sf_results[motor_num] = results_sf
-                
-                # Get motor specs based on SF calculations
-                total_torque_sf = results_sf['total_torque_sf']
-                power_sf = results_sf['power_sf']
-                self.motor_specs_sf[motor_num] = get_motor_specs(motor_num, total_torque_sf, power_sf)
+            self.design = design
+            self.last_parameters = params
+            self.motor_specs_normal = design['specs_normal']
+            self.motor_specs_sf = design['specs_sf']
             
-            # Update displays
-            for motor_num in range(1, 7):
-                self.update_results_display(motor_num, normal_results[motor_num], sf_results[motor_num])
+            for motor_num in sorted(changed_joints):
+                self.store_results(motor_num, design['normal'][motor_num], design['sf'][motor_num])
             
-            self.update_table_display()
-            self.update_diagram()
+            # Flag the affected views; only the visible tab renders now, the rest when shown
+            dirty = []
+            if changed_joints:
+                self.pending_result_joints |= changed_joints
+                dirty += ['results', 'alternatives', 'table']
+            if DIAGRAM_PARAMETERS.intersection(changed):
+                dirty.append('diagram')
+            # Results gaining or losing gradients also count as changed joints
+            if int(self.sensitivity_motor.get().split()[-1]) in changed_joints:
+                dirty.append('sensitivity')
+            if self.requested_filter != self.shown_filter and 'alternatives' not in dirty:
+                dirty.append('alternatives')
+            self.shown_filter = self.requested_filter
+            if not self.filter_error:
+                self.update_filter_status()
+            dirty.append('performance')
+            self.mark_dirty(*dirty)
+            profiler.results_updated()
                 
         except Exception as e:
-            print(f"Error in calculate_all: {e}")
+            print(f"Error in apply_design: {e}")
             traceback.print_exc()
 
 def main():
     """Main function to run the application"""
+    parser = argparse.ArgumentParser(description="6DOF robotic arm torque and power calculator")
+    parser.add_argument("--cache", metavar="DB", help="reuse results from this SQLite result cache")
+    args = parser.parse_args()
+    result_cache = ResultCache(args.cache) if args.cache else None
     try:
         root = tk.Tk()
-        app = RobotArmCalculator(root)
+        # Time every Tk callback from the start, so the app's traces and after callbacks are covered
+        profiler.install(root)
+        app = RobotArmCalculator(root, result_cache)
         
         root.minsize(1200, 800)
         
@@ -940,10 +1222,15 @@ def main():
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="Reset to Defaults", command=lambda: reset_to_defaults(app))
-        file_menu.add_command(label="Export to CSV", command=app.export_to_csv)
+        file_menu.add_command(label="Export...", command=app.export_to_csv)
+        file_menu.add_command(label="Export NumPy Columns...", command=app.export_to_npy)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=root.quit)
         
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Latency Profiler...", command=lambda: show_profiler_window(root))
+        
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
         help_menu.add_command(label="About", command=lambda: show_about_dialog(root))
@@ -953,70 +1240,76 @@ def main():
     except Exception as e:
         messagebox.showerror("Error", f"An error occurred: {str(e)}")
         traceback.print_exc()
+    finally:
+        if result_cache is not None:
+            result_cache.close()
 
 def reset_to_defaults(app):
     """Reset all values to defaults"""
     try:
-        # Global parameters
-        app.payload_mass.set("5.0")
-        app.link_density.set("7850.0")
-        
-        # Link dimensions
-        app.L6.set("0.2")
-        app.L5.set("0.3")
-        app.L4.set("0.25")
-        app.L3.set("0.25")
-        app.L2.set("0.3")
-        app.L1.set("0.0")
-        
-        app.r6.set("0.02")
-        app.r5.set("0.025")
-        app.r4.set("0.025")
-        app.r3.set("0.03")
-        app.r2.set("0.035")
-        app.r1.set("0.04")
-        
-        # Motor pivot positions (calculated from cumulative link lengths)
-        app.M6.set("1.25")  # L1+L2+L3+L4+L5
-        app.M5.set("1.0")   # L1+L2+L3+L4
-        app.M4.set("0.75")  # L1+L2+L3
-        app.M3.set("0.5")   # L1+L2
-        app.M2.set("0.25")  # L1
-        app.M1.set("0.0")
-        
-        # Motor body lengths
-        app.a6.set("0.1")
-        app.a5.set("0.12")
-        app.a4.set("0.12")
-        app.a3.set("0.15")
-        app.a2.set("0.18")
-        app.a1.set("0.2")
-        
-        # Motor RPM
-        app.rpm6.set("3000")
-        app.rpm5.set("3000")
-        app.rpm4.set("3000")
-        app.rpm3.set("3000")
-        app.rpm2.set("3000")
-        app.rpm1.set("3000")
-        
-        # Reduction ratios
-        app.R6.set("50")
-        app.R5.set("50")
-        app.R4.set("50")
-        app.R3.set("50")
-        app.R2.set("50")
-        app.R1.set("50")
-        
-        # Safety factors
-        app.SF6.set("1.5")
-        app.SF5.set("1.5")
-        app.SF4.set("1.5")
-        app.SF3.set("1.5")
-        app.SF2.set("1.5")
-        app.SF1.set("1.5")
-        
-        app.calculate_all()
+        # Set everything first, then recalculate once
+        with app.scheduler.batch():
+            # Global parameters
+            app.payload_mass.set("5.0")
+            app.link_density.set("7850.0")
+            
+            # Link dimensions
+            app.L6.set("0.2")
+            app.L5.set("0.3")
+            app.L4.set("0.25")
+            app.L3.set("0.25")
+            app.L2.set("0.3")
+            app.L1.set("0.0")
+            
+            app.r6.set("0.02")
+            app.r5.set("0.025")
+            app.r4.set("0.025")
+            app.r3.set("0.03")
+            app.r2.set("0.035")
+            app.r1.set("0.04")
+            
+            # Motor pivot positions (calculated from cumulative link lengths)
+            app.M6.set("1.25")  # L1+L2+L3+L4+L5
+            app.M5.set("1.0")   # L1+L2+L3+L4
+            app.M4.set("0.75")  # L1+L2+L3
+            app.M3.set("0.5")   # L1+L2
+            app.M2.set("0.25")  # L1
+            app.M1.set("0.0")
+            
+            # Motor body lengths
+            app.a6.set("0.1")
+            app.a5.set("0.12")
+            app.a4.set("0.12")
+            app.a3.set("0.15")
+            app.a2.set("0.18")
+            app.a1.set("0.2")
+            
+            # Motor RPM
+            app.rpm6.set("3000")
+            app.rpm5.set("3000")
+            app.rpm4.set("3000")
+            app.rpm3.set("3000")
+            app.rpm2.set("3000")
+            app.rpm1.set("3000")
+            
+            # Reduction ratios
+            app.R6.set("50")
+            app.R5.set("50")
+            app.R4.set("50")
+            app.R3.set("50")
+            app.R2.set("50")
+            app.R1.set("50")
+            
+            # Safety factors
+            app.SF6.set("1.5")
+            app.SF5.set("1.5")
+            app.SF4.set("1.5")
+            app.SF3.set("1.5")
+            app.SF2.set("1.5")
+            app.SF1.set("1.5")
+            
+            # Motor selection filter
+            app.motor_filter.set("")
         
     except Exception as e:
         messagebox.showerror("Error", f"Failed to reset to defaults: {str(e)}")
@@ -1,5 +1,11 @@
+import bisect
 import csv
+import heapq
 import os
+import threading
+from itertools import islice, compress
+from instrumentation import instruments
+from catalog_filter import FILTER_CACHE_SIZE, compile_filter, encode_column, leaf_matches
 
 def clean_value(value, unit=None):
     """Remove unit from value and convert to float, or convert plain number to float"""
@@ -16,130 +22,423 @@ def normalize_column_name(name):
     """Normalize column name by stripping spaces and converting to lowercase"""
     return name.strip().lower()
 
-def get_motor_specs(motor_num, torque, power):
-    """Select a motor from the CSV file based on torque and power requirements"""
-    try:
-        # Define the CSV file path (assumed to be in the same directory)
-        csv_file = "Robotic Arm - New Motor Data.csv"
-        
-        # Check if the CSV file exists
-        if not os.path.exists(csv_file):
-            print(f"CSV file {csv_file} not found")
-            return {
-                'motor': f"Motor {motor_num}",
-                'power_rating': 0,
-                'flange_size': 0,
-                'voltage_type': "N/A",
-                'model_name': "N/A",
-                'company_name': "N/A",
-                'price': 0.0,
-                'motor_weight': 0.0
-            }
+MOTOR_CATALOG_CSV = "Robotic Arm - New Motor Data.csv"
+
+def empty_motor_specs(motor_num):
+    """Return the placeholder specs used when no motor can be selected"""
+    return {
+        'motor': f"Motor {motor_num}",
+        'power_rating': 0,
+        'flange_size': 0,
+        'voltage_type': "N/A",
+        'model_name': "N/A",
+        'company_name': "N/A",
+        'price': 0.0,
+        'motor_weight': 0.0
+    }
+
+def read_motor_catalog(csv_file=MOTOR_CATALOG_CSV):
+    """Read the motor CSV into a list of motor dicts, or None if it is unusable"""
+    # Check if the CSV file exists
+    if not os.path.exists(csv_file):
+        print(f"CSV file {csv_file} not found")
+        return None
+    
+    motor_database = []
+    with open(csv_file, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
         
-        # Read the CSV file
-        motor_database = []
-        with open(csv_file, newline='', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            # Print actual column names for debugging
-            print(f"CSV columns found: {reader.fieldnames}")
-            
-            # Define expected column names (with spaces as in your CSV)
-            required_columns = {
-                'Power Rating (Watts)', 'Weight (kg)', 'Rated RPM ', 'Rated Torque',
-                'Input voltage', 'Voltage Type', 'Model ', 'Flange Size',
-                'Company Name', 'Link'
-            }
-            actual_columns = set(reader.fieldnames)
-            if not required_columns.issubset(actual_columns):
-                missing = required_columns - actual_columns
-                print(f"Missing columns in CSV: {missing}")
-                return {
-                    'motor': f"Motor {motor_num}",
-                    'power_rating': 0,
-                    'flange_size': 0,
-                    'voltage_type': "N/A",
-                    'model_name': "N/A",
-                    'company_name': "N/A",
-                    'price': 0.0,
-                    'motor_weight': 0.0
-                }
-            
-            for row in reader:
-                motor_database.append({
-                    'power_rating': clean_value(row['Power Rating (Watts)'], 'W'),
-                    'motor_weight': clean_value(row['Weight (kg)'], 'Kg'),
-                    'rated_rpm': clean_value(row['Rated RPM ']),  # Include trailing space
-                    'rated_torque': clean_value(row['Rated Torque'], 'Nm'),
-                    'input_voltage': clean_value(row['Input voltage']),
-                    'voltage_type': row['Voltage Type'].strip(),
-                    'model_name': row['Model '].strip(),  # Include trailing space
-                    'flange_size': clean_value(row['Flange Size'], 'mm'),
-                    'company_name': row['Company Name'].strip(),
-                    'link': row['Link'].strip(),
-                    'price': clean_value(row.get('Prices', '0.0'))
-                })
+        # Define expected column names (with spaces as in your CSV)
+        required_columns = {
+            'Power Rating (Watts)', 'Weight (kg)', 'Rated RPM ', 'Rated Torque',
+            'Input voltage', 'Voltage Type', 'Model ', 'Flange Size',
+            'Company Name', 'Link'
+        }
+        actual_columns = set(reader.fieldnames)
+        if not required_columns.issubset(actual_columns):
+            missing = required_columns - actual_columns
+            print(f"Missing columns in CSV: {missing}")
+            return None
         
-        # Filter motors that meet torque and power requirements
-        max_p = 100000000000000
+        for row in reader:
+            motor_database.append({
+                'power_rating': clean_value(row['Power Rating (Watts)'], 'W'),
+                'motor_weight': clean_value(row['Weight (kg)'], 'Kg'),
+                'rated_rpm': clean_value(row['Rated RPM ']),  # Include trailing space
+                'rated_torque': clean_value(row['Rated Torque'], 'Nm'),
+                'input_voltage': clean_value(row['Input voltage']),
+                'voltage_type': row['Voltage Type'].strip(),
+                'model_name': row['Model '].strip(),  # Include trailing space
+                'flange_size': clean_value(row['Flange Size'], 'mm'),
+                'company_name': row['Company Name'].strip(),
+                'link': row['Link'].strip(),
+                'price': clean_value(row.get('Prices', '0.0'))
+            })
+    
+    return motor_database
 
-        for motor in motor_database:
-            if motor['power_rating'] < max_p and motor['power_rating'] >= power:
-                max_p = motor['power_rating']
-            
+# Parsed catalogs keyed by path, reused until the file changes on disk
+catalog_cache = {}
+catalog_lock = threading.Lock()
+
+def load_motor_catalog(csv_file=MOTOR_CATALOG_CSV):
+    """Return the parsed motor catalog, reading the CSV only when it changed
+    
+    The returned list is shared between callers and must not be modified.
+    """
+    try:
+        stat = os.stat(csv_file)
+    except OSError:
+        print(f"CSV file {csv_file} not found")
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    
+    with catalog_lock:
+        cached = catalog_cache.get(csv_file)
+        if cached is not None and cached[0] == key:
+            instruments.count('catalog.hits')
+            return cached[1]
+        instruments.count('catalog.misses')
+        with instruments.timer('catalog.parse'):
+            motor_database = read_motor_catalog(csv_file)
+        if motor_database is not None:
+            instruments.count('catalog.rows_parsed', len(motor_database))
+        catalog_cache[csv_file] = (key, motor_database)
+        return motor_database
+
+def preload_motor_catalog(csv_file=MOTOR_CATALOG_CSV):
+    """Parse the catalog on a background thread so the first selection finds it warm"""
+    thread = threading.Thread(target=load_motor_catalog, args=(csv_file,), name="catalog-preload", daemon=True)
+    thread.start()
+    return thread
+
+def motor_specs_from_row(motor_num, motor):
+    """Build the specs dict shown in the GUI from a catalog row"""
+    return {
+        'motor': f"Motor {motor_num}",
+        'power_rating': motor['power_rating'],
+        'flange_size': motor['flange_size'],
+        'voltage_type': motor['voltage_type'],
+        'model_name': motor['model_name'],
+        'company_name': motor['company_name'],
+        'price': motor['price'],
+        'motor_weight': motor['motor_weight']
+    }
+
+# Candidate rankings for MotorCatalog.top_k: name -> (label, sort key of (motor, torque, power)).
+# A key may shift with the requirement but must order any two motors the same way for every requirement.
+CANDIDATE_RANKINGS = {
+    # Closest sufficient power rating first, heaviest first on ties, as select_motor picks
+    'power_margin': ("Power margin", lambda motor, torque, power: (motor['power_rating'] - power,
+                                                                     -motor['motor_weight'])),
+    # Motors without a weight or a price in the catalog (0) come last
+    'weight': ("Weight", lambda motor, torque, power: (motor['motor_weight'] <= 0, motor['motor_weight'],
+                                                       motor['power_rating'])),
+    'price': ("Price", lambda motor, torque, power: (motor['price'] <= 0, motor['price'],
+                                                     motor['power_rating'], motor['motor_weight'])),
+    # Most torque headroom first
+    'torque_margin': ("Torque margin", lambda motor, torque, power: (torque - motor['rated_torque'],
+                                                                      motor['power_rating'], motor['motor_weight']))
+}
 
+# top_k walks a ranking's presorted order when at least this share of the catalog is rated for the power,
+# and keeps a heap over the qualifying motors otherwise
+CANDIDATE_SCAN_SHARE = 0.25
+
+# Candidates listed per joint unless asked otherwise
+DEFAULT_CANDIDATES = 5
+
+# Initial bound of the smallest sufficient power rating search in select_motor
+SELECTION_POWER_CAP = 100000000000000
+
+def select_motor(motor_database, motor_num, torque, power):
+    """Select a motor from an already loaded catalog based on torque and power requirements"""
+    # Filter motors that meet torque and power requirements
+    instruments.count('selection.rows_scanned', 2 * len(motor_database))
+    max_p = SELECTION_POWER_CAP
+
+    for motor in motor_database:
+        if motor['power_rating'] < max_p and motor['power_rating'] >= power:
+            max_p = motor['power_rating']
+        
+
+    suitable_motors = [
+        motor for motor in motor_database
+        if motor['power_rating'] == max_p
+    ]
+    
+    if not suitable_motors:
+        # If no exact match, find motors with power rating closest to but greater than required power
         suitable_motors = [
             motor for motor in motor_database
-            if motor['power_rating'] == max_p
+            if motor['rated_torque'] >= torque
         ]
-        
         if not suitable_motors:
-            # If no exact match, find motors with power rating closest to but greater than required power
-            suitable_motors = [
-                motor for motor in motor_database
-                if motor['rated_torque'] >= torque
-            ]
-            if not suitable_motors:
-                print(f"No motor found for Motor {motor_num} with torque {torque:.3f} N⋅m and power {power:.3f} W")
-                return {
-                    'motor': f"Motor {motor_num}",
-                    'power_rating': 0,
-                    'flange_size': 0,
-                    'voltage_type': "N/A",
-                    'model_name': "N/A",
-                    'company_name': "N/A",
-                    'price': 0.0,
-                    'motor_weight': 0.0
-                }
-            # Find the motor with the closest higher power rating
-            suitable_motors = sorted(
-                suitable_motors,
-                key=lambda x: (x['power_rating'] - power, -x['motor_weight'])
-            )
-            selected_motor = suitable_motors[0]
+            print(f"No motor found for Motor {motor_num} with torque {torque:.3f} N⋅m and power {power:.3f} W")
+            return empty_motor_specs(motor_num)
+        # Find the motor with the closest higher power rating
+        suitable_motors = sorted(
+            suitable_motors,
+            key=lambda x: (x['power_rating'] - power, -x['motor_weight'])
+        )
+        selected_motor = suitable_motors[0]
+    else:
+        # If there are exact matches, select the one with the highest weight
+        selected_motor = max(suitable_motors, key=lambda x: x['motor_weight'])
+    
+    return motor_specs_from_row(motor_num, selected_motor)
+
+class MotorCatalog:
+    """A loaded catalog with a power-sorted index for fast repeated selection
+
+    select() returns exactly what select_motor() returns for the same
+    catalog, but finds the smallest sufficient power rating by bisection
+    instead of scanning every motor.
+    """
+
+    def __init__(self, motor_database):
+        self.motors = motor_database
+        # Heaviest motor for every distinct power rating (first one on ties)
+        heaviest = {}
+        for motor in motor_database:
+            power_rating = motor['power_rating']
+            best = heaviest.get(power_rating)
+            if best is None or motor['motor_weight'] > best['motor_weight']:
+                heaviest[power_rating] = motor
+        # select_motor starts its search from this cap: larger ratings are never
+        # matched by power, and motors rated exactly at the cap match any power
+        self.cap_motor = heaviest.pop(SELECTION_POWER_CAP, None)
+        self.power_ratings = sorted(p for p in heaviest if p < SELECTION_POWER_CAP)
+        self.heaviest = [heaviest[p] for p in self.power_ratings]
+        # Every motor in power margin order with its power ratings and catalog positions, and the
+        # whole catalog in each other ranking's order; each is sorted the first time top_k needs it
+        self.power_order = None
+        self.ranked = {}
+        # Columnar view of the catalog for filters, with the masks and filtered catalogs built from it
+        self.columns = {}
+        self.leaf_masks = {}
+        self.subsets = {}
+
+    def __len__(self):
+        return len(self.motors)
+
+    def find(self, torque, power):
+        """Return the catalog row select_motor would pick, or None"""
+        # NaN compares false everywhere, so select_motor never matches it by power
+        if power == power:
+            i = bisect.bisect_left(self.power_ratings, power)
+            if i < len(self.power_ratings):
+                return self.heaviest[i]
+        if self.cap_motor is not None:
+            return self.cap_motor
+
+        # Nothing is rated for this power: scan every row for the torque fallback
+        instruments.count('selection.rows_scanned', len(self.motors))
+        suitable_motors = [motor for motor in self.motors if motor['rated_torque'] >= torque]
+        if not suitable_motors:
+            return None
+        return min(suitable_motors, key=lambda x: (x['power_rating'] - power, -x['motor_weight']))
+
+    def find_batch(self, requirements):
+        """find() for a list of (torque, power) pairs in one merge pass over the power index"""
+        found = [None] * len(requirements)
+        # Sorting the requirements by power lets one pointer walk the sorted ratings
+        order = sorted((i for i, (_, power) in enumerate(requirements) if power == power),
+                       key=lambda i: requirements[i][1])
+        n = len(self.power_ratings)
+        j = 0
+        for i in order:
+            power = requirements[i][1]
+            while j < n and self.power_ratings[j] < power:
+                j += 1
+            if j < n:
+                found[i] = self.heaviest[j]
+        for i, motor in enumerate(found):
+            if motor is None:
+                found[i] = self.find(*requirements[i])
+        return found
+
+    def top_k(self, torque, power, k=DEFAULT_CANDIDATES, ranking='power_margin'):
+        """The k best catalog rows for a requirement under a CANDIDATE_RANKINGS ranking
+
+        Candidates are the motors select_motor would choose among: those
+        rated for the power below SELECTION_POWER_CAP, else those rated
+        exactly at the cap, else those rated for the torque. The first power
+        margin candidate is the motor select() picks, and motors tied under
+        a ranking keep catalog order. Power margin order is read straight
+        off the power index. For other rankings, when most motors qualify,
+        the ranking's presorted order is walked until k qualify; otherwise a
+        k-sized heap runs over the qualifying motors rather than sorting them.
+        """
+        if k <= 0:
+            return []
+        key = CANDIDATE_RANKINGS[ranking][1]
+        by_power, ratings, positions = self.by_power()
+        below_cap = bisect.bisect_left(ratings, SELECTION_POWER_CAP)
+        # NaN compares false everywhere, so no motor below the cap is rated for it
+        start = bisect.bisect_left(ratings, power, 0, below_cap) if power == power else below_cap
+        if start < below_cap:
+            end = below_cap
         else:
-            # If there are exact matches, select the one with the highest weight
-            selected_motor = max(suitable_motors, key=lambda x: x['motor_weight'])
-        
-        return {
-            'motor': f"Motor {motor_num}",
-            'power_rating': selected_motor['power_rating'],
-            'flange_size': selected_motor['flange_size'],
-            'voltage_type': selected_motor['voltage_type'],
-            'model_name': selected_motor['model_name'],
-            'company_name': selected_motor['company_name'],
-            'price': selected_motor['price'],
-            'motor_weight': selected_motor['motor_weight']
-        }
+            # Motors rated exactly at the cap match any power, larger ratings never do
+            end = bisect.bisect_right(ratings, SELECTION_POWER_CAP, below_cap)
+        if start < end:
+            if ranking == 'power_margin':
+                return by_power[start:min(end, start + k)]
+            if end - start >= CANDIDATE_SCAN_SHARE * len(by_power):
+                # The candidates are exactly the motors rated within their range of power ratings
+                low, high = ratings[start], ratings[end - 1]
+                return list(islice((motor for motor in self.ranked_order(ranking)
+                                    if low <= motor['power_rating'] <= high), k))
+            candidates = zip(positions[start:end], by_power[start:end])
+        else:
+            instruments.count('selection.rows_scanned', len(self.motors))
+            candidates = ((i, motor) for i, motor in enumerate(self.motors) if motor['rated_torque'] >= torque)
+            if ranking == 'power_margin' and power != power:
+                # Every margin is NaN, which select_motor's sort leaves in catalog order
+                return [motor for _, motor in islice(candidates, k)]
+        best = heapq.nsmallest(k, candidates, key=lambda item: (key(item[1], torque, power), item[0]))
+        return [motor for _, motor in best]
+
+    def by_power(self):
+        """(motors in power margin order, their power ratings, their catalog positions)"""
+        order = self.power_order
+        if order is None:
+            motors = self.motors
+            # Catalog position breaks ties, as in select_motor and the other rankings
+            positions = sorted(range(len(motors)), key=lambda i: (motors[i]['power_rating'],
+                                                                  -motors[i]['motor_weight'], i))
+            by_power = [motors[i] for i in positions]
+            order = self.power_order = (by_power, [motor['power_rating'] for motor in by_power], positions)
+        return order
+
+    def ranked_order(self, ranking):
+        """The whole catalog in a ranking's order, ties broken by catalog position"""
+        order = self.ranked.get(ranking)
+        if order is None:
+            key = CANDIDATE_RANKINGS[ranking][1]
+            motors = self.motors
+            positions = sorted(range(len(motors)), key=lambda i: (key(motors[i], 0.0, 0.0), i))
+            order = self.ranked[ranking] = [motors[i] for i in positions]
+        return order
+
+    def candidates(self, motor_num, torque, power, k=DEFAULT_CANDIDATES, ranking='power_margin'):
+        """Specs dicts of top_k(), each with its rank, rated torque, input voltage and both margins"""
+        ranked = []
+        for rank, motor in enumerate(self.top_k(torque, power, k, ranking), 1):
+            specs = motor_specs_from_row(motor_num, motor)
+            specs.update(rank=rank, rated_torque=motor['rated_torque'], input_voltage=motor['input_voltage'],
+                         power_margin=motor['power_rating'] - power, torque_margin=motor['rated_torque'] - torque)
+            ranked.append(specs)
+        return ranked
+
+    def column(self, name):
+        """One catalog field in catalog order and its dictionary encoding, built on first use under catalog_lock"""
+        column = self.columns.get(name)
+        if column is None:
+            values = [motor[name] for motor in self.motors]
+            column = self.columns[name] = (values, encode_column(values))
+        return column
+
+    def column_mask(self, column, method, value):
+        """Mask of one filter comparison over a column (see catalog_filter), cached; called under catalog_lock"""
+        key = (column, method, value)
+        mask = self.leaf_masks.get(key)
+        if mask is None:
+            if len(self.leaf_masks) >= FILTER_CACHE_SIZE:
+                self.leaf_masks.clear()
+            mask = int.from_bytes(leaf_matches(*self.column(column), method, value), 'little')
+            self.leaf_masks[key] = mask
+        return mask
+
+    def all_rows_mask(self):
+        return int.from_bytes(b'\x01' * len(self.motors), 'little')
+
+    def filtered(self, motor_filter):
+        """MotorCatalog of the motors passing a filter expression or CatalogFilter, cached by expression
+
+        Selection and candidates on the result behave exactly as on a
+        catalog file holding only those motors.
+        """
+        if isinstance(motor_filter, str):
+            motor_filter = compile_filter(motor_filter)
+        # The GUI and its compute worker filter the same shared catalog, so the caches
+        # below (and the columns and masks built for them) change only under the lock
+        with catalog_lock:
+            subset = self.subsets.get(motor_filter.expression)
+            if subset is not None:
+                instruments.count('catalog.filter.hits')
+                return subset
+            instruments.count('catalog.filter.misses')
+            with instruments.timer('catalog.filter'):
+                mask = motor_filter.mask(self)
+                subset = MotorCatalog(list(compress(self.motors, mask.to_bytes(len(self.motors), 'little'))))
+            if len(self.subsets) >= FILTER_CACHE_SIZE:
+                self.subsets.clear()
+            self.subsets[motor_filter.expression] = subset
+            return subset
+
+    def select(self, motor_num, torque, power):
+        """Select a motor based on torque and power requirements, as select_motor does"""
+        return self.specs(motor_num, torque, power, self.find(torque, power))
+
+    def select_batch(self, requests):
+        """select() for a list of (motor_num, torque, power) requests, in request order"""
+        motors = self.find_batch([(torque, power) for _, torque, power in requests])
+        return [self.specs(motor_num, torque, power, motor)
+                for (motor_num, torque, power), motor in zip(requests, motors)]
+
+    def specs(self, motor_num, torque, power, motor):
+        if motor is None:
+            print(f"No motor found for Motor {motor_num} with torque {torque:.3f} N⋅m and power {power:.3f} W")
+            return empty_motor_specs(motor_num)
+        return motor_specs_from_row(motor_num, motor)
+
+# Indexed catalogs, rebuilt whenever load_motor_catalog returns a new list
+catalog_index_cache = {}
+
+def get_motor_catalog(csv_file=MOTOR_CATALOG_CSV):
+    """Return the indexed MotorCatalog for a CSV file, or None if it is unusable"""
+    motor_database = load_motor_catalog(csv_file)
+    if motor_database is None:
+        return None
+    with catalog_lock:
+        cached = catalog_index_cache.get(csv_file)
+        if cached is None or cached.motors is not motor_database:
+            cached = MotorCatalog(motor_database)
+            catalog_index_cache[csv_file] = cached
+        return cached
+
+def get_motor_specs(motor_num, torque, power, motor_filter=None):
+    """Select a motor from the CSV file based on torque and power requirements
+    
+    motor_filter restricts the choice to the motors passing a filter
+    expression (see catalog_filter.compile_filter).
+    """
+    try:
+        with instruments.timer('selection'):
+            catalog = get_motor_catalog()
+            if catalog is None:
+                return empty_motor_specs(motor_num)
+            if motor_filter:
+                catalog = catalog.filtered(motor_filter)
+            return catalog.select(motor_num, torque, power)
     
     except Exception as e:
         print(f"Error in get_motor_specs for Motor {motor_num}: {e}")
-        return {
-            'motor': f"Motor {motor_num}",
-            'power_rating': 0,
-            'flange_size': 0,
-            'voltage_type': "N/A",
-            'model_name': "N/A",
-            'company_name': "N/A",
-            'price': 0.0,
-            'motor_weight': 0.0
-        }
+        return empty_motor_specs(motor_num)
+
+def get_motor_candidates(motor_num, torque, power, k=DEFAULT_CANDIDATES, ranking='power_margin', motor_filter=None):
+    """The top k candidate motors from the CSV file for a requirement, best first (see MotorCatalog.top_k)"""
+    try:
+        with instruments.timer('selection.candidates'):
+            catalog = get_motor_catalog()
+            if catalog is None:
+                return []
+            if motor_filter:
+                catalog = catalog.filtered(motor_filter)
+            return catalog.candidates(motor_num, torque, power, k, ranking)
+    
+    except Exception as e:
+        print(f"Error in get_motor_candidates for Motor {motor_num}: {e}")
+        return []
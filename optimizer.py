@@ -0,0 +1,301 @@
+import argparse
+import json
+import sys
+from arm_model import (
+    PI, PARAMETER_NAMES, value_of, gradient_of, parse_parameters, seed_gradients,
+    joint_outputs, evaluate_design
+)
+from motor_utils import load_motor_catalog, select_motor
+
+# Limits for the solid round steel links
+YIELD_STRENGTH = 250e6  # Pa
+ELASTIC_MODULUS = 200e9  # Pa
+MAX_DEFLECTION = 0.002  # m, at the tip of each link
+
+# Relative margin the optimizer keeps from every limit
+CONSTRAINT_MARGIN = 0.01
+
+# A penalty level has converged when its projected gradient norm (scaled variables) is below this
+# fraction of the objective
+CONVERGENCE_TOLERANCE = 1e-3
+
+# Default iteration budget per penalty level, for each design variable
+ITERATIONS_PER_VARIABLE = 250
+
+# The line search accepts a step that improves on the worst of this many recent objective values
+NONMONOTONE_WINDOW = 10
+
+# Continuous design variables: link radii, motor pivot positions, gear ratios
+OPTIMIZED_PARAMETERS = (
+    tuple(f"r{i}" for i in range(1, 7)) +
+    tuple(f"M{i}" for i in range(1, 7)) +
+    tuple(f"R{i}" for i in range(1, 7))
+)
+
+def default_bounds(params):
+    """Bounds for each design variable; pivots stay on their own link"""
+    bounds = {}
+    start = 0.0
+    for i in range(1, 7):
+        end = start + params[f"L{i}"]
+        bounds[f"r{i}"] = (0.005, 0.1)
+        bounds[f"M{i}"] = (start, end)
+        bounds[f"R{i}"] = (5, 160)
+        start = end
+    return bounds
+
+def fit_line(points):
+    """Least squares fit y = a + b * x; returns (a, b) or None"""
+    n = len(points)
+    if n < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    if sxx == 0:
+        return None
+    b = sum((x - mean_x) * (y - mean_y) for x, y in points) / sxx
+    return mean_y - b * mean_x, b
+
+def motor_surrogate(motor_database, objective):
+    """Smooth stand-in for the catalog: motor weight or price as a function of power rating"""
+    key = 'motor_weight' if objective == 'mass' else 'price'
+    return fit_line([(m['power_rating'], m[key]) for m in motor_database if m[key] > 0])
+
+def design_terms(p, motor_weights, objective, surrogate, max_power, cost_per_kg=0.0,
+                 yield_strength=YIELD_STRENGTH, max_deflection=MAX_DEFLECTION):
+    """Objective value and normalized constraints (feasible when <= 0) for a design
+
+    Works on floats or Duals. Each link is treated as a solid round beam
+    loaded by the SF torque of the joint that drives it.
+    """
+    a, b = surrogate
+    link_mass = 0.0
+    motor_term = 0.0
+    constraints = {}
+    for j in range(6, 0, -1):
+        outputs = joint_outputs(p, j, motor_weights, with_sf=True)
+        motor_term = motor_term + a + b * outputs['power_sf']
+        constraints[f"power{j}"] = outputs['power_sf'] / max_power - 1
+
+        L = p[f"L{j}"]
+        if value_of(L) <= 0:
+            continue
+        r = p[f"r{j}"]
+        link_mass = link_mass + p['link_density'] * PI * r ** 2 * L
+        torque = outputs['total_torque_sf']
+        stress = 4 * torque / (PI * r ** 3)
+        deflection = 4 * torque * L ** 2 / (3 * ELASTIC_MODULUS * PI * r ** 4)
+        constraints[f"stress{j}"] = stress / yield_strength - 1
+        constraints[f"deflection{j}"] = deflection / max_deflection - 1
+
+    if objective == 'mass':
+        total = link_mass + motor_term
+    else:
+        total = motor_term + cost_per_kg * link_mass
+    return total, constraints
+
+def projected_gradient_norm(u, g, names):
+    """Largest move a full gradient step makes inside the [0, 1] box; zero at a bound constrained optimum"""
+    return max((abs(u[name] - min(1.0, max(0.0, u[name] - g[name]))) for name in names), default=0.0)
+
+def minimize_penalized(evaluate, x0, bounds, max_iterations=None, tolerance=CONVERGENCE_TOLERANCE):
+    """Projected gradient descent with a quadratic penalty continuation
+
+    evaluate(x, mu) returns a Dual of the penalized objective. Variables are
+    scaled to [0, 1] over their bounds so radii, pivots and ratios move at
+    comparable rates. Steps have Barzilai-Borwein lengths under a
+    nonmonotone line search, which keeps the stiff stress penalties on the
+    radii from stalling the slower gear ratios. Each penalty level runs
+    until the projected gradient norm falls to tolerance times the
+    objective's magnitude, or until max_iterations (by default
+    ITERATIONS_PER_VARIABLE per variable) run out. Returns (x, iterations, converged, gradient norm), where converged
+    is False when any level stopped on its budget or a failed line search.
+    """
+    names = [name for name in x0 if bounds[name][1] > bounds[name][0]]
+    lo = {name: bounds[name][0] for name in names}
+    span = {name: bounds[name][1] - bounds[name][0] for name in names}
+    if max_iterations is None:
+        max_iterations = ITERATIONS_PER_VARIABLE * max(1, len(names))
+
+    def to_x(u):
+        x = dict(x0)
+        for name in names:
+            x[name] = lo[name] + span[name] * u[name]
+        return x
+
+    u = {name: min(1.0, max(0.0, (x0[name] - lo[name]) / span[name])) for name in names}
+    iterations = 0
+    converged = True
+    norm = 0.0
+    for mu in (10.0, 100.0, 1000.0, 10000.0):
+        step = 0.1
+        level_converged = False
+        previous = None
+        recent = []
+        for _ in range(max_iterations):
+            iterations += 1
+            f = evaluate(to_x(u), mu)
+            grad = gradient_of(f)
+            g = {name: grad.get(name, 0.0) * span[name] for name in names}
+            norm = projected_gradient_norm(u, g, names)
+            if norm <= tolerance * max(1.0, abs(value_of(f))):
+                level_converged = True
+                break
+            if previous is not None:
+                # Step length from the curvature along the last move
+                last_u, last_g = previous
+                moved = {name: u[name] - last_u[name] for name in names}
+                curvature = sum(moved[name] * (g[name] - last_g[name]) for name in names)
+                squared = sum(moved[name] ** 2 for name in names)
+                step = min(1e6, max(1e-8, squared / curvature)) if curvature > 0 else 1.0
+            recent = (recent + [value_of(f)])[-NONMONOTONE_WINDOW:]
+            reference = max(recent)
+
+            # Backtracking line search on the projected step
+            while step > 1e-10:
+                candidate = {name: min(1.0, max(0.0, u[name] - step * g[name])) for name in names}
+                decrease = sum(g[name] * (u[name] - candidate[name]) for name in names)
+                if value_of(evaluate(to_x(candidate), mu)) <= reference - 1e-4 * decrease:
+                    break
+                step *= 0.5
+            else:
+                break
+
+            previous = (u, g)
+            u = candidate
+        converged = converged and level_converged
+    return to_x(u), iterations, converged, norm
+
+def optimize_design(params, objective='mass', variables=OPTIMIZED_PARAMETERS, bounds=None,
+                    motor_database=None, cost_per_kg=0.0, yield_strength=YIELD_STRENGTH,
+                    max_deflection=MAX_DEFLECTION, rounds=5, max_iterations=None,
+                    tolerance=CONVERGENCE_TOLERANCE):
+    """Minimize arm mass or cost over continuous geometry, then snap to catalog motors
+
+    Each round holds the currently selected motor weights fixed, optimizes
+    the continuous variables with analytic gradients against a linear
+    surrogate of the catalog, rounds the gear ratios to integers (as the
+    GUI reads them) and reselects motors from the catalog. Rounds repeat
+    until the selection stops changing, and the final design is re-verified
+    against the real catalog motors. max_iterations and tolerance bound
+    each penalty level as in minimize_penalized(); the result reports
+    whether the last round converged and warns when it did not.
+    """
+    if motor_database is None:
+        motor_database = load_motor_catalog()
+    if not motor_database:
+        print("Motor catalog unavailable; cannot optimize")
+        return None
+    surrogate = motor_surrogate(motor_database, objective)
+    if surrogate is None:
+        print(f"Catalog has too few motors with a {'weight' if objective == 'mass' else 'price'} "
+              f"to optimize {objective}")
+        return None
+    max_power = max(m['power_rating'] for m in motor_database)
+    bounds = bounds or default_bounds(params)
+
+    def select(motor_num, torque, power):
+        return select_motor(motor_database, motor_num, torque, power)
+
+    current = dict(params)
+    design = evaluate_design(current, select)
+    initial_mass = total_arm_mass(current, design)
+    total_iterations = 0
+    for _ in range(rounds):
+        motor_weights = {num: s['motor_weight'] for num, s in design['specs_sf'].items()}
+        selection = [s['model_name'] for _, s in sorted(design['specs_sf'].items())]
+
+        def evaluate(x, mu):
+            p = seed_gradients(x, variables)
+            total, constraints = design_terms(p, motor_weights, objective, surrogate, max_power,
+                                              cost_per_kg, yield_strength, max_deflection)
+            # Aim slightly inside the limits so the penalty optimum is feasible
+            penalty = 0.0
+            for g in constraints.values():
+                g = g + CONSTRAINT_MARGIN
+                if value_of(g) > 0:
+                    penalty = penalty + g * g
+            return total + mu * penalty
+
+        x0 = {name: float(current[name]) for name in variables}
+        x, iterations, converged, gradient_norm = minimize_penalized(
+            lambda x, mu: evaluate({**current, **x}, mu), x0, bounds, max_iterations, tolerance)
+        total_iterations += iterations
+        current.update(x)
+        for i in range(1, 7):
+            if f"R{i}" in variables:
+                current[f"R{i}"] = int(round(current[f"R{i}"]))
+
+        design = evaluate_design(current, select)
+        if [s['model_name'] for _, s in sorted(design['specs_sf'].items())] == selection:
+            break
+
+    # Re-verify with the snapped gear ratios and the real catalog motors
+    motor_weights = {num: s['motor_weight'] for num, s in design['specs_sf'].items()}
+    objective_value, constraints = design_terms(current, motor_weights, objective, surrogate, max_power,
+                                                cost_per_kg, yield_strength, max_deflection)
+    violations = {name: g for name, g in constraints.items() if g > 1e-6}
+    unmatched = [num for num, s in design['specs_sf'].items() if s['model_name'] == "N/A"]
+    if not converged:
+        print(f"Warning: optimizer stopped before converging (projected gradient norm {gradient_norm:.3g}); "
+              f"a larger iteration budget (--max-iterations) may find a better design", file=sys.stderr)
+
+    return {
+        'parameters': current,
+        'objective': objective,
+        'surrogate_objective': objective_value,
+        'initial_arm_mass': initial_mass,
+        'arm_mass': total_arm_mass(current, design),
+        'arm_price': sum(s['price'] for s in design['specs_sf'].values()),
+        'feasible': not violations and not unmatched,
+        'violations': violations,
+        'unmatched_motors': sorted(unmatched),
+        'iterations': total_iterations,
+        'converged': converged,
+        'gradient_norm': gradient_norm,
+        'design': design
+    }
+
+def total_arm_mass(params, design):
+    """Link mass plus the mass of the motors selected with safety factor (kg)"""
+    link_mass = sum(
+        params['link_density'] * PI * params[f"r{i}"] ** 2 * params[f"L{i}"]
+        for i in range(1, 7) if params[f"L{i}"] > 0
+    )
+    return link_mass + sum(s['motor_weight'] for s in design['specs_sf'].values())
+
+def main():
+    """Optimize a design from the command line and print the result as JSON"""
+    parser = argparse.ArgumentParser(description="Optimize link radii, pivots and gear ratios")
+    parser.add_argument("--design", help="JSON file mapping parameter names to values (defaults otherwise)")
+    parser.add_argument("--objective", choices=("mass", "cost"), default="mass")
+    parser.add_argument("--cost-per-kg", type=float, default=0.0, help="link material cost for the cost objective")
+    parser.add_argument("--yield-strength", type=float, default=YIELD_STRENGTH, help="allowed link stress (Pa)")
+    parser.add_argument("--max-deflection", type=float, default=MAX_DEFLECTION, help="allowed link deflection (m)")
+    parser.add_argument("--max-iterations", type=int, metavar="N",
+                        help=f"iteration budget per penalty level (default {ITERATIONS_PER_VARIABLE} per variable)")
+    parser.add_argument("--tolerance", type=float, default=CONVERGENCE_TOLERANCE,
+                        help="projected gradient norm, relative to the objective, at which a level has converged")
+    args = parser.parse_args()
+    if args.max_iterations is not None and args.max_iterations < 1:
+        parser.error("--max-iterations must be at least 1")
+
+    raw = {}
+    if args.design:
+        with open(args.design, encoding='utf-8') as f:
+            raw = {name: str(value) for name, value in json.load(f).items()}
+    params = parse_parameters(raw)
+
+    result = optimize_design(params, args.objective, cost_per_kg=args.cost_per_kg,
+                             yield_strength=args.yield_strength, max_deflection=args.max_deflection,
+                             max_iterations=args.max_iterations, tolerance=args.tolerance)
+    if result is None:
+        return
+    summary = {key: value for key, value in result.items() if key != 'design'}
+    summary['parameters'] = {name: result['parameters'][name] for name in PARAMETER_NAMES}
+    summary['motors_sf'] = {num: s['model_name'] for num, s in sorted(result['design']['specs_sf'].items())}
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
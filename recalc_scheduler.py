@@ -0,0 +1,54 @@
+from contextlib import contextmanager
+
+# One frame at 60 Hz
+FRAME_MS = 16
+
+class RecalculationScheduler:
+    """Coalesce recalculation requests from Tk variable traces
+
+    Every trace event calls request(). The first request schedules one
+    run on the Tk event loop; further requests before it fires are merged
+    into it, so intermediate states (e.g. "0.", "0.2" while typing "0.25")
+    are dropped and at most one recalculation runs per frame.
+    """
+
+    def __init__(self, root, callback, delay_ms=FRAME_MS):
+        self.root = root
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self.after_id = None
+        self.pending = False
+        self.batch_depth = 0
+
+    def request(self, *args):
+        """Ask for a recalculation; accepts and ignores trace callback arguments"""
+        self.pending = True
+        if self.batch_depth or self.after_id is not None:
+            return
+        if self.delay_ms > 0:
+            self.after_id = self.root.after(self.delay_ms, self.run)
+        else:
+            self.after_id = self.root.after_idle(self.run)
+
+    def run(self):
+        """Run the pending recalculation, if any"""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        if not self.pending:
+            return
+        self.pending = False
+        self.callback()
+
+    flush = run
+
+    @contextmanager
+    def batch(self):
+        """Suspend recalculation during bulk .set() calls, then run once at the end"""
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+            if self.batch_depth == 0 and self.pending:
+                self.run()
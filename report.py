@@ -0,0 +1,121 @@
+import csv
+
+# Column headers of the results export, shared by the GUI and the command line
+RESULT_HEADERS = [
+    "Motor",
+    "Total Torque (N⋅m)",
+    "Total Torque with SF (N⋅m)",
+    "Torque Before Reduction (N⋅m)",
+    "Torque Before Reduction with SF (N⋅m)",
+    "Power (W)",
+    "Power with SF (W)"
+]
+
+SPECS_HEADERS = [
+    "Motor",
+    "Power Rating (W)",
+    "Flange Size (mm)",
+    "Voltage Type",
+    "Model Name",
+    "Company Name",
+    "Price ($)",
+    "Motor Weight (kg)"
+]
+
+RESULT_KEYS = ('total_torque', 'total_torque_sf', 'torque_before_reduction',
+               'torque_before_reduction_sf', 'power', 'power_sf')
+
+# Outputs of an extra safety factor scenario (evaluate_design(safety_factors=...))
+SCENARIO_RESULT_KEYS = ('total_torque_sf', 'torque_before_reduction_sf', 'power_sf')
+
+SPECS_KEYS = ('motor', 'power_rating', 'flange_size', 'voltage_type', 'model_name',
+              'company_name', 'price', 'motor_weight')
+
+def default_specs(motor_num):
+    """Specs shown for a motor that has not been calculated yet"""
+    return {
+        'motor': f"Motor {motor_num}",
+        'power_rating': 0.0,
+        'flange_size': 0.0,
+        'voltage_type': 'N/A',
+        'model_name': 'N/A',
+        'company_name': 'N/A',
+        'price': 0.0,
+        'motor_weight': 0.0
+    }
+
+def result_values(design, motor_num):
+    """The six torque/power figures of one motor, in RESULT_KEYS order"""
+    if design is None or motor_num not in design['normal']:
+        return [0.0] * 6
+    normal = design['normal'][motor_num]
+    sf = design['sf'][motor_num]
+    return [
+        normal['total_torque'],
+        sf['total_torque_sf'],
+        normal['torque_before_reduction'],
+        sf['torque_before_reduction_sf'],
+        normal['power'],
+        sf['power_sf']
+    ]
+
+def export_rows(design):
+    """Rows of the results CSV for an evaluate_design() result (None gives zeros)"""
+    data = []
+
+    # Add Torque and Power Results Table
+    data.append(["Torque and Power Results"])
+    data.append(RESULT_HEADERS)
+    for motor_num in range(1, 7):
+        data.append([f"Motor {motor_num}"] + [f"{v:.3f}" for v in result_values(design, motor_num)])
+
+    # Add separator
+    data.append([])
+
+    # Add Motor Specifications Table (Normal)
+    data.append(["Motor Specifications (Normal)"])
+    data.append(SPECS_HEADERS)
+    for motor_num in range(1, 7):
+        specs = (design or {}).get('specs_normal', {}).get(motor_num) or default_specs(motor_num)
+        data.append([str(specs[key]) for key in SPECS_KEYS])
+
+    # Add separator
+    data.append([])
+
+    # Add Motor Specifications with Safety Factor Table
+    data.append(["Motor Specifications with Safety Factor"])
+    data.append(SPECS_HEADERS)
+    for motor_num in range(1, 7):
+        specs = (design or {}).get('specs_sf', {}).get(motor_num) or default_specs(motor_num)
+        data.append([f"{specs[key]:.3f}" if isinstance(specs[key], float) else str(specs[key])
+                     for key in SPECS_KEYS])
+
+    return data
+
+def write_export_csv(design, f):
+    """Write the results CSV for a design to an open text file"""
+    writer = csv.writer(f)
+    writer.writerows(export_rows(design))
+
+def design_summary(params, design):
+    """JSON-ready summary of a design: inputs, torque/power results and both motor selections"""
+    return {
+        'parameters': dict(params),
+        'results': [
+            dict(motor=f"Motor {motor_num}", **dict(zip(RESULT_KEYS, result_values(design, motor_num))))
+            for motor_num in range(1, 7)
+        ],
+        'motors_normal': [design['specs_normal'][num] for num in range(1, 7)],
+        'motors_sf': [design['specs_sf'][num] for num in range(1, 7)],
+        'scenarios': [
+            {
+                'safety_factor': sf,
+                'results': [
+                    dict(motor=f"Motor {num}", **{key: scenario['results'][num][key] for key in SCENARIO_RESULT_KEYS})
+                    for num in range(1, 7)
+                ],
+                'motors': [scenario['specs'][num] for num in range(1, 7)]
+            }
+            for sf, scenario in design.get('scenarios', {}).items()
+        ]
+    }
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from arm_model import PARAMETER_NAMES, evaluate_design
+from motor_utils import MOTOR_CATALOG_CSV, get_motor_catalog, empty_motor_specs
+from instrumentation import instruments
+
+RESULT_CACHE_DB = "robot_arm_results_cache.sqlite3"
+
+# Bumped whenever the cached result format or the calculation changes
+CACHE_VERSION = 1
+
+# Default size bound of the cache database contents
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+# Eviction trims the cache to this fraction of its bound, so it does not run on every insert
+EVICT_TO = 0.9
+
+# Inserts and hits buffered before they are written in one transaction
+WRITE_BATCH = 256
+
+SCENARIO_KEYS = ('normal', 'sf', 'specs_normal', 'specs_sf')
+
+# Catalog fingerprints keyed by path, reused until the file changes on disk
+fingerprint_cache = {}
+fingerprint_lock = threading.Lock()
+
+def catalog_fingerprint(csv_file=MOTOR_CATALOG_CSV):
+    """SHA-256 of the catalog file contents, or 'none' when there is no catalog"""
+    try:
+        stat = os.stat(csv_file)
+    except OSError:
+        return 'none'
+    key = (stat.st_mtime_ns, stat.st_size)
+    with fingerprint_lock:
+        cached = fingerprint_cache.get(csv_file)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+    digest = hashlib.sha256()
+    with open(csv_file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    fingerprint = digest.hexdigest()
+    with fingerprint_lock:
+        fingerprint_cache[csv_file] = (key, fingerprint)
+    return fingerprint
+
+def design_key(params, fingerprint):
+    """Content address of a parsed parameter snapshot evaluated against a catalog
+
+    params is a ParameterSnapshot or any mapping of parsed values. They are
+    serialized in PARAMETER_NAMES order by repr, which is exact for floats
+    and keeps ints and floats apart, so equal snapshots always hash alike.
+    """
+    canonical = repr((CACHE_VERSION, fingerprint, tuple(params[name] for name in PARAMETER_NAMES)))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def encode_design(design):
+    """Serialize the per-motor results and selections of a design (not its 'changed' sets)
+
+    Each scenario is stored as its key list plus one value row per motor,
+    which keeps entries small and quick to decode.
+    """
+    stored = {}
+    for scenario in SCENARIO_KEYS:
+        rows = [design[scenario][num] for num in range(1, 7)]
+        keys = list(rows[0])
+        if any(list(row) != keys for row in rows):
+            raise ValueError(f"Inconsistent {scenario} results cannot be cached")
+        stored[scenario] = [keys, [[row[key] for key in keys] for row in rows]]
+    return json.dumps(stored, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def decode_design(blob):
+    stored = json.loads(blob)
+    design = {}
+    for scenario in SCENARIO_KEYS:
+        keys, rows = stored[scenario]
+        design[scenario] = {num: dict(zip(keys, row)) for num, row in enumerate(rows, 1)}
+    design['changed'] = {'normal': set(range(1, 7)), 'sf': set(range(1, 7))}
+    return design
+
+class ResultCache:
+    """Persistent, size-bounded cache of evaluated designs in SQLite
+
+    Entries are keyed by design_key(). The database runs in WAL mode with a
+    busy timeout, so several processes (GUI, CLI, sweeps) can read and write
+    it at once. Every thread gets its own connection. New results and hit
+    times are buffered and written WRITE_BATCH at a time, so call flush()
+    (or close(), or use the cache as a context manager) when done. When
+    the stored results exceed max_bytes, the least recently used entries
+    are evicted.
+    """
+
+    def __init__(self, path=RESULT_CACHE_DB, max_bytes=MAX_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.touched = {}
+        self.hits = 0
+        self.misses = 0
+        with self.connection() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS results ("
+                       "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    def connection(self):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self.local.db = db
+        return db
+
+    def get(self, key):
+        """Return the cached design for key, or None"""
+        with self.lock:
+            blob = self.pending.get(key)
+        if blob is None:
+            row = self.connection().execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            blob = row[0] if row is not None else None
+        instruments.count('result_cache.misses' if blob is None else 'result_cache.hits')
+        with self.lock:
+            if blob is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.touched[key] = time.time()
+            full = len(self.touched) >= WRITE_BATCH
+        if full:
+            self.flush()
+        return decode_design(blob)
+
+    def put(self, key, design):
+        blob = encode_design(design)
+        with self.lock:
+            self.pending[key] = blob
+            full = len(self.pending) >= WRITE_BATCH
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write buffered results and hit times in one transaction, then enforce the size bound"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            touched, self.touched = self.touched, {}
+        if not pending and not touched:
+            return
+        now = time.time()
+        db = self.connection()
+        with db:
+            db.executemany("INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                           [(key, blob, len(blob), now) for key, blob in pending.items()])
+            db.executemany("UPDATE results SET last_used = ? WHERE key = ?",
+                           [(used, key) for key, used in touched.items()])
+        if pending:
+            self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache is within its bound"""
+        db = self.connection()
+        with db:
+            # Take the write lock first so concurrent evictions do not overlap
+            db.execute("BEGIN IMMEDIATE")
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            excess = total - int(self.max_bytes * EVICT_TO)
+            freed = 0
+            oldest = []
+            for key, size in db.execute("SELECT key, size FROM results ORDER BY last_used"):
+                if freed >= excess:
+                    break
+                oldest.append((key,))
+                freed += size
+            db.executemany("DELETE FROM results WHERE key = ?", oldest)
+
+    def evaluate(self, params, catalog_csv=MOTOR_CATALOG_CSV):
+        """evaluate_design() for a parsed snapshot against a catalog, served from the cache when possible"""
+        key = design_key(params, catalog_fingerprint(catalog_csv))
+        design = self.get(key)
+        if design is not None:
+            return design
+
+        motor_catalog = get_motor_catalog(catalog_csv)
+
+        def select(motor_num, torque, power):
+            if not motor_catalog:
+                return empty_motor_specs(motor_num)
+            return motor_catalog.select(motor_num, torque, power)
+
+        design = evaluate_design(params, select)
+        self.put(key, design)
+        return design
+
+    def clear(self):
+        with self.lock:
+            self.pending.clear()
+            self.touched.clear()
+        db = self.connection()
+        with db:
+            db.execute("DELETE FROM results")
+
+    def close(self):
+        self.flush()
+        db = getattr(self.local, 'db', None)
+        if db is not None:
+            db.close()
+            self.local.db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,310 @@
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from contextlib import redirect_stdout
+from arm_model import PARAMETER_NAMES, INTEGER_PARAMETERS, ParameterSnapshot, evaluate_design
+from report import RESULT_KEYS, default_specs
+from result_cache import ResultCache
+
+# Selected motor fields exported for both the normal and the SF selection
+SPECS_COLUMNS = (
+    ('model_name', 'str'), ('company_name', 'str'), ('voltage_type', 'str'),
+    ('power_rating', 'float'), ('flange_size', 'float'), ('price', 'float'), ('motor_weight', 'float')
+)
+
+# Rows buffered per column before they are written out
+CHUNK_ROWS = 4096
+
+EXPORT_FORMATS = ('csv', 'csv.gz', 'jsonl', 'npy', 'parquet')
+
+def record_columns():
+    """(name, type) of every exported column: inputs, then per motor results and selections"""
+    columns = [(name, 'int' if name in INTEGER_PARAMETERS else 'float') for name in PARAMETER_NAMES]
+    for motor_num in range(1, 7):
+        columns += [(f"{key}{motor_num}", 'float') for key in RESULT_KEYS]
+        columns += [(f"{key}{motor_num}", kind) for key, kind in SPECS_COLUMNS]
+        columns += [(f"{key}_sf{motor_num}", kind) for key, kind in SPECS_COLUMNS]
+    return columns
+
+# Per motor: (result column, source key, from the SF results?) and (specs key, normal column, SF column)
+RECORD_RESULT_FIELDS = {
+    motor_num: tuple((f"{key}{motor_num}", key, key.endswith('_sf')) for key in RESULT_KEYS)
+    for motor_num in range(1, 7)
+}
+RECORD_SPECS_FIELDS = {
+    motor_num: tuple((key, f"{key}{motor_num}", f"{key}_sf{motor_num}") for key, _ in SPECS_COLUMNS)
+    for motor_num in range(1, 7)
+}
+
+def design_record(params, design):
+    """Flatten one evaluate_design() result into a record matching record_columns()"""
+    if isinstance(params, ParameterSnapshot):
+        record = params.as_dict()
+    else:
+        record = {name: params[name] for name in PARAMETER_NAMES}
+    for motor_num in range(1, 7):
+        normal = design['normal'][motor_num]
+        sf = design['sf'][motor_num]
+        for column, key, with_sf in RECORD_RESULT_FIELDS[motor_num]:
+            record[column] = sf[key] if with_sf else normal[key]
+        specs_normal = design['specs_normal'].get(motor_num) or default_specs(motor_num)
+        specs_sf = design['specs_sf'].get(motor_num) or default_specs(motor_num)
+        for key, column, column_sf in RECORD_SPECS_FIELDS[motor_num]:
+            record[column] = specs_normal[key]
+            record[column_sf] = specs_sf[key]
+    return record
+
+def npy_directory_error(path):
+    """ValueError for a file path given where the npy format needs a directory"""
+    return ValueError(f"The npy format writes one .npy file per column into a directory; "
+                      f"give a directory path instead of {path}")
+
+def export_format(path):
+    """Export format implied by a path's extension; a directory (or a path without one) means npy
+
+    Raises ValueError for a .npy file path, since npy exports are directories.
+    """
+    lower = path.lower()
+    if lower.endswith('.csv.gz'):
+        return 'csv.gz'
+    for fmt in ('csv', 'jsonl', 'parquet'):
+        if lower.endswith('.' + fmt):
+            return fmt
+    if lower.endswith('.npy'):
+        raise npy_directory_error(path)
+    if os.path.isdir(path) or not os.path.splitext(path)[1]:
+        return 'npy'
+    raise ValueError(f"Cannot tell the export format of {path}; use one of {', '.join(EXPORT_FORMATS)}")
+
+class ResultWriter(ABC):
+    """Base class of the streaming exporters: write() records one at a time, then close()"""
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.names = [name for name, _ in columns]
+        self.rows = 0
+
+    @abstractmethod
+    def write(self, record):
+        """Append one record with a value for every column"""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CsvResultWriter(ResultWriter):
+    """One CSV row per record, optionally gzip compressed"""
+
+    def __init__(self, path, columns, compress=False):
+        super().__init__(path, columns)
+        if compress:
+            self.file = gzip.open(path, 'wt', newline='', encoding='utf-8')
+        else:
+            self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.names)
+
+    def write(self, record):
+        self.writer.writerow([record[name] for name in self.names])
+        self.rows += 1
+
+    def close(self):
+        self.file.close()
+
+class JsonlResultWriter(ResultWriter):
+    """One JSON object per line"""
+
+    def __init__(self, path, columns):
+        super().__init__(path, columns)
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, record):
+        self.file.write(json.dumps({name: record[name] for name in self.names}, ensure_ascii=False))
+        self.file.write('\n')
+        self.rows += 1
+
+    def close(self):
+        self.file.close()
+
+# Fixed .npy header size, so the row count can be patched in place on close
+NPY_HEADER_BYTES = 128
+
+def npy_header(dtype, rows):
+    """A version 1.0 .npy header for a 1-D little endian array, padded to NPY_HEADER_BYTES"""
+    header = f"{{'descr': '{dtype}', 'fortran_order': False, 'shape': ({rows},), }}"
+    header = header.ljust(NPY_HEADER_BYTES - 10 - 1) + '\n'
+    return b'\x93NUMPY\x01\x00' + len(header).to_bytes(2, 'little') + header.encode('latin1')
+
+class NpyResultWriter(ResultWriter):
+    """A directory with one .npy file per column
+
+    Numbers are stored as float64 or int64. Text columns are dictionary
+    encoded: the .npy file holds int32 codes and <column>.categories.json
+    the distinct values. Values are buffered in typed arrays and appended in
+    chunks; each header is rewritten with the final row count on close.
+    """
+
+    TYPECODES = {'float': ('d', '<f8'), 'int': ('q', '<i8'), 'str': ('i', '<i4')}
+
+    def __init__(self, path, columns, chunk_rows=CHUNK_ROWS):
+        super().__init__(path, columns)
+        if sys.byteorder != 'little':
+            raise RuntimeError(".npy export writes little endian arrays and needs a little endian machine")
+        if path.lower().endswith('.npy') or os.path.isfile(path):
+            raise npy_directory_error(path)
+        os.makedirs(path, exist_ok=True)
+        self.chunk_rows = chunk_rows
+        self.files = {}
+        self.buffers = {}
+        self.categories = {name: {} for name, kind in columns if kind == 'str'}
+        for name, kind in columns:
+            typecode, dtype = self.TYPECODES[kind]
+            f = open(os.path.join(path, f"{name}.npy"), 'wb')
+            f.write(npy_header(dtype, 0))
+            self.files[name] = f
+            self.buffers[name] = array(typecode)
+
+    def write(self, record):
+        for name, kind in self.columns:
+            value = record[name]
+            if kind == 'str':
+                codes = self.categories[name]
+                value = codes.setdefault(str(value), len(codes))
+            elif kind == 'float':
+                value = float(value)
+            self.buffers[name].append(value)
+        self.rows += 1
+        if self.rows % self.chunk_rows == 0:
+            self.flush()
+
+    def flush(self):
+        for name, buffer in self.buffers.items():
+            buffer.tofile(self.files[name])
+            del buffer[:]
+
+    def close(self):
+        self.flush()
+        for name, kind in self.columns:
+            f = self.files[name]
+            f.seek(0)
+            f.write(npy_header(self.TYPECODES[kind][1], self.rows))
+            f.close()
+        for name, codes in self.categories.items():
+            with open(os.path.join(self.path, f"{name}.categories.json"), 'w', encoding='utf-8') as f:
+                json.dump(list(codes), f, ensure_ascii=False)
+
+class ParquetResultWriter(ResultWriter):
+    """Parquet row groups of chunk_rows records; needs pyarrow"""
+
+    def __init__(self, path, columns, chunk_rows=CHUNK_ROWS):
+        super().__init__(path, columns)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow; use the npy format instead")
+        self.pa = pa
+        types = {'float': pa.float64(), 'int': pa.int64(), 'str': pa.dictionary(pa.int32(), pa.string())}
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.chunk_rows = chunk_rows
+        self.buffers = {name: [] for name in self.names}
+
+    def write(self, record):
+        for name in self.names:
+            self.buffers[name].append(record[name])
+        self.rows += 1
+        if self.rows % self.chunk_rows == 0:
+            self.flush()
+
+    def flush(self):
+        if not self.buffers[self.names[0]]:
+            return
+        batch = self.pa.record_batch([self.buffers[name] for name in self.names], schema=self.schema)
+        self.writer.write_batch(batch)
+        for buffer in self.buffers.values():
+            buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+def open_result_writer(path, columns=None, fmt=None):
+    """Open a streaming writer for path; the format defaults to the one its extension implies"""
+    columns = columns or record_columns()
+    fmt = fmt or export_format(path)
+    if fmt == 'csv':
+        return CsvResultWriter(path, columns)
+    if fmt == 'csv.gz':
+        return CsvResultWriter(path, columns, compress=True)
+    if fmt == 'jsonl':
+        return JsonlResultWriter(path, columns)
+    if fmt == 'npy':
+        return NpyResultWriter(path, columns)
+    if fmt == 'parquet':
+        return ParquetResultWriter(path, columns)
+    raise ValueError(f"Unknown export format {fmt}; use one of {', '.join(EXPORT_FORMATS)}")
+
+def export_records(records, path, fmt=None, columns=None):
+    """Stream an iterable of records to path and return the number written"""
+    with open_result_writer(path, columns, fmt) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.rows
+
+def iter_design_records(lines, cache=None):
+    """Size each JSON design line and yield its record, one design at a time
+
+    Lines are parsed strictly, as by the JSON Lines pipe; raises ValueError
+    naming the line number of the first line that cannot be read.
+    """
+    # design_pipe imports this module (through design_import), so it is imported here
+    from design_pipe import parse_design_line
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            params = parse_design_line(line)
+        except ValueError as e:
+            raise ValueError(f"Line {number}: {e}")
+        design = cache.evaluate(params) if cache is not None else evaluate_design(params)
+        yield design_record(params, design)
+
+def main():
+    """Size a JSON Lines file of designs and stream the results to an export file"""
+    parser = argparse.ArgumentParser(description="Streaming export of sized designs")
+    parser.add_argument("designs", help="JSON Lines file of designs, '-' for stdin")
+    parser.add_argument("output", help="output path (.csv, .csv.gz, .jsonl, .parquet, or a directory for .npy columns)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="override the format implied by the output path")
+    parser.add_argument("--cache", metavar="DB", help="reuse results from this SQLite result cache")
+    args = parser.parse_args()
+
+    cache = ResultCache(args.cache) if args.cache else None
+    f = sys.stdin if args.designs == "-" else open(args.designs, encoding='utf-8')
+    try:
+        with redirect_stdout(sys.stderr):
+            rows = export_records(iter_design_records(f, cache), args.output, args.format)
+    except (RuntimeError, ValueError) as e:
+        parser.error(str(e))
+    finally:
+        if f is not sys.stdin:
+            f.close()
+        if cache is not None:
+            cache.close()
+    print(f"Exported {rows} designs to {args.output}")
+    if cache is not None:
+        print(f"Result cache: {cache.hits} hits, {cache.misses} misses")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import random
+import time
+from motor_utils import MOTOR_CATALOG_CSV, get_motor_catalog, empty_motor_specs
+
+# How long the first request of a batch waits for others to join it
+BATCH_WINDOW_MS = 2
+
+# A batch is flushed at once when it reaches this size
+MAX_BATCH_SIZE = 512
+
+class SelectionBatcher:
+    """Coalesce concurrent motor selection requests into batch selections
+
+    Callers await select(); requests arriving within window_ms of the first
+    pending one are collected and answered by a single
+    MotorCatalog.select_batch() call, run off the event loop, whose results
+    are fanned back out to the waiting callers in request order.
+    """
+
+    def __init__(self, catalog_csv=MOTOR_CATALOG_CSV, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH_SIZE):
+        self.catalog_csv = catalog_csv
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.pending = []
+        self.timer = None
+        self.tasks = set()
+        self.batches = 0
+        self.requests = 0
+
+    async def select(self, motor_num, torque, power):
+        """Return the specs dict get_motor_specs would return for this requirement"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((motor_num, torque, power, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self):
+        """Start a batch selection for everything pending"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        task = asyncio.get_running_loop().create_task(self.run_batch(batch))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def select_batch(self, requests):
+        """Blocking batch selection; runs in the default executor"""
+        motor_catalog = get_motor_catalog(self.catalog_csv)
+        if motor_catalog is None:
+            return [empty_motor_specs(motor_num) for motor_num, _, _ in requests]
+        return motor_catalog.select_batch(requests)
+
+    async def run_batch(self, batch):
+        self.batches += 1
+        self.requests += len(batch)
+        requests = [(motor_num, torque, power) for motor_num, torque, power, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(None, self.select_batch, requests)
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (*_, future), specs in zip(batch, results):
+            if not future.done():
+                future.set_result(specs)
+
+    async def close(self):
+        """Answer everything still pending and wait for running batches"""
+        self.flush()
+        if self.tasks:
+            await asyncio.gather(*self.tasks)
+
+async def run_load(batcher, clients, requests_per_client, max_power, max_torque):
+    """Simulate concurrent clients, each awaiting one selection at a time"""
+    async def client(seed):
+        rng = random.Random(seed)
+        for _ in range(requests_per_client):
+            await batcher.select(rng.randint(1, 6), rng.uniform(0, max_torque), rng.uniform(0, max_power))
+
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    await batcher.close()
+
+def main():
+    """Measure selection throughput through the batcher under concurrent load"""
+    parser = argparse.ArgumentParser(description="Coalesced batch motor selection under concurrent load")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20, help="selections per client")
+    parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW_MS)
+    parser.add_argument("--catalog", default=MOTOR_CATALOG_CSV, help="motor catalog CSV")
+    args = parser.parse_args()
+
+    motor_catalog = get_motor_catalog(args.catalog)
+    if motor_catalog is None:
+        return
+    max_power = max(m['power_rating'] for m in motor_catalog.motors)
+    max_torque = max(m['rated_torque'] for m in motor_catalog.motors)
+
+    batcher = SelectionBatcher(args.catalog, args.window_ms)
+    start = time.perf_counter()
+    asyncio.run(run_load(batcher, args.clients, args.requests, max_power, max_torque))
+    elapsed = time.perf_counter() - start
+    print(f"{batcher.requests} selections in {batcher.batches} batches "
+          f"(mean {batcher.requests / max(batcher.batches, 1):.1f} per batch), "
+          f"{batcher.requests / elapsed:.0f} selections/s")
+
+if __name__ == "__main__":
+    main()
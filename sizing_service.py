@@ -0,0 +1,230 @@
+import argparse
+import json
+import threading
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from arm_model import evaluate_design
+from design_import import parse_design_object
+from motor_utils import MOTOR_CATALOG_CSV, get_motor_catalog, empty_motor_specs
+from report import design_summary
+from result_cache import ResultCache
+from instrumentation import instruments
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+class RequestError(Exception):
+    """A client error reported as an HTTP status with a JSON message"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class SizingService:
+    """Sizing logic behind the HTTP endpoints, sharing one warm catalog between requests
+
+    The indexed catalog comes from get_motor_catalog, so it is parsed once
+    and only re-read when the CSV changes on disk.
+    """
+
+    def __init__(self, catalog_csv=MOTOR_CATALOG_CSV, cache=None):
+        self.catalog_csv = catalog_csv
+        self.cache = cache
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def catalog(self):
+        return get_motor_catalog(self.catalog_csv)
+
+    def count(self):
+        with self.lock:
+            self.requests += 1
+
+    def select(self, motor_catalog, motor_num, torque, power):
+        if not motor_catalog:
+            return empty_motor_specs(motor_num)
+        return motor_catalog.select(motor_num, torque, power)
+
+    def size(self, raw, motor_catalog=None):
+        """Size one design given as a mapping of parameter names to values
+
+        Missing or null values take the defaults; an invalid value or an
+        unknown parameter name is a 400 error rather than a silent default.
+        """
+        if not isinstance(raw, dict):
+            raise RequestError(400, "A design must be a JSON object of parameter values")
+        try:
+            params = parse_design_object(raw)
+        except ValueError as e:
+            raise RequestError(400, str(e))
+        motor_catalog = motor_catalog or self.catalog()
+        if self.cache is not None:
+            return design_summary(params, self.cache.evaluate(params, self.catalog_csv))
+        design = evaluate_design(params, lambda num, torque, power: self.select(motor_catalog, num, torque, power))
+        return design_summary(params, design)
+
+    def size_batch(self, raws):
+        """Size a list of designs against the same catalog snapshot"""
+        if not isinstance(raws, list):
+            raise RequestError(400, "A batch must be a JSON array of designs")
+        motor_catalog = self.catalog()
+        results = []
+        for number, raw in enumerate(raws, 1):
+            try:
+                results.append(self.size(raw, motor_catalog))
+            except RequestError as e:
+                raise RequestError(e.status, f"Design {number}: {e}")
+        return results
+
+    def select_motors(self, requests):
+        """Select motors for one or more {motor, torque, power} requirements"""
+        single = isinstance(requests, dict)
+        if single:
+            requests = [requests]
+        if not isinstance(requests, list):
+            raise RequestError(400, "Expected a requirement object or an array of them")
+        motor_catalog = self.catalog()
+        results = []
+        for request in requests:
+            try:
+                motor_num = int(request.get('motor', 1))
+                torque = float(request['torque'])
+                power = float(request['power'])
+            except (AttributeError, KeyError, TypeError, ValueError):
+                raise RequestError(400, "Each requirement needs numeric 'torque' and 'power'")
+            results.append(self.select(motor_catalog, motor_num, torque, power))
+        return results[0] if single else results
+
+    def query_catalog(self, query):
+        """Catalog rows filtered by power range and company, sorted by power rating"""
+        motor_catalog = self.catalog()
+        if motor_catalog is None:
+            raise RequestError(503, f"Motor catalog {self.catalog_csv} is unavailable")
+        try:
+            min_power = float(query.get('min_power', ['0'])[0])
+            max_power = float(query.get('max_power', ['inf'])[0])
+            limit = int(query.get('limit', ['0'])[0])
+        except ValueError:
+            raise RequestError(400, "min_power, max_power and limit must be numbers")
+        company = query.get('company', [''])[0].lower()
+
+        motors = [
+            motor for motor in motor_catalog.motors
+            if min_power <= motor['power_rating'] <= max_power
+            and company in motor['company_name'].lower()
+        ]
+        motors.sort(key=lambda x: x['power_rating'])
+        return {'count': len(motors), 'motors': motors[:limit] if limit > 0 else motors}
+
+    def health(self):
+        motor_catalog = self.catalog()
+        return {
+            'status': 'ok' if motor_catalog is not None else 'no catalog',
+            'catalog': self.catalog_csv,
+            'motors': len(motor_catalog) if motor_catalog is not None else 0,
+            'requests': self.requests
+        }
+
+class SizingRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints; HTTP/1.1 so clients can keep connections alive between requests"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "RobotArmSizing/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        routes = {
+            '/health': lambda: self.server.service.health(),
+            '/catalog': lambda: self.server.service.query_catalog(parse_qs(url.query)),
+            '/metrics': instruments.snapshot
+        }
+        self.dispatch(routes.get(url.path))
+
+    def do_POST(self):
+        service = self.server.service
+        routes = {
+            '/size': service.size,
+            '/size/batch': service.size_batch,
+            '/select': service.select_motors
+        }
+        handler = routes.get(urlsplit(self.path).path)
+        self.dispatch(handler and (lambda: handler(self.read_json())))
+
+    def read_json(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BODY_BYTES:
+            # The body cannot be skipped reliably, so do not reuse the connection
+            self.close_connection = True
+            raise RequestError(413 if length > 0 else 400, "Request body missing or too large")
+        try:
+            return json.loads(self.rfile.read(length) or b'null')
+        except ValueError as e:
+            raise RequestError(400, f"Invalid JSON: {e}")
+
+    def dispatch(self, handler):
+        self.server.service.count()
+        if handler is None:
+            self.close_connection = True
+            self.send_json(404, {'error': f"Unknown endpoint {self.command} {self.path}"})
+            return
+        try:
+            self.send_json(200, handler())
+        except RequestError as e:
+            self.send_json(e.status, {'error': str(e)})
+        except Exception as e:
+            traceback.print_exc()
+            self.send_json(500, {'error': str(e)})
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, catalog_csv=MOTOR_CATALOG_CSV, quiet=False, cache=None):
+    """Create the threaded sizing server with its catalog already loaded (port 0 picks a free port)"""
+    server = ThreadingHTTPServer((host, port), SizingRequestHandler)
+    server.daemon_threads = True
+    server.service = SizingService(catalog_csv, cache)
+    server.quiet = quiet
+    server.service.catalog()
+    return server
+
+def main():
+    """Serve motor sizing over HTTP/JSON on localhost"""
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON motor sizing service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--catalog", default=MOTOR_CATALOG_CSV, help="motor catalog CSV")
+    parser.add_argument("--quiet", action="store_true", help="do not log every request")
+    parser.add_argument("--cache", metavar="DB", help="reuse results from this SQLite result cache")
+    args = parser.parse_args()
+
+    cache = ResultCache(args.cache) if args.cache else None
+    server = make_server(args.host, args.port, args.catalog, args.quiet, cache)
+    host, port = server.server_address[:2]
+    print(f"Serving motor sizing on http://{host}:{port} (endpoints: /size, /size/batch, /select, /catalog, /health, /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if cache is not None:
+            cache.close()
+
+if __name__ == "__main__":
+    main()